@@ -0,0 +1,66 @@
+"""
+Check that `import main` is fast and free of side effects.
+
+The import runs in a fresh interpreter inside an empty working directory, so
+any file or directory it creates (such as the `fpl_data` cache) is caught, and
+network access would show up as a slow import.
+
+Run from the repository root:
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --max-seconds 0.5 --repeat 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_SCRIPT = (
+    "import time; start = time.perf_counter(); import main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def time_import():
+    """
+    Import `main` in a subprocess from an empty directory.
+
+    Returns:
+        tuple: (seconds taken by the import, paths created by it)
+    """
+    with tempfile.TemporaryDirectory() as cwd:
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+            filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])))
+        result = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], cwd=cwd, env=env,
+                                capture_output=True, text=True, check=True)
+        created = sorted(os.listdir(cwd))
+    return float(result.stdout.strip().splitlines()[-1]), created
+
+
+def run(max_seconds, repeat):
+    timings = []
+    for _ in range(repeat):
+        seconds, created = time_import()
+        if created:
+            print(f"❌ Importing main created {created}")
+            return 1
+        timings.append(seconds)
+
+    best = min(timings)
+    print(f"import main: best {best:.3f}s, worst {max(timings):.3f}s over {repeat} runs")
+    if best > max_seconds:
+        print(f"❌ Import is slower than {max_seconds:.2f}s")
+        return 1
+    print("✅ Import is fast and has no side effects.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-seconds", type=float, default=1.0,
+                        help="fail when the fastest import takes longer than this")
+    parser.add_argument("--repeat", type=int, default=3, help="number of imports to time")
+    args = parser.parse_args()
+    raise SystemExit(run(args.max_seconds, args.repeat))
@@ -0,0 +1,91 @@
+"""
+Compare the exact squad optimizer against the greedy `select_team` loop.
+
+Run from the repository root:
+
+    python -m benchmarks.optimizer_vs_greedy             # cached league data
+    python -m benchmarks.optimizer_vs_greedy --synthetic 700
+"""
+import argparse
+import contextlib
+import io
+import time
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import main
+from controllers.optimizer import HAS_SCIPY
+from controllers.player import Player
+
+
+def synthetic_pool(size, seed=0):
+    """A scored player pool shaped like `score_league` output."""
+    rng = np.random.default_rng(seed)
+    positions = rng.choice(["GKP", "DEF", "MID", "FWD"], size=size, p=[0.11, 0.33, 0.4, 0.16])
+    prices = np.round(np.clip(rng.lognormal(np.log(5.5), 0.3, size), 3.9, 15.0), 1)
+    scores = np.maximum(rng.normal(prices ** 1.5, prices), 0)
+    return pd.DataFrame({
+        "ID": np.arange(1, size + 1),
+        "Player": [f"Player {i}" for i in range(1, size + 1)],
+        "Price": prices,
+        "Position": positions,
+        "Combined score": scores,
+        "Fitness": rng.choice([1.0, 1.0, 1.0, 1.0, 0.75, 0.5], size=size),
+        "Gw score": scores / 2,
+        "team": rng.integers(1, 21, size=size),
+    })
+
+
+def scored_league():
+    players_df = pd.DataFrame(main.players)
+    fit_ids = [p.id for p in map(Player, main.players) if main.normalize_fitness(p) != 0]
+    frames = {data_type: main.read_gameweek_frame(fit_ids, data_type)
+              for data_type in ("history", "history_past", "fixtures")}
+    return main.score_league(players_df[players_df["id"].isin(fit_ids)], frames["history"],
+                             frames["history_past"], frames["fixtures"], main.team_index,
+                             current_season=main.CURRENT_SEASON, decay_factor=main.DECAY_FACTOR)
+
+
+def objective(df, team_df):
+    """Total fitness-weighted Priority_Score of a squad, the optimizer's objective."""
+    priority = main.add_priority_score(df.copy())
+    priority = priority["Priority_Score"] * priority["Fitness"]
+    return priority[df["ID"].isin(team_df["ID"])].sum()
+
+
+def run(name, select, df, repeat):
+    timings = []
+    team_df = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            # The greedy loop prompts about low-availability players; answer
+            # "consider availability", which matches the optimizer's weighting.
+            with mock.patch("builtins.input", return_value="y"), \
+                    contextlib.redirect_stdout(io.StringIO()):
+                team_df = select(df.copy())
+        except ValueError as exc:
+            print(f"{name:<24} failed: {exc}")
+            return
+        timings.append(time.perf_counter() - start)
+    print(f"{name:<24} {min(timings) * 1000:>10.1f} ms {objective(df, team_df):>14.3f} "
+          f"{team_df['Price'].sum():>8.1f} {team_df['team'].value_counts().max():>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--synthetic", type=int, metavar="N",
+                        help="use a synthetic pool of N players instead of the cached league")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = synthetic_pool(args.synthetic, args.seed) if args.synthetic else scored_league()
+    print(f"{len(df)} players")
+    print(f"{'selector':<24} {'best time':>13} {'objective':>14} {'cost':>8} {'max/club':>9}")
+    run("greedy select_team", main.select_team, df, args.repeat)
+    if HAS_SCIPY:
+        run("exact (milp)", lambda d: main.optimize_team(d, solver="milp"), df, args.repeat)
+    run("exact (branch-and-bound)", lambda d: main.optimize_team(d, solver="branch-and-bound"), df, args.repeat)
@@ -0,0 +1,157 @@
+"""
+A local stand-in for the FPL API serving a SyntheticLeague.
+
+It answers `/api/bootstrap-static/`, `/api/fixtures/`,
+`/api/element-summary/{id}/` and `/api/event/{event}/live/` with a
+configurable delay per request, sends ETags and honours If-None-Match, so
+cold fetches and conditional revalidation can both be measured offline.
+Every live request moves the matches on by `live_step` minutes.
+
+Run on its own from the repository root:
+
+    python -m benchmarks.stub_server --players 700 --latency 0.05 --port 8765
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic import SyntheticLeague
+
+SUMMARY_PATH = re.compile(r"^/api/element-summary/(\d+)/?$")
+LIVE_PATH = re.compile(r"^/api/event/(\d+)/live/?$")
+
+
+class StubServer:
+    """
+    Serve a SyntheticLeague over HTTP on a background thread.
+
+    Parameters:
+        league (SyntheticLeague): The data to serve.
+        latency (float): Seconds to wait before answering each request.
+        live_step (int): Match minutes each live request moves on.
+        host (str): Interface to bind.
+        port (int): Port to bind, 0 for any free port.
+    """
+
+    def __init__(self, league, latency=0.0, live_step=5, host="127.0.0.1", port=0):
+        self.league = league
+        self.latency = latency
+        self.live_step = live_step
+        self.live_minutes = {}
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "not_modified": 0, "bytes": 0}
+        self.bodies = {}
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def _body(self, path):
+        """The encoded payload and ETag for a path, or None if there is none."""
+        live = LIVE_PATH.match(path)
+        if live:
+            event = int(live.group(1))
+            with self.lock:
+                minute = self.live_minutes[event] = self.live_minutes.get(event, -self.live_step) + self.live_step
+            body = json.dumps(self.league.live(event, minute)).encode()
+            return body, f'"{hashlib.md5(body).hexdigest()}"'
+        if path not in self.bodies:
+            match = SUMMARY_PATH.match(path)
+            if path.rstrip("/") == "/api/bootstrap-static":
+                payload = self.league.bootstrap()
+            elif path.rstrip("/") == "/api/fixtures":
+                payload = self.league.fixtures()
+            elif match:
+                payload = self.league.element_summary(int(match.group(1)))
+            else:
+                payload = None
+            if payload is None:
+                return None
+            body = json.dumps(payload).encode()
+            self.bodies[path] = (body, f'"{hashlib.md5(body).hexdigest()}"')
+        return self.bodies[path]
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=b"", headers=()):
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if stub.latency:
+                    time.sleep(stub.latency)
+                entry = stub._body(self.path.split("?")[0])
+                with stub.lock:
+                    stub.counts["requests"] += 1
+                if entry is None:
+                    self._send(404)
+                    return
+                body, etag = entry
+                if self.headers.get("If-None-Match") == etag:
+                    with stub.lock:
+                        stub.counts["not_modified"] += 1
+                    self._send(304, headers=[("ETag", etag)])
+                    return
+                with stub.lock:
+                    stub.counts["bytes"] += len(body)
+                self._send(200, body, [("Content-Type", "application/json"), ("ETag", etag)])
+
+        return Handler
+
+    def reset_counts(self):
+        with self.lock:
+            self.counts = {key: 0 for key in self.counts}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a synthetic FPL API.")
+    parser.add_argument("--players", type=int, default=700)
+    parser.add_argument("--gameweeks", type=int, default=38)
+    parser.add_argument("--played", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    parser.add_argument("--live-step", type=int, default=5, help="match minutes per live request")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    league = SyntheticLeague(args.players, args.gameweeks, args.played, seed=args.seed)
+    server = StubServer(league, args.latency, args.live_step, port=args.port)
+    print(f"Serving {args.players} synthetic players at {server.base_url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.server.server_close()
@@ -0,0 +1,268 @@
+"""
+Offline benchmark suite: cold fetch (alone and streamed into scoring),
+revalidation, bootstrap and warm load, scoring, squad selection, lineups
+(one squad, then a batch) and live gameweek polling against a synthetic
+league served by a local stub of the FPL API.
+
+Run from the repository root:
+
+    python -m benchmarks.suite --players 700 2000 --latency 0.02
+    python -m benchmarks.suite --players 700 --output new.json --compare old.json
+
+Results are written as JSON (see `--output`), so runs can be compared.
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import main
+from benchmarks.stub_server import StubServer
+from benchmarks.synthetic import SyntheticLeague
+from controllers.lineup import pick_lineups
+from controllers.live import LiveGameweek
+from controllers.streaming import StreamingScorer
+
+FRAME_TYPES = ("history", "history_past", "fixtures")
+
+
+def _timed(function, repeat, setup=None):
+    """Best, median and every timing of `function()`, plus its last result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function()
+        timings.append(time.perf_counter() - start)
+    return {"best": min(timings), "median": statistics.median(timings), "runs": timings}, result
+
+
+def _greedy_worker(df, queue):
+    # The greedy loop prompts about low-availability players; answer
+    # "consider availability".
+    start = time.perf_counter()
+    try:
+        with mock.patch("builtins.input", return_value="y"), contextlib.redirect_stdout(io.StringIO()):
+            team_df = main.select_team(df.copy())
+        queue.put(("ok", time.perf_counter() - start, team_df["Price"].sum()))
+    except Exception as exc:
+        queue.put(("error", time.perf_counter() - start, f"{type(exc).__name__}: {exc}"))
+
+
+def _greedy(df, timeout):
+    """Run the greedy select_team in a child process, since it can loop forever."""
+    context = multiprocessing.get_context("fork" if sys.platform != "win32" else "spawn")
+    queue = context.Queue()
+    process = context.Process(target=_greedy_worker, args=(df, queue))
+    process.start()
+    process.join(timeout)
+    if process.is_alive():
+        process.terminate()
+        process.join()
+        return {"error": f"timed out after {timeout}s"}
+    status, seconds, detail = queue.get()
+    if status == "ok":
+        return {"best": seconds, "median": seconds, "runs": [seconds], "cost": float(detail)}
+    return {"error": detail}
+
+
+def _age_http_cache():
+    """Make every cached response due for revalidation."""
+    http_cache = main.get_context().http_cache
+    for entry in http_cache.entries.values():
+        entry["checked"] = {kind: 0 for kind in entry.get("checked", {})}
+    http_cache.save()
+
+
+def run_size(players, args):
+    """Run every scenario on a league of `players` players; returns {scenario: result}."""
+    league = SyntheticLeague(players, args.gameweeks, args.played, seed=args.seed)
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="fpl-bench-")
+    cwd = os.getcwd()
+    with StubServer(league, args.latency) as stub, mock.patch.multiple(
+            main, BOOTSTRAP_URL=f"{stub.base_url}/bootstrap-static/", FIXTURES_URL=f"{stub.base_url}/fixtures/",
+            ELEMENT_SUMMARY_URL=f"{stub.base_url}/element-summary/{{player_id}}/"):
+        os.chdir(workdir)
+        try:
+            def fresh_context():
+                main._context = None
+
+            def cold_setup():
+                shutil.rmtree(main.BASE_DIR, ignore_errors=True)
+                fresh_context()
+                stub.reset_counts()
+
+            def fetch():
+                context = main.get_context()
+                table = context.player_table
+                context.fixture_index
+                fit_ids = table.columns["id"][table.availability() != 0].tolist()
+                main.fetch_gameweek_data_bulk(fit_ids, max_workers=args.workers,
+                                              requests_per_second=0, http_cache=context.http_cache)
+                return fit_ids
+
+            results["cold_fetch"], fit_ids = _timed(fetch, args.fetch_repeat, cold_setup)
+            results["cold_fetch"].update(players=len(fit_ids), **stub.counts)
+
+            # The same cold fetch, scored while it runs: time to the first
+            # provisional top 10 per position and to the final one.
+            def stream():
+                context = main.get_context()
+                started = time.perf_counter()
+                streamer = StreamingScorer(
+                    context.players_frame,
+                    lambda *batch: main.score_league(*batch, context.team_index, current_season=main.CURRENT_SEASON,
+                                                     decay_factor=main.DECAY_FACTOR),
+                    lambda player_ids: context.fixture_index.for_players(context.players_frame, player_ids))
+                first = None
+                for _ in streamer.run(main.stream_gameweek_data(fit_ids, http_cache=context.http_cache,
+                                                                max_workers=args.workers, requests_per_second=0)):
+                    first = first or time.perf_counter() - started
+                return first
+
+            results["stream_cold"], first_ranking = _timed(stream, args.fetch_repeat, cold_setup)
+            results["stream_cold"].update(first_ranking=first_ranking, **stub.counts)
+
+            def revalidate_setup():
+                fresh_context()
+                _age_http_cache()
+                stub.reset_counts()
+
+            results["revalidate_fetch"], _ = _timed(fetch, args.fetch_repeat, revalidate_setup)
+            results["revalidate_fetch"].update(stub.counts)
+
+            def bootstrap_load():
+                context = main.get_context()
+                return context.players, context.teams, context.player_table
+
+            results["bootstrap_load"], _ = _timed(bootstrap_load, args.repeat, fresh_context)
+
+            def warm_load():
+                context = main.get_context()
+                return context.players_frame, {
+                    data_type: main.read_gameweek_frame(fit_ids, data_type) for data_type in FRAME_TYPES}
+
+            results["warm_load"], (players_frame, frames) = _timed(warm_load, args.repeat, fresh_context)
+            with contextlib.redirect_stdout(io.StringIO()):
+                team_index = main.get_context().team_index
+            fit_df = players_frame[players_frame["id"].isin(fit_ids)]
+
+            def score():
+                return main.score_league(fit_df, frames["history"], frames["history_past"],
+                                         frames["fixtures"], team_index,
+                                         current_season=main.CURRENT_SEASON, decay_factor=main.DECAY_FACTOR)
+
+            results["scoring"], scores = _timed(score, args.repeat)
+
+            if args.reference:
+                table = main.get_context().player_table
+                rows = [table.player(player_id) for player_id in fit_ids]
+                results["scoring_reference"], _ = _timed(
+                    lambda: main.reference_scores(rows, frames, team_index), 1)
+
+            scores = scores.sort_values(by="Combined score", ascending=False)
+            results["select_exact"], squad = _timed(lambda: main.optimize_team(scores), args.repeat)
+            results["select_exact"]["cost"] = float(squad["Price"].sum())
+            if args.greedy_timeout:
+                results["select_greedy"] = _greedy(scores, args.greedy_timeout)
+
+            results["lineup_split"], _ = _timed(lambda: main.split_starters_and_bench(squad), args.repeat)
+
+            # Lineups of 10,000 random squads drawn from the scored league, in one call.
+            rng = np.random.default_rng(args.seed)
+            slots = np.concatenate([
+                rng.choice(np.flatnonzero(scores["Position"].to_numpy() == position), (10_000, count))
+                for position, count in main.POSITION_LIMITS.items()], axis=1)
+            points = scores["Gw score"].to_numpy()[slots]
+            positions = scores["Position"].to_numpy()[slots[0]]
+            results["lineup_batch"], _ = _timed(lambda: pick_lineups(points, positions), args.repeat)
+            results["lineup_batch"]["squads"] = len(points)
+
+            # A live gameweek polled every 5 match minutes until all matches are over:
+            # only the players whose stats changed are scored again.
+            context = main.get_context()
+            event = main.live_event()
+            live = LiveGameweek(event, fit_df, frames, team_index, scores, context.fixture_index.for_event(event))
+            changed = []
+
+            def live_poll():
+                payload = context.http_cache.get(f"{stub.base_url}/event/{event}/live/", ["live"])
+                changed.append(len(live.update(payload)) if payload is not None else 0)
+
+            results["live_poll"], _ = _timed(live_poll, 32)
+            results["live_poll"]["changed"] = changed
+        finally:
+            os.chdir(cwd)
+            main._context = None
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results, previous):
+    """Print the change in best time per scenario against an earlier run."""
+    print(f"\n{'size':>7} {'scenario':<18} {'before':>10} {'after':>10} {'change':>8}")
+    for size, scenarios in results["sizes"].items():
+        for name, result in scenarios.items():
+            before = previous.get("sizes", {}).get(size, {}).get(name, {})
+            if "best" not in result or "best" not in before:
+                continue
+            change = result["best"] / before["best"] - 1
+            print(f"{size:>7} {name:<18} {before['best']:>9.3f}s {result['best']:>9.3f}s {change:>+8.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, nargs="+", default=[700], help="league sizes to run")
+    parser.add_argument("--gameweeks", type=int, default=38)
+    parser.add_argument("--played", type=int, default=20, help="gameweeks already played")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.02, help="stub server delay per request, seconds")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent requests when fetching")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per in-memory scenario")
+    parser.add_argument("--fetch-repeat", type=int, default=1, help="runs per fetch scenario")
+    parser.add_argument("--reference", action="store_true",
+                        help="also time the per-player calculate_performance scoring")
+    parser.add_argument("--greedy-timeout", type=float, default=60,
+                        help="seconds before the greedy select_team is abandoned (0 skips it)")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", metavar="JSON", help="earlier results to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "numpy": np.__version__, "pandas": pd.__version__, "cpus": os.cpu_count()},
+        "settings": {key: value for key, value in vars(args).items() if key not in {"output", "compare"}},
+        "sizes": {},
+    }
+    for players in args.players:
+        print(f"Running {players} players...")
+        results["sizes"][str(players)] = scenarios = run_size(players, args)
+        for name, result in scenarios.items():
+            summary = f"{result['best']:.3f}s" if "best" in result else result["error"]
+            print(f"  {name:<18} {summary}")
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            compare(results, json.load(file))
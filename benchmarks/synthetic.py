@@ -0,0 +1,314 @@
+"""
+Synthetic FPL league data shaped like the `bootstrap-static`, `fixtures`,
+`element-summary/{id}` and `event/{event}/live` API payloads, for offline
+benchmarks.
+
+Everything is generated from the seed, so the same league (and the same
+payload for a player) comes out on every call and in every process.
+"""
+import random
+
+POSITION_WEIGHTS = {1: 0.11, 2: 0.34, 3: 0.39, 4: 0.16}
+PRICE_RANGES = {1: (40, 60), 2: (40, 75), 3: (45, 130), 4: (45, 145)}
+LIVE_STATS = [
+    "minutes", "goals_scored", "assists", "clean_sheets", "goals_conceded", "own_goals",
+    "penalties_saved", "penalties_missed", "yellow_cards", "red_cards", "saves", "bonus", "bps",
+    "influence", "creativity", "threat", "ict_index", "starts", "expected_goals", "expected_assists",
+    "expected_goal_involvements", "expected_goals_conceded", "total_points",
+]
+TEAM_NAMES = [
+    "Arsenal", "Aston Villa", "Bournemouth", "Brentford", "Brighton", "Chelsea",
+    "Crystal Palace", "Everton", "Fulham", "Ipswich", "Leicester", "Liverpool",
+    "Man City", "Man Utd", "Newcastle", "Nott'm Forest", "Southampton", "Spurs",
+    "West Ham", "Wolves",
+]
+
+
+def _decimal(value, places=2):
+    """The API sends most stats as decimal strings."""
+    return f"{value:.{places}f}"
+
+
+def _schedule(team_ids, rounds):
+    """Double round robin (circle method): {event: [(home, away), ...]}."""
+    teams = list(team_ids)
+    if len(teams) % 2:
+        teams.append(None)
+    half = len(teams) // 2
+    schedule = {}
+    for event in range(1, rounds + 1):
+        leg = (event - 1) // (len(teams) - 1)
+        pairs = []
+        for i in range(half):
+            home, away = teams[i], teams[-1 - i]
+            if home is None or away is None:
+                continue
+            if (event + i + leg) % 2:
+                home, away = away, home
+            pairs.append((home, away))
+        schedule[event] = pairs
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+    return schedule
+
+
+class SyntheticLeague:
+    """
+    A deterministic fake league.
+
+    Parameters:
+        players (int): Number of players in `elements`.
+        gameweeks (int): Gameweeks in the season.
+        played (int): Gameweeks already played (history rows); the rest are
+            upcoming fixtures.
+        seasons (int): Past seasons a player can have in `history_past`.
+        current_season (int): Start year of the current season.
+        seed (int): Seed for every random choice.
+    """
+
+    def __init__(self, players=700, gameweeks=38, played=20, seasons=5, current_season=2024, seed=0):
+        self.size = players
+        self.gameweeks = gameweeks
+        self.played = min(played, gameweeks)
+        self.seasons = seasons
+        self.current_season = current_season
+        self.seed = seed
+
+        rng = random.Random(seed)
+        self.teams = [self._team(rng, team_id) for team_id in range(1, len(TEAM_NAMES) + 1)]
+        self.schedule = _schedule([team["id"] for team in self.teams], gameweeks)
+        # A few upcoming matches are postponed and have no event yet.
+        self.postponed = {
+            (event, pair) for event in range(self.played + 1, gameweeks + 1)
+            for pair in self.schedule[event] if rng.random() < 0.02
+        }
+        self.elements = [self._element(rng, player_id) for player_id in range(1, players + 1)]
+        self.team_of = {element["id"]: element["team"] for element in self.elements}
+
+    @staticmethod
+    def _team(rng, team_id):
+        strength = rng.randint(2, 5)
+        base = 950 + strength * 70
+        team = {
+            "id": team_id, "code": team_id * 3, "name": TEAM_NAMES[team_id - 1],
+            "short_name": TEAM_NAMES[team_id - 1][:3].upper(), "strength": strength,
+            "played": 0, "win": 0, "draw": 0, "loss": 0, "points": 0, "position": 0,
+        }
+        for strength_type in ("overall", "attack", "defence"):
+            for venue, bonus in (("home", 40), ("away", 0)):
+                team[f"strength_{strength_type}_{venue}"] = base + bonus + rng.randint(-60, 60)
+        return team
+
+    def _element(self, rng, player_id):
+        position = rng.choices(list(POSITION_WEIGHTS), weights=list(POSITION_WEIGHTS.values()))[0]
+        low, high = PRICE_RANGES[position]
+        price = int(low + (high - low) * rng.random() ** 2.5)
+        quality = (price - low) / (high - low)
+        minutes = int(rng.random() * 90 * self.played)
+        starts = minutes // 80
+        total_points = int(minutes / 90 * (2 + 5 * quality) * rng.uniform(0.6, 1.3))
+        expected_goals = minutes / 90 * {1: 0.0, 2: 0.05, 3: 0.2, 4: 0.45}[position] * (0.5 + quality)
+        expected_assists = minutes / 90 * {1: 0.01, 2: 0.06, 3: 0.15, 4: 0.1}[position] * (0.5 + quality)
+        expected_goals_conceded = minutes / 90 * rng.uniform(0.8, 1.8)
+        influence, creativity, threat = (rng.uniform(0, 1) * minutes / 4 for _ in range(3))
+        return {
+            "id": player_id, "code": 100000 + player_id, "photo": f"{100000 + player_id}.jpg",
+            "first_name": "Player", "second_name": str(player_id), "web_name": f"Player {player_id}",
+            "element_type": position, "team": rng.randint(1, len(self.teams)), "now_cost": price,
+            "status": "a",
+            "chance_of_playing_next_round": rng.choices([None, 100, 75, 50, 25, 0],
+                                                        weights=[80, 8, 4, 3, 2, 3])[0],
+            "chance_of_playing_this_round": None,
+            "form": _decimal(rng.uniform(0, 8), 1),
+            "points_per_game": _decimal(total_points / max(starts, 1), 1),
+            "selected_by_percent": _decimal(rng.expovariate(1 / 5), 1),
+            "transfers_in_event": rng.randint(0, 50000), "transfers_out_event": rng.randint(0, 50000),
+            "minutes": minutes, "starts": starts, "total_points": total_points,
+            "bonus": rng.randint(0, 2 * starts // 5 + 1),
+            "goals_scored": int(expected_goals * rng.uniform(0.6, 1.4)),
+            "assists": int(expected_assists * rng.uniform(0.6, 1.4)),
+            "clean_sheets": int(starts * rng.uniform(0.1, 0.4)) if position < 4 else 0,
+            "goals_conceded": int(expected_goals_conceded), "own_goals": 0,
+            "penalties_saved": rng.randint(0, 2) if position == 1 else 0, "penalties_missed": 0,
+            "yellow_cards": rng.randint(0, 8), "red_cards": 0,
+            "saves": int(minutes / 90 * 3) if position == 1 else 0,
+            "influence": _decimal(influence, 1), "creativity": _decimal(creativity, 1),
+            "threat": _decimal(threat, 1), "ict_index": _decimal((influence + creativity + threat) / 10, 1),
+            "expected_goals": _decimal(expected_goals), "expected_assists": _decimal(expected_assists),
+            "expected_goal_involvements": _decimal(expected_goals + expected_assists),
+            "expected_goals_conceded": _decimal(expected_goals_conceded),
+            "influence_rank": rng.randint(1, self.size), "creativity_rank": rng.randint(1, self.size),
+            "threat_rank": rng.randint(1, self.size), "ict_index_rank": rng.randint(1, self.size),
+            "expected_goals_per_90": round(expected_goals / max(minutes, 1) * 90, 2),
+            "expected_assists_per_90": round(expected_assists / max(minutes, 1) * 90, 2),
+            "saves_per_90": round(3.0 if position == 1 else 0.0, 2),
+            "starts_per_90": round(starts / max(minutes, 1) * 90, 2),
+            "clean_sheets_per_90": round(rng.uniform(0, 0.4), 2),
+            "penalties_order": None, "corners_and_indirect_freekicks_order": None,
+            "direct_freekicks_order": None,
+        }
+
+    def bootstrap(self):
+        """The `bootstrap-static` payload."""
+        events = [{"id": event, "name": f"Gameweek {event}", "finished": event <= self.played,
+                   "is_current": event == self.played, "is_next": event == self.played + 1}
+                  for event in range(1, self.gameweeks + 1)]
+        element_types = [{"id": position, "singular_name_short": name, "squad_select": count}
+                         for position, name, count in ((1, "GKP", 2), (2, "DEF", 5), (3, "MID", 5), (4, "FWD", 3))]
+        return {"events": events, "teams": self.teams, "elements": self.elements,
+                "element_types": element_types, "total_players": 10_000_000}
+
+    def fixtures(self):
+        """The `fixtures` payload: every match of the season, played or not."""
+        strength = {team["id"]: team["strength"] for team in self.teams}
+        fixtures = []
+        for event in range(1, self.gameweeks + 1):
+            for home, away in self.schedule[event]:
+                fixture_id = event * 100 + home
+                postponed = (event, (home, away)) in self.postponed
+                fixtures.append({
+                    "id": fixture_id, "code": 2_400_000 + fixture_id,
+                    "event": None if postponed else event, "finished": event <= self.played,
+                    "kickoff_time": None if postponed else (
+                        f"{self.current_season}-08-{event:02d}T14:00:00Z" if event <= self.played
+                        else f"{self.current_season + 1}-01-{event % 28 + 1:02d}T15:00:00Z"),
+                    "minutes": 90 if event <= self.played else 0,
+                    "provisional_start_time": postponed,
+                    "team_h": home, "team_h_score": None, "team_a": away, "team_a_score": None,
+                    "team_h_difficulty": strength[away], "team_a_difficulty": strength[home],
+                    "stats": [],
+                })
+        return fixtures
+
+    def element_summary(self, player_id):
+        """
+        The `element-summary/{player_id}` payload, or None for an unknown player.
+        """
+        if player_id not in self.team_of:
+            return None
+        element = self.elements[player_id - 1]
+        team = self.team_of[player_id]
+        position = element["element_type"]
+        rng = random.Random(self.seed * 1_000_003 + player_id)
+        quality = (element["now_cost"] - PRICE_RANGES[position][0]) / 100
+
+        history = []
+        fixtures = []
+        for event in range(1, self.gameweeks + 1):
+            for home, away in self.schedule[event]:
+                if team not in (home, away):
+                    continue
+                fixture_id = event * 100 + home
+                if event <= self.played:
+                    minutes = rng.choices([0, rng.randint(1, 60), 90], weights=[2, 1, 5])[0]
+                    played = minutes / 90
+                    expected_goals = played * rng.uniform(0, 0.6) * (0.5 + quality)
+                    expected_assists = played * rng.uniform(0, 0.4) * (0.5 + quality)
+                    influence, creativity, threat = (rng.uniform(0, 40) * played for _ in range(3))
+                    history.append({
+                        "element": player_id, "fixture": fixture_id,
+                        "opponent_team": away if team == home else home,
+                        "total_points": int(played * rng.randint(1, 10)),
+                        "was_home": team == home, "kickoff_time": f"{self.current_season}-08-{event:02d}T14:00:00Z",
+                        "team_h_score": rng.randint(0, 4), "team_a_score": rng.randint(0, 4),
+                        "round": event, "minutes": minutes,
+                        "goals_scored": int(rng.random() < expected_goals),
+                        "assists": int(rng.random() < expected_assists),
+                        "clean_sheets": int(minutes >= 60 and rng.random() < 0.3),
+                        "goals_conceded": rng.randint(0, 3) if minutes else 0,
+                        "own_goals": 0, "penalties_saved": 0, "penalties_missed": 0,
+                        "yellow_cards": int(rng.random() < 0.1), "red_cards": 0,
+                        "saves": rng.randint(0, 6) if position == 1 and minutes else 0,
+                        "bonus": rng.choices([0, 1, 2, 3], weights=[20, 2, 1, 1])[0] if minutes else 0,
+                        "bps": rng.randint(0, 40) if minutes else 0,
+                        "influence": _decimal(influence, 1), "creativity": _decimal(creativity, 1),
+                        "threat": _decimal(threat, 1), "ict_index": _decimal((influence + creativity + threat) / 10, 1),
+                        "starts": int(minutes >= 60),
+                        "expected_goals": _decimal(expected_goals), "expected_assists": _decimal(expected_assists),
+                        "expected_goal_involvements": _decimal(expected_goals + expected_assists),
+                        "expected_goals_conceded": _decimal(played * rng.uniform(0, 2.5)),
+                        "value": element["now_cost"], "transfers_balance": rng.randint(-5000, 5000),
+                        "selected": rng.randint(0, 1_000_000),
+                        "transfers_in": rng.randint(0, 10000), "transfers_out": rng.randint(0, 10000),
+                    })
+                else:
+                    postponed = (event, (home, away)) in self.postponed
+                    fixtures.append({
+                        "id": fixture_id, "code": 2_400_000 + fixture_id,
+                        "team_h": home, "team_h_score": None, "team_a": away, "team_a_score": None,
+                        "event": None if postponed else event, "finished": False, "minutes": 0,
+                        "provisional_start_time": postponed,
+                        "kickoff_time": None if postponed else f"{self.current_season + 1}-01-{event % 28 + 1:02d}T15:00:00Z",
+                        "event_name": None if postponed else f"Gameweek {event}",
+                        "is_home": team == home, "difficulty": rng.randint(2, 5),
+                    })
+        fixtures.sort(key=lambda fixture: (fixture["event"] is None, fixture["event"] or 0))
+
+        history_past = []
+        for year in range(self.current_season - self.seasons, self.current_season):
+            if rng.random() < 0.6:
+                minutes = rng.randint(0, 3420)
+                played = minutes / 90
+                influence, creativity, threat = (rng.uniform(0, 25) * played for _ in range(3))
+                expected_goals = played * rng.uniform(0, 0.5) * (0.5 + quality)
+                expected_assists = played * rng.uniform(0, 0.3) * (0.5 + quality)
+                history_past.append({
+                    "season_name": f"{year}/{str(year + 1)[2:]}", "element_code": element["code"],
+                    "start_cost": element["now_cost"], "end_cost": element["now_cost"] + rng.randint(-5, 5),
+                    "total_points": int(played * rng.uniform(1, 6)), "minutes": minutes,
+                    "goals_scored": int(expected_goals), "assists": int(expected_assists),
+                    "clean_sheets": int(played * rng.uniform(0, 0.3)), "goals_conceded": int(played * 1.3),
+                    "own_goals": 0, "penalties_saved": 0, "penalties_missed": 0,
+                    "yellow_cards": rng.randint(0, 10), "red_cards": 0, "saves": 0,
+                    "bonus": rng.randint(0, 20), "bps": int(played * 15),
+                    "influence": _decimal(influence, 1), "creativity": _decimal(creativity, 1),
+                    "threat": _decimal(threat, 1), "ict_index": _decimal((influence + creativity + threat) / 10, 1),
+                    "starts": int(played),
+                    "expected_goals": _decimal(expected_goals), "expected_assists": _decimal(expected_assists),
+                    "expected_goal_involvements": _decimal(expected_goals + expected_assists),
+                    "expected_goals_conceded": _decimal(played * rng.uniform(0.8, 1.8)),
+                })
+
+        return {"fixtures": fixtures, "history": history, "history_past": history_past}
+
+    def live(self, event, minute):
+        """
+        The `event/{event}/live` payload `minute` minutes after the first
+        kickoff. Matches kick off in three slots 30 minutes apart; a
+        player's stats grow with the match minute towards their final line
+        and bonus points are only added once the match is over.
+        """
+        elements = []
+        slot = {}
+        for i, (home, away) in enumerate(self.schedule.get(event, [])):
+            slot[home] = slot[away] = i % 3
+        for element in self.elements:
+            player_id, team = element["id"], element["team"]
+            stats = dict.fromkeys(LIVE_STATS, 0)
+            if team in slot:
+                rng = random.Random((self.seed * 1_000_003 + player_id) * 1_009 + event)
+                final_minutes = rng.choices([0, rng.randint(1, 60), 90], weights=[2, 1, 5])[0]
+                clock = min(max(minute - slot[team] * 30, 0), 90)
+                played = min(clock, final_minutes)
+                share = played / 90
+                quality = (element["now_cost"] - PRICE_RANGES[element["element_type"]][0]) / 100
+                influence, creativity, threat = (rng.uniform(0, 40) * share for _ in range(3))
+                expected_goals = share * rng.uniform(0, 0.6) * (0.5 + quality)
+                expected_assists = share * rng.uniform(0, 0.4) * (0.5 + quality)
+                bonus = rng.choices([0, 1, 2, 3], weights=[20, 2, 1, 1])[0]
+                bonus = bonus if final_minutes and clock == 90 else 0
+                points = int(rng.randint(1, 10) * share) + bonus
+                stats.update({
+                    "minutes": played, "total_points": points, "bonus": bonus,
+                    "bps": int(rng.randint(0, 40) * share),
+                    "goals_scored": int(rng.random() < expected_goals),
+                    "assists": int(rng.random() < expected_assists),
+                    "influence": _decimal(influence, 1), "creativity": _decimal(creativity, 1),
+                    "threat": _decimal(threat, 1),
+                    "ict_index": _decimal((influence + creativity + threat) / 10, 1),
+                    "expected_goals": _decimal(expected_goals), "expected_assists": _decimal(expected_assists),
+                    "expected_goal_involvements": _decimal(expected_goals + expected_assists),
+                    "expected_goals_conceded": _decimal(share * rng.uniform(0, 2.5)),
+                    "starts": int(final_minutes >= 60 and played > 0),
+                })
+            elements.append({"id": player_id, "stats": stats, "explain": []})
+        return {"elements": elements}
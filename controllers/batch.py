@@ -0,0 +1,163 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from controllers.planner import best_xi_points
+
+
+def load_squads(path, free_transfers=1):
+    """
+    Read managers' squads from a CSV or JSON file.
+
+    A CSV needs "manager" and "player_ids" (15 IDs separated by spaces)
+    columns; a JSON file is a list of objects with the same keys and a list
+    of IDs. "bank" (£m) and "free_transfers" are optional in both.
+
+    Returns:
+        list: One dict per squad with "manager", "player_ids", "bank" and
+        "free_transfers".
+    """
+    if os.path.splitext(path)[1].lower() == ".json":
+        with open(path, encoding="utf-8") as file:
+            records = json.load(file)
+    else:
+        records = pd.read_csv(path, dtype={"player_ids": str}).to_dict(orient="records")
+
+    squads = []
+    for record in records:
+        player_ids = record["player_ids"]
+        if isinstance(player_ids, str):
+            player_ids = player_ids.replace(",", " ").split()
+        squads.append({
+            "manager": record["manager"],
+            "player_ids": [int(player_id) for player_id in player_ids],
+            "bank": float(_value(record.get("bank"), 0.0)),
+            "free_transfers": int(_value(record.get("free_transfers"), free_transfers)),
+        })
+    return squads
+
+
+def _value(value, default):
+    return default if value is None or pd.isna(value) else value
+
+
+def _squad_rows(planner, squads):
+    """
+    Planner rows of every squad, grouped by position as best_xi_points
+    expects, and an error message (None if valid) per squad.
+    """
+    squad_size = sum(planner.position_limits.values())
+    layout = np.repeat(np.arange(len(planner.position_limits)), list(planner.position_limits.values()))
+    rank = np.array([planner.position_order.get(position, -1) for position in planner.positions])
+    rows = np.zeros((len(squads), squad_size), dtype=np.int64)
+    errors = []
+    for i, squad in enumerate(squads):
+        unknown = [player_id for player_id in squad["player_ids"] if player_id not in planner.row]
+        if unknown:
+            errors.append(f"Unknown player IDs in the squad: {unknown}")
+            continue
+        squad_rows = sorted((planner.row[player_id] for player_id in squad["player_ids"]),
+                            key=lambda row: (rank[row], row))
+        if len(squad_rows) != squad_size or not (rank[squad_rows] == layout).all():
+            errors.append(f"The squad must have {planner.position_limits} players per position.")
+            continue
+        rows[i] = squad_rows
+        errors.append(None)
+    return rows, errors
+
+
+def recommend_squads(planner, squads, horizon, max_transfers=2, chunk_size=200):
+    """
+    Transfer recommendations for many squads from one scored league.
+
+    Every squad is evaluated in the same NumPy pass: each round tries every
+    (squad slot, incoming candidate) swap for all squads at once, scores the
+    resulting best XIs over the next `horizon` gameweeks and keeps each
+    squad's best swap if it gains more than it costs (free transfers first,
+    then `planner.hit_cost` each). This is a greedy, single-gameweek decision
+    rather than the multi-gameweek search of `TransferPlanner.plan`, which
+    takes seconds per squad.
+
+    Parameters:
+        planner (TransferPlanner): Built once from the league's projections.
+        squads (list): As returned by `load_squads`.
+        horizon (int): Gameweeks the transfers are judged over.
+        max_transfers (int): Most transfers recommended per squad.
+        chunk_size (int): Squads evaluated per NumPy pass, to bound memory.
+
+    Returns:
+        pd.DataFrame: One row per squad, in input order: projected points
+        over the horizon when holding, after the recommended transfers
+        (net of hits), the gain, the transfers (out ID, in ID), hits, bank
+        left, and an "error" for squads that could not be evaluated.
+    """
+    horizon = min(horizon, len(planner.events))
+    rows, errors = _squad_rows(planner, squads)
+    bank = np.array([int(round(squad["bank"] * 10)) for squad in squads], dtype=np.int64)
+    free = np.array([squad["free_transfers"] for squad in squads])
+    points = planner.points[:, :horizon]
+
+    # Incoming candidates per squad slot, padded with -1.
+    candidates = planner.candidates(horizon)
+    slot_positions = np.repeat(list(planner.position_limits), list(planner.position_limits.values()))
+    width = max(len(rows_) for rows_ in candidates.values())
+    slot_candidates = np.full((len(slot_positions), width), -1, dtype=np.int64)
+    for slot, position in enumerate(slot_positions):
+        slot_candidates[slot, :len(candidates[position])] = candidates[position]
+    squad_size = len(slot_positions)
+    replace = np.eye(squad_size, dtype=bool)[:, None, :]  # (slot, 1, slot)
+
+    def xi_totals(squad_rows):
+        return best_xi_points(points[squad_rows], planner.position_limits).sum(axis=-1)
+
+    hold = xi_totals(rows)
+    current = hold.copy()
+    transfers = [[] for _ in squads]
+    hits = np.zeros(len(squads), dtype=np.int64)
+    active = np.array([error is None for error in errors])
+    for round_ in range(max_transfers):
+        for start in range(0, len(squads), chunk_size):
+            chunk = np.flatnonzero(active[start:start + chunk_size]) + start
+            if not len(chunk):
+                continue
+            squad_rows = rows[chunk]
+            # trial[i, s, k] is squad i with slot s swapped for candidate k.
+            incoming = np.broadcast_to(slot_candidates, (len(chunk),) + slot_candidates.shape)
+            trial = np.where(replace[None], incoming[..., None], squad_rows[:, None, None, :])
+            feasible = incoming >= 0
+            feasible &= ~(incoming[..., None] == squad_rows[:, None, None, :]).any(axis=-1)
+            feasible &= planner.prices[incoming] <= (bank[chunk, None] + planner.prices[squad_rows])[..., None]
+            clubs = planner.clubs[trial]
+            club_counts = (clubs[..., :, None] == clubs[..., None, :]).sum(axis=-1)
+            feasible &= (club_counts <= planner.max_per_team).all(axis=-1)
+
+            gain = np.where(feasible, xi_totals(np.where(feasible[..., None], trial, 0)), -np.inf)
+            gain = gain.reshape(len(chunk), -1) - current[chunk, None]
+            best = gain.argmax(axis=1)
+            best_gain = gain[np.arange(len(chunk)), best]
+            cost = np.where(round_ >= free[chunk], planner.hit_cost, 0)
+            take = best_gain > cost
+            for i, flat in zip(chunk[take], best[take]):
+                slot, k = divmod(int(flat), width)
+                out, new = rows[i, slot], slot_candidates[slot, k]
+                bank[i] += planner.prices[out] - planner.prices[new]
+                rows[i, slot] = new
+                transfers[i].append((int(planner.ids[out]), int(planner.ids[new])))
+            current[chunk[take]] += best_gain[take]
+            hits[chunk[take]] += cost[take] > 0
+            active[chunk[~take]] = False
+
+    valid = np.array([error is None for error in errors])
+    value = current - hits * planner.hit_cost
+    return pd.DataFrame({
+        "manager": [squad["manager"] for squad in squads],
+        "hold": np.where(valid, hold, np.nan),
+        "recommended": np.where(valid, value, np.nan),
+        "gain": np.where(valid, value - hold, np.nan),
+        "transfers": transfers,
+        "hits": hits,
+        "bank": bank / 10,
+        "error": errors,
+    })
@@ -0,0 +1,155 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from controllers.lineup import pick_lineups
+from controllers.optimizer import optimize_squad
+
+CHIPS = ("wildcard", "free_hit", "bench_boost", "triple_captain")
+
+
+class ChipPlanner:
+    """
+    Decide when to play the Wildcard, Free Hit, Bench Boost and Triple
+    Captain over the remaining gameweeks.
+
+    Every gameweek the squad scores its best XI (`pick_lineups`), with the
+    captain's points counted twice. A Bench Boost adds the bench, a Triple
+    Captain the captain's points once more, a Free Hit plays that
+    gameweek's best squad for one week and a Wildcard switches to the best
+    squad for the rest of the season. At most one chip is played per
+    gameweek.
+
+    Every timing of every chip is compared by dynamic programming over
+    (gameweek, squad, chips left) states, memoized so each state is solved
+    once. The squad is the current one or the Wildcard squad of the
+    gameweek it was played in, so there are only (gameweeks + 1) squads,
+    and each gameweek's Free Hit and Wildcard squads are optimized once and
+    cached. Regular transfers are left to TransferPlanner: between chips the
+    squad is held.
+    """
+
+    def __init__(self, players, projections, position_limits, max_per_team=3, solver=None):
+        """
+        Parameters:
+            players (pd.DataFrame): "ID", "Position", "Price" and "team" for
+                every player that may be in or join the squad.
+            projections (pd.DataFrame): Projected points per player ID (index)
+                and upcoming gameweek (columns, in order), e.g. from
+                `project_gameweeks`.
+            position_limits (dict): Squad size per position.
+            max_per_team (int): Maximum players from a single club.
+            solver (str): Passed to `optimize_squad`.
+        """
+        self.players = players.drop_duplicates("ID").reset_index(drop=True)
+        self.position_limits = position_limits
+        self.max_per_team = max_per_team
+        self.solver = solver
+        self.events = list(projections.columns)
+        self.points = projections.reindex(self.players["ID"], fill_value=0.0).to_numpy(dtype=float)
+        self.row = {player_id: row for row, player_id in enumerate(self.players["ID"])}
+        self.squads = {}
+        self.lineups = {}
+
+    def _optimize(self, score, budget):
+        """Rows of the squad with the highest total `score` under `budget`."""
+        pool = self.players.assign(_score=score, _row=np.arange(len(self.players)))
+        squad = optimize_squad(pool, "_score", budget, self.position_limits, self.max_per_team, self.solver)
+        return tuple(squad["_row"])
+
+    def _squad(self, key, budget):
+        """
+        The squad rows for a key: ("current", rows), ("wildcard", t) for the
+        best squad over gameweeks t onwards under `budget`, or ("free_hit", t)
+        for the best squad for gameweek t alone.
+        """
+        kind, value = key
+        if kind == "current":
+            return value
+        if (key, budget) not in self.squads:
+            score = self.points[:, value:].sum(axis=1) if kind == "wildcard" else self.points[:, value]
+            self.squads[(key, budget)] = self._optimize(score, budget)
+        return self.squads[(key, budget)]
+
+    def _lineups(self, key, budget):
+        """Per-gameweek (XI points with the captain doubled, bench points, captain points) of a squad."""
+        if (key, budget) not in self.lineups:
+            rows = list(self._squad(key, budget))
+            points = self.points[rows].T
+            lineup = pick_lineups(points, self.players["Position"].to_numpy()[rows])
+            bench = np.take_along_axis(points, lineup["bench"], axis=1).sum(axis=1)
+            captain = points[np.arange(len(points)), lineup["captain"]]
+            self.lineups[(key, budget)] = (lineup["points"], bench, captain)
+        return self.lineups[(key, budget)]
+
+    def plan(self, squad_ids, bank, chips=CHIPS):
+        """
+        The best chip timing for the current squad.
+
+        Parameters:
+            squad_ids (list): IDs of the current 15 players.
+            bank (float): Money in the bank in £m; the squad value plus the
+                bank is the Wildcard and Free Hit budget.
+            chips (iterable): Chips still available.
+
+        Returns:
+            dict: "total" projected points with the chips, "without_chips"
+            for holding the squad, "gameweeks", a list with the event, chip
+            played (or None) and projected points per gameweek, and
+            "timings", a DataFrame with the season total when each chip is
+            played alone in each gameweek.
+        """
+        unknown = [player_id for player_id in squad_ids if player_id not in self.row]
+        if unknown:
+            raise ValueError(f"Unknown player IDs in the squad: {unknown}")
+        unknown = set(chips) - set(CHIPS)
+        if unknown:
+            raise ValueError(f"Unknown chips {sorted(unknown)}. Use {list(CHIPS)}.")
+        chips = tuple(chip for chip in CHIPS if chip in set(chips))
+        rows = tuple(self.row[player_id] for player_id in squad_ids)
+        squad_counts = self.players["Position"].iloc[list(rows)].value_counts()
+        if any(squad_counts.get(position, 0) != count for position, count in self.position_limits.items()):
+            raise ValueError(f"The squad must have {self.position_limits} players per position.")
+        budget = round(bank + float(self.players["Price"].iloc[list(rows)].sum()), 1)
+        current = ("current", rows)
+        horizon = len(self.events)
+
+        def gameweek_points(squad, chip, t):
+            """(points in gameweek t, squad from gameweek t + 1)."""
+            if chip == "wildcard":
+                squad = ("wildcard", t)
+            elif chip == "free_hit":
+                return self._lineups(("free_hit", t), budget)[0][t], squad
+            xi, bench, captain = self._lineups(squad, budget)
+            return xi[t] + (bench[t] if chip == "bench_boost" else 0) \
+                + (captain[t] if chip == "triple_captain" else 0), squad
+
+        @lru_cache(maxsize=None)
+        def best(t, squad, left):
+            """Best (points, chip per gameweek) from gameweek t with chips `left`."""
+            if t == horizon:
+                return 0.0, ()
+            options = []
+            for chip in (None,) + left:
+                points, next_squad = gameweek_points(squad, chip, t)
+                rest, choices = best(t + 1, next_squad, tuple(c for c in left if c != chip))
+                options.append((points + rest, (chip,) + choices))
+            return max(options, key=lambda option: option[0])
+
+        total, choices = best(0, current, chips)
+        gameweeks, squad = [], current
+        for t, chip in enumerate(choices):
+            points, squad = gameweek_points(squad, chip, t)
+            gameweeks.append({"event": self.events[t], "chip": chip, "projected": float(points)})
+
+        # Every single-chip timing, from the same memoized states.
+        hold = self._lineups(current, budget)[0]
+        timings = pd.DataFrame(index=pd.Index(self.events, name="event"))
+        for chip in chips:
+            timings[chip] = [
+                hold[:t].sum() + gameweek_points(current, chip, t)[0]
+                + best(t + 1, gameweek_points(current, chip, t)[1], ())[0]
+                for t in range(horizon)]
+        return {"total": float(total), "without_chips": float(hold.sum()), "gameweeks": gameweeks,
+                "timings": timings}
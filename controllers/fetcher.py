@@ -0,0 +1,176 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from controllers.instrumentation import PROFILER
+from controllers.snapshot import decode
+
+ELEMENT_SUMMARY_URL = "https://fantasy.premierleague.com/api/element-summary/{player_id}/"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# The element-summary data kept per player. Its fixtures are the club's and
+# come from the league-wide fixtures endpoint instead.
+SUMMARY_KINDS = ("history", "history_past")
+
+
+class RateLimiter:
+    """
+    Hand out request slots so that no more than `requests_per_second` requests
+    start in any second, across every thread sharing the limiter.
+    """
+
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ElementSummaryFetcher:
+    """
+    Fetch `element-summary/{id}` payloads for many players at once.
+
+    Requests run on a bounded thread pool and share one keep-alive session,
+    so connections to the FPL API are reused instead of re-opened per player.
+    Failed requests (connection errors, 429 and 5xx responses) are retried
+    with exponential backoff. With an `HttpCache`, requests are conditional
+    and payloads that have not changed come back as None.
+    """
+
+    def __init__(self, max_workers=8, requests_per_second=10, retries=3,
+                 backoff=0.5, timeout=10, url=ELEMENT_SUMMARY_URL, http_cache=None):
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.url = url
+        self.http_cache = http_cache
+        self.rate_limiter = RateLimiter(requests_per_second)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch_one(self, player_id):
+        """
+        Fetch the element-summary payload for a single player.
+
+        Parameters:
+            player_id (int): The ID of the player.
+
+        Returns:
+            dict: The decoded JSON payload, or None if it has not changed
+            since the copy known to the HTTP cache.
+        """
+        url = self.url.format(player_id=player_id)
+        headers = self.http_cache.conditional_headers(url) if self.http_cache else {}
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.wait()
+            try:
+                response = self.session.get(url, timeout=self.timeout, headers=headers)
+                PROFILER.count("http_requests")
+                PROFILER.count("http_bytes", len(response.content))
+                if response.status_code not in RETRY_STATUSES:
+                    if response.status_code != 304:
+                        response.raise_for_status()
+                    data = None if response.status_code == 304 else decode(response.content)
+                    if data is None:
+                        PROFILER.count("http_not_modified")
+                    if self.http_cache:
+                        self.http_cache.record(url, response, SUMMARY_KINDS)
+                    return data
+                error = requests.HTTPError(
+                    f"{response.status_code} for {url}", response=response)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = exc
+
+            if attempt == self.retries:
+                raise error
+            time.sleep(self.backoff * (2 ** attempt))
+
+    def stream(self, player_ids, window=None):
+        """
+        Fetch element-summary payloads concurrently and yield them as they
+        arrive. The first requests start at once, before the results are
+        iterated, and at most `window` requests (default: twice
+        `max_workers`) are queued or in flight, so payloads are never held
+        for more players than that, however many are requested.
+
+        Returns:
+            generator: (player ID, payload or None when unchanged, exception
+            or None) tuples in completion order.
+        """
+        window = window or self.max_workers * 2
+        player_ids = iter(player_ids)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = {}
+
+        def submit():
+            for player_id in player_ids:
+                pending[executor.submit(self.fetch_one, player_id)] = player_id
+                if len(pending) >= window:
+                    break
+
+        def results():
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        player_id = pending.pop(future)
+                        try:
+                            result = player_id, future.result(), None
+                        except Exception as exc:
+                            result = player_id, None, exc
+                        yield result
+                    submit()
+            finally:
+                executor.shutdown(cancel_futures=True)
+
+        submit()
+        return results()
+
+    def fetch_many(self, player_ids, on_result=None):
+        """
+        Fetch element-summary payloads for many players concurrently.
+
+        Parameters:
+            player_ids (iterable): The IDs of the players to fetch.
+            on_result (callable): Optional `on_result(player_id, data)` called
+                from the calling thread as each changed payload arrives.
+
+        Returns:
+            tuple: (results, failures) where results maps player ID to payload
+            (None when unchanged) and failures maps player ID to the exception
+            that was raised.
+        """
+        results = {}
+        failures = {}
+        for player_id, data, error in self.stream(player_ids):
+            if error is not None:
+                failures[player_id] = error
+                continue
+            results[player_id] = data
+            if on_result and data is not None:
+                on_result(player_id, data)
+        return results, failures
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
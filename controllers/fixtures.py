@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+# The per-player fixture fields of an element-summary payload, as derived
+# from the league fixtures.
+PLAYER_FIXTURE_COLUMNS = [
+    "id", "code", "team_h", "team_h_score", "team_a", "team_a_score", "event", "finished",
+    "minutes", "provisional_start_time", "kickoff_time", "is_home", "difficulty",
+]
+
+
+class FixtureIndex:
+    """
+    The league's fixtures (the `fixtures` endpoint), loaded once and indexed
+    by team and event.
+
+    A player's upcoming fixtures are their club's unfinished fixtures, so
+    they are derived from `Player.team` here instead of being fetched and
+    stored once per player. Each club's fixtures are kept in event order
+    (postponed, unscheduled ones last), as element-summary lists them.
+    """
+
+    def __init__(self, fixtures):
+        """
+        Parameters:
+            fixtures (list | pd.DataFrame): League fixtures with "id",
+                "event", "team_h", "team_a", "finished" and, optionally,
+                "team_h_difficulty", "team_a_difficulty" and "kickoff_time".
+        """
+        df = fixtures.copy() if isinstance(fixtures, pd.DataFrame) else pd.DataFrame(fixtures)
+        # Per-fixture match stats are nested lists and not needed here.
+        df = df.drop(columns="stats", errors="ignore")
+        for column in ("team_h_difficulty", "team_a_difficulty", "kickoff_time"):
+            if column not in df.columns:
+                df[column] = None
+        if "finished" in df.columns:
+            df = df[~df["finished"].fillna(False).astype(bool)]
+        df = df.assign(_unscheduled=df["event"].isna()).sort_values(
+            ["_unscheduled", "event", "kickoff_time", "id"], kind="stable").drop(columns="_unscheduled")
+        self.upcoming = df.reset_index(drop=True)
+
+        # One row per (club, fixture), from that club's point of view.
+        sides = [
+            self.upcoming.assign(team=self.upcoming["team_h"], is_home=True,
+                                 difficulty=self.upcoming["team_h_difficulty"]),
+            self.upcoming.assign(team=self.upcoming["team_a"], is_home=False,
+                                 difficulty=self.upcoming["team_a_difficulty"]),
+        ]
+        by_team = pd.concat(sides).sort_index(kind="stable")
+        self.by_team = by_team.sort_values("team", kind="stable").reset_index(drop=True)
+        teams = self.by_team["team"].to_numpy()
+        starts = np.flatnonzero(np.r_[True, teams[1:] != teams[:-1]]) if len(teams) else []
+        stops = list(starts[1:]) + [len(teams)]
+        self.team_slices = {int(teams[start]): slice(start, stop) for start, stop in zip(starts, stops)}
+
+    def for_team(self, team):
+        """A club's upcoming fixtures, in element-summary's fixture format."""
+        rows = self.by_team.iloc[self.team_slices.get(int(team), slice(0, 0))]
+        return rows[[column for column in PLAYER_FIXTURE_COLUMNS if column in rows.columns]].reset_index(drop=True)
+
+    def for_event(self, event):
+        """The fixtures of one gameweek."""
+        return self.upcoming[self.upcoming["event"] == event].reset_index(drop=True)
+
+    def for_players(self, players, player_ids=None):
+        """
+        Upcoming fixtures of many players as one long-format frame, like
+        `read_gameweek_frame(..., 'fixtures')` used to read from the
+        per-player files.
+
+        Parameters:
+            players (pd.DataFrame): Bootstrap rows with "id" and "team".
+            player_ids (iterable): Only these players, in this order.
+
+        Returns:
+            pd.DataFrame: Fixture rows with a `player_id` column.
+        """
+        teams = players.set_index("id")["team"]
+        if player_ids is not None:
+            teams = teams.reindex(list(player_ids)).dropna()
+        columns = [column for column in PLAYER_FIXTURE_COLUMNS if column in self.by_team.columns]
+        owners = pd.DataFrame({"player_id": teams.index.astype(np.int64), "team": teams.to_numpy(dtype=np.int64)})
+        return owners.merge(self.by_team[columns + ["team"]], on="team", how="inner", sort=False) \
+            .drop(columns="team")[columns + ["player_id"]]
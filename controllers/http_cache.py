@@ -0,0 +1,122 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+
+from controllers.instrumentation import PROFILER
+from controllers.snapshot import decode
+
+logger = logging.getLogger("fpl_buddy")
+
+HOUR = 3600
+# How long each kind of data is trusted before it is revalidated. Prices and
+# availability in bootstrap-static change daily, gameweek history after every
+# gameweek, fixtures when matches are rescheduled and past seasons hardly ever;
+# live gameweek stats change by the minute.
+DEFAULT_TTLS = {
+    "live": 60,
+    "bootstrap": 12 * HOUR,
+    "history": 24 * HOUR,
+    "fixtures": 72 * HOUR,
+    "history_past": 30 * 24 * HOUR,
+}
+
+
+class HttpCache:
+    """
+    Validators and freshness for cached API responses, persisted as JSON.
+
+    For every URL it keeps the ETag and Last-Modified headers of the last
+    response and when each kind of data it carries was last confirmed. Data
+    younger than its kind's TTL is used without a request. Older data is
+    revalidated with a conditional request, and a 304 Not Modified response
+    only renews the timestamps, so unchanged resources cost no body download.
+    """
+
+    def __init__(self, path, ttls=None):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as file:
+                    self.entries = json.load(file)
+            except (OSError, ValueError):
+                logger.warning("Ignoring unreadable HTTP cache %s", path)
+
+    def is_stale(self, url, kinds, saved_at=None):
+        """
+        Whether any of `kinds` for `url` is older than its TTL. Kinds never
+        checked through the cache count from `saved_at`, when the local copy
+        was written (e.g. a file's mtime), or are stale if that is unknown.
+        """
+        with self.lock:
+            checked = self.entries.get(url, {}).get("checked", {})
+        now = time.time()
+        return any(now - checked.get(kind, saved_at or 0) > self.ttls[kind] for kind in kinds)
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since headers for revalidating `url`."""
+        with self.lock:
+            entry = self.entries.get(url, {})
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record(self, url, response, kinds):
+        """
+        Store the validators of a 200 or 304 response and mark `kinds` as
+        confirmed now.
+        """
+        now = time.time()
+        with self.lock:
+            entry = self.entries.setdefault(url, {"checked": {}})
+            if response.status_code != 304:
+                entry["etag"] = response.headers.get("ETag")
+                entry["last_modified"] = response.headers.get("Last-Modified")
+            for kind in kinds:
+                entry["checked"][kind] = now
+
+    def forget(self, url):
+        """Drop `url`, e.g. when the local copy is gone and cannot be revalidated."""
+        with self.lock:
+            self.entries.pop(url, None)
+
+    def get(self, url, kinds, session=None, timeout=10, raw=False):
+        """
+        Conditionally GET `url` and record the response.
+
+        Returns:
+            dict: The decoded JSON payload (the body as bytes with `raw`),
+            or None if it has not changed.
+        """
+        response = (session or requests).get(url, headers=self.conditional_headers(url), timeout=timeout)
+        PROFILER.count("http_requests")
+        PROFILER.count("http_bytes", len(response.content))
+        if response.status_code == 304:
+            PROFILER.count("http_not_modified")
+        if response.status_code != 304:
+            response.raise_for_status()
+        self.record(url, response, kinds)
+        if response.status_code == 304:
+            return None
+        return response.content if raw else decode(response.content)
+
+    def save(self):
+        """Write the cache to disk atomically."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            data = json.dumps(self.entries)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(data)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,110 @@
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+_DISABLED = nullcontext()
+
+
+class Profiler:
+    """
+    Wall time, call counts, counters and peak memory per pipeline stage.
+
+    Stages nest (`with profiler.stage("fetch"):`), and counters such as HTTP
+    requests or cache hits are added to the innermost running stage, from any
+    thread. While disabled, `stage` hands back a shared no-op context manager
+    and `count` returns at once, so instrumented code pays almost nothing.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.track_memory = False
+        self.stages = {}
+        self.stack = []
+        self.lock = threading.Lock()
+
+    def enable(self, track_memory=True):
+        """Start recording. Memory tracking uses tracemalloc, which slows Python down."""
+        self.enabled = True
+        self.track_memory = track_memory
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage(self, name):
+        if not self.enabled:
+            return _DISABLED
+        return _Stage(self, name)
+
+    def count(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            counters = self.stages[self.stack[-1]]["counters"] if self.stack else \
+                self.stages.setdefault("(outside stages)", _new_stats())["counters"]
+            counters[name] = counters.get(name, 0) + amount
+
+    def report(self):
+        """
+        Returns:
+            dict: Stage name to seconds, calls, counters and peak traced
+            memory in bytes (None without memory tracking), in the order the
+            stages first ran.
+        """
+        return {name: dict(stats, counters=dict(stats["counters"])) for name, stats in self.stages.items()}
+
+    def print_report(self):
+        print(f"\n{'stage':<28} {'calls':>6} {'seconds':>9} {'peak MB':>9}  counters")
+        for name, stats in self.report().items():
+            peak = f"{stats['peak_memory'] / 1e6:.1f}" if stats["peak_memory"] is not None else "-"
+            counters = ", ".join(f"{key}={value:,}" for key, value in stats["counters"].items())
+            print(f"{name:<28} {stats['calls']:>6} {stats['seconds']:>9.3f} {peak:>9}  {counters}")
+
+    def save_report(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, indent=2)
+
+
+def _new_stats():
+    return {"calls": 0, "seconds": 0.0, "peak_memory": None, "counters": {}}
+
+
+class _Stage:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        profiler = self.profiler
+        with profiler.lock:
+            if profiler.stack and profiler.track_memory:
+                # Fold the parent's peak so far into it before resetting.
+                _record_peak(profiler.stages[profiler.stack[-1]])
+            profiler.stages.setdefault(self.name, _new_stats())["calls"] += 1
+            profiler.stack.append(self.name)
+        if profiler.track_memory:
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        profiler = self.profiler
+        with profiler.lock:
+            stats = profiler.stages[self.name]
+            stats["seconds"] += elapsed
+            profiler.stack.pop()
+            if profiler.track_memory:
+                _record_peak(stats)
+                if profiler.stack:
+                    _record_peak(profiler.stages[profiler.stack[-1]])
+                tracemalloc.reset_peak()
+
+
+def _record_peak(stats):
+    peak = tracemalloc.get_traced_memory()[1]
+    stats["peak_memory"] = max(stats["peak_memory"] or 0, peak)
+
+
+# The process-wide profiler the pipeline reports to; disabled unless enabled.
+PROFILER = Profiler()
@@ -0,0 +1,121 @@
+import itertools
+
+import numpy as np
+
+from controllers.planner import FORMATION, STARTERS
+
+
+def formations(formation=FORMATION, starters=STARTERS):
+    """
+    Every valid formation.
+
+    Returns:
+        np.ndarray: Shape (formations, positions), starters per position in
+        `formation` order, e.g. [1, 4, 4, 2] for a 4-4-2.
+    """
+    ranges = [range(minimum, maximum + 1) for minimum, maximum in formation.values()]
+    return np.array([counts for counts in itertools.product(*ranges) if sum(counts) == starters])
+
+
+def pick_lineups(points, positions, captain_points=None, formation=FORMATION):
+    """
+    The best starting XI, captain, vice-captain and bench order of one or
+    many squads, in one NumPy pass.
+
+    Each squad is sorted by position and then by points, so the best XI of
+    a formation is the top players of each position and its points are a
+    cumulative-sum lookup; every valid formation is scored this way for
+    every squad at once and the best one kept (the first in `formations`
+    order on ties). The captain and vice-captain are the two best starters
+    by `captain_points`. The bench is ordered the way FPL substitutes: the
+    goalkeeper first, then outfield players by points.
+
+    Parameters:
+        points (np.ndarray): Shape (squads, squad size) or (squad size,).
+        positions (np.ndarray): Position names ("GKP", ...) of the same
+            shape, or one (squad size,) row shared by every squad. Every
+            squad must have the same number of players per position.
+        captain_points (np.ndarray): What the armband is decided on, shaped
+            like `points`; defaults to `points`.
+        formation (dict): (minimum, maximum) starters per position.
+
+    Returns:
+        dict: Arrays with a leading squad axis (dropped for a single squad):
+        "formation" (starters per position), "xi_points", "starters" and
+        "bench" (squad slot indices; starters by position, then points),
+        "captain" and "vice_captain" (slot indices) and "points" (XI points
+        with the captain's counted twice).
+    """
+    points = np.asarray(points, dtype=float)
+    single = points.ndim == 1
+    points = np.atleast_2d(points)
+    captain_points = points if captain_points is None else np.atleast_2d(np.asarray(captain_points, dtype=float))
+    order_of = {position: i for i, position in enumerate(formation)}
+    rank = np.vectorize(lambda position: order_of.get(position, -1), otypes=[np.int64])(np.asarray(positions))
+    rank = np.broadcast_to(np.atleast_2d(rank), points.shape)
+    squads, size = points.shape
+
+    counts = (rank[:, :, None] == np.arange(len(formation))).sum(axis=1)
+    if (rank < 0).any() or not (counts == counts[:1]).all():
+        raise ValueError(f"Every squad needs the same number of players per position, from {list(formation)}.")
+    counts = counts[0]
+
+    # Slots grouped by position, best first within each position.
+    order = np.lexsort((-points, rank), axis=-1)
+    ranked = np.take_along_axis(points, order, axis=1)
+    valid = formations(formation, STARTERS)
+    valid = valid[(valid <= counts).all(axis=1)]
+    if not len(valid):
+        raise ValueError("No valid formation can be picked from these squads.")
+
+    totals = np.zeros((squads, len(valid)))
+    start = 0
+    for i, count in enumerate(counts):
+        cumulative = np.concatenate([np.zeros((squads, 1)), np.cumsum(ranked[:, start:start + count], axis=1)],
+                                    axis=1)
+        totals += cumulative[:, valid[:, i]]
+        start += count
+    best = totals.argmax(axis=1)
+    chosen = valid[best]
+
+    block = np.repeat(np.arange(len(counts)), counts)
+    within = np.arange(size) - np.repeat(np.cumsum(counts) - counts, counts)
+    starting = within[None, :] < chosen[:, block]
+    starters = order[starting].reshape(squads, STARTERS)
+    bench = order[~starting].reshape(squads, size - STARTERS)
+
+    # Bench: goalkeeper first, then outfield players by points.
+    bench_points = np.take_along_axis(points, bench, axis=1)
+    bench_rank = np.take_along_axis(rank, bench, axis=1)
+    bench = np.take_along_axis(bench, np.lexsort((-bench_points, bench_rank != 0), axis=-1), axis=1)
+
+    armband = np.argsort(-np.take_along_axis(captain_points, starters, axis=1), axis=1, kind="stable")
+    captain = np.take_along_axis(starters, armband[:, :1], axis=1)[:, 0]
+    vice_captain = np.take_along_axis(starters, armband[:, 1:2], axis=1)[:, 0]
+
+    xi_points = totals[np.arange(squads), best]
+    result = {
+        "formation": chosen,
+        "xi_points": xi_points,
+        "starters": starters,
+        "bench": bench,
+        "captain": captain,
+        "vice_captain": vice_captain,
+        "points": xi_points + points[np.arange(squads), captain],
+    }
+    return {key: value[0] for key, value in result.items()} if single else result
+
+
+def split_lineup(squad, score_column, captain_column=None):
+    """
+    The best starting XI of one squad by `score_column` (see `pick_lineups`).
+
+    Returns:
+        tuple: (starters sorted by `score_column`, bench in substitution
+        order, captain ID, vice-captain ID)
+    """
+    lineup = pick_lineups(squad[score_column].to_numpy(dtype=float), squad["Position"].to_numpy(),
+                          squad[captain_column].to_numpy(dtype=float) if captain_column else None)
+    starters = squad.iloc[lineup["starters"]].sort_values(by=score_column, ascending=False, kind="stable")
+    ids = squad["ID"].to_numpy()
+    return starters, squad.iloc[lineup["bench"]], int(ids[lineup["captain"]]), int(ids[lineup["vice_captain"]])
@@ -0,0 +1,223 @@
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+import requests
+
+from controllers.scoring import performance_scores, score_components
+from controllers.team import TeamIndex
+
+logger = logging.getLogger("fpl_buddy")
+
+# Live stats that are reported as they change, and the score columns a
+# change event carries.
+REPORTED_STATS = ["minutes", "total_points", "bonus", "goals_scored", "assists"]
+REPORTED_SCORES = ["Combined score", "Gw score"]
+LIVE_COLUMNS = ["expected_goals", "expected_assists", "expected_goal_involvements",
+                "expected_goals_conceded", "ict_index", "total_points", "minutes"]
+
+
+def _blank(stats):
+    """Whether a player's live stats are all zero (not played yet)."""
+    return all(float(value or 0) == 0 for value in stats.values())
+
+
+class LiveGameweek:
+    """
+    Follow a gameweek as it is played, from the `event/{event}/live`
+    endpoint, and keep the league's scores current.
+
+    The whole league's live stats arrive in one payload. Each poll is
+    compared player by player with the previous one, and only the players
+    whose stats changed are scored again. Every score term that depends on
+    gameweek history is a per-player sum (performance score, gameweeks
+    played, fixture difficulty and difficulty times round) or the last
+    round played, so these are computed once without the live gameweek and
+    a player's live row is added on top: a poll costs a few NumPy
+    operations on the changed players, however big the league is. Past
+    seasons, upcoming fixtures, price and availability do not change during
+    a gameweek and are reused from `scores`.
+
+    Parameters:
+        event (int): The gameweek being played.
+        players (pd.DataFrame): bootstrap-static `elements` rows of the
+            scored players.
+        frames (dict): "history", "history_past" and "fixtures" long-format
+            frames for those players.
+        teams (TeamIndex): Team strengths, or a list of team dicts.
+        scores (pd.DataFrame): Their current `score_league` output.
+        event_fixtures (pd.DataFrame): The gameweek's fixtures ("id",
+            "team_h", "team_a"), for each live row's opponent and venue.
+        index (PlayerQuery): A query index over the same players, kept in
+            line with the live scores.
+    """
+
+    def __init__(self, event, players, frames, teams, scores, event_fixtures, index=None):
+        self.event = event
+        self.index = index
+        self.team_index = TeamIndex.of(teams)
+        self.stats = {}
+        history = frames["history"]
+        if history is not None and "round" in history.columns:
+            # The live row replaces whatever element-summary had for this gameweek.
+            history = history[pd.to_numeric(history["round"], errors="coerce") != event]
+
+        parts = score_components(players, history, frames["history_past"], frames["fixtures"], self.team_index)
+        ids = parts["index"].to_numpy()
+        self.row = {int(player_id): row for row, player_id in enumerate(ids)}
+        self.names = players["web_name"].to_numpy()
+        self.position = players["element_type"].to_numpy()
+        self.team = players["team"].to_numpy()
+
+        # Per-player sums over the gameweeks played before this one.
+        played = parts["played"]
+        rows = parts["index"].get_indexer(played["player_id"])
+        difficulty = played["difficulty"].to_numpy(dtype=float)
+        self.total_score = parts["total_score"]
+        self.num_gws = parts["num_gws"].astype(float)
+        self.difficulty = np.bincount(rows, difficulty, minlength=len(ids))
+        self.difficulty_by_round = np.bincount(rows, difficulty * played["round"].to_numpy(), minlength=len(ids))
+        self.last_round = np.zeros(len(ids))
+        np.maximum.at(self.last_round, rows, played["round"].to_numpy(dtype=float))
+        self.upcoming_difficulty = parts["upcoming_difficulty"]
+        self.gw_difficulty = parts["gw_difficulty"]
+        self.price = parts["price"]
+        self.availability = parts["availability"]
+
+        self.scores = scores.set_index("ID", drop=False).reindex(ids).reset_index(drop=True)
+        self.past_history_score = self.scores["Past History Score"].to_numpy(dtype=float)
+
+        self.opponents = {}
+        for fixture in event_fixtures.itertuples(index=False):
+            # A club's first fixture of a double gameweek stands for both.
+            self.opponents.setdefault(int(fixture.team_h), (int(fixture.team_a), True))
+            self.opponents.setdefault(int(fixture.team_a), (int(fixture.team_h), False))
+
+    def changes(self, payload):
+        """
+        The players whose live stats differ from the previous poll.
+
+        Returns:
+            dict: {player ID: (previous stats or None, new stats)} for
+            scored players only. Players first seen with blank stats are
+            remembered without counting as changed.
+        """
+        changed = {}
+        for element in payload.get("elements", []):
+            player_id = element["id"]
+            stats = element["stats"]
+            previous = self.stats.get(player_id)
+            if previous == stats or player_id not in self.row:
+                continue
+            if previous is None and _blank(stats):
+                self.stats[player_id] = stats
+                continue
+            changed[player_id] = (previous, stats)
+        return changed
+
+    def _rescore(self, rows, live):
+        """Score columns of the players at `rows` with their live rows added."""
+        position = self.position[rows]
+        team = self.team[rows]
+        opponent, home = zip(*(self.opponents.get(int(club), (int(club), True)) for club in team))
+        played = live["minutes"].to_numpy() > 0
+        score = np.where(played, performance_scores(live, position), 0.0)
+        difficulty = np.where(played, self.team_index.difficulty(team, opponent, home, position), 0.0)
+
+        num_gws = self.num_gws[rows] + played
+        last_round = np.where(played, np.maximum(self.last_round[rows], self.event), self.last_round[rows])
+        # sum(difficulty * (1 + round / last round)) over every played gameweek
+        previous_difficulty = self.difficulty[rows] + difficulty + np.divide(
+            self.difficulty_by_round[rows] + difficulty * self.event, last_round,
+            out=np.zeros(len(rows)), where=last_round > 0)
+        average = np.divide((self.total_score[rows] + score) * self.past_history_score[rows], num_gws,
+                            out=np.zeros(len(rows)), where=num_gws > 0)
+        price = self.price[rows]
+        aggregate = np.divide(average, np.log(np.where(price > 0, price, 0) + 1),
+                              out=np.zeros(len(rows)), where=price > 0)
+        combined = aggregate / (1 + np.abs(previous_difficulty - self.upcoming_difficulty[rows]))
+        return {
+            "GW played": num_gws.astype(np.int64),
+            "Performance Score": aggregate,
+            "Previous Fixtures": previous_difficulty,
+            "Combined score": combined,
+            "Combined with availability": combined * self.availability[rows],
+            "Gw score": average / (1 + self.gw_difficulty[rows]),
+        }
+
+    def update(self, payload):
+        """
+        Apply a live payload: score the changed players again with their
+        live gameweek rows and report what changed.
+
+        Returns:
+            list: One event per changed player: "id", "player", "stats"
+            ({stat: (before, after)} for REPORTED_STATS that changed) and
+            "scores" ({column: (before, after)} for REPORTED_SCORES).
+        """
+        changed = self.changes(payload)
+        if not changed:
+            return []
+        ids = list(changed)
+        rows = np.array([self.row[player_id] for player_id in ids])
+        live = pd.DataFrame([stats for _, stats in changed.values()], columns=LIVE_COLUMNS)
+        live = live.apply(pd.to_numeric, errors="coerce").fillna(0.0)
+        rescored = self._rescore(rows, live)
+
+        before = {column: self.scores[column].to_numpy()[rows] for column in REPORTED_SCORES}
+        for column, values in rescored.items():
+            self.scores.iloc[rows, self.scores.columns.get_loc(column)] = values
+        if self.index is not None:
+            # Only the changed players move; ownership and the rest stay as indexed.
+            column = self.index.score_column
+            for player_id, value in zip(ids, self.scores[column].to_numpy()[rows]):
+                if player_id in self.index.players:
+                    self.index.update(player_id, **{column: float(value)})
+
+        events = []
+        for i, (player_id, (previous, stats)) in enumerate(changed.items()):
+            self.stats[player_id] = stats
+            previous = previous or {}
+            events.append({
+                "id": player_id,
+                "player": self.names[rows[i]],
+                "stats": {name: (previous.get(name, 0), stats.get(name, 0)) for name in REPORTED_STATS
+                          if previous.get(name, 0) != stats.get(name, 0)},
+                "scores": {column: (float(before[column][i]), float(rescored[column][i]))
+                           for column in REPORTED_SCORES},
+            })
+        return events
+
+    def follow(self, fetch, interval=60, on_change=print, polls=None):
+        """
+        Poll `fetch` every `interval` seconds and pass each change event to
+        `on_change`, until interrupted (or for `polls` polls).
+
+        A poll that fails (a timeout, connection error, HTTP error or a
+        payload that is not JSON) is logged and counted, and polling goes on
+        at the next interval.
+
+        Parameters:
+            fetch (callable): Returns the live payload, or None when it has
+                not changed since the last call (a 304 response).
+        """
+        done = 0
+        try:
+            while polls is None or done < polls:
+                started = time.perf_counter()
+                try:
+                    payload = fetch()
+                except (requests.RequestException, ValueError) as exc:
+                    logger.warning("Live poll %d failed, retrying in %gs: %s", done + 1, interval, exc)
+                    payload = None
+                events = self.update(payload) if payload is not None else []
+                for event in events:
+                    on_change(event)
+                done += 1
+                logger.info("Live poll %d: %d players changed in %.3fs.", done, len(events),
+                            time.perf_counter() - started)
+                if polls is None or done < polls:
+                    time.sleep(max(0.0, interval - (time.perf_counter() - started)))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,278 @@
+import heapq
+import importlib.util
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# SciPy is optional and slow to import, so it is only imported when solving.
+HAS_SCIPY = importlib.util.find_spec("scipy") is not None
+
+
+def _price_units(prices):
+    """Prices in £m to integer tenths, so the budget can index DP tables."""
+    return np.rint(np.asarray(prices, dtype=float) * 10).astype(np.int64)
+
+
+def _prune_dominated(scores, costs, teams, count, max_per_team, team_size):
+    """
+    Drop players that can never be in an optimal squad: those with at least
+    `count` cheaper-and-better players of the same position, after setting
+    aside the dominators from the clubs that could be full in the squad.
+    """
+    better = (scores[None, :] >= scores[:, None]) & (costs[None, :] <= costs[:, None])
+    strictly = (scores[None, :] > scores[:, None]) | (costs[None, :] < costs[:, None])
+    index = np.arange(len(scores))
+    # Identical players dominate each other; keep the earlier one.
+    better &= strictly | (index[None, :] < index[:, None])
+
+    full_clubs = (team_size - 1) // max_per_team
+    keep = np.ones(len(scores), dtype=bool)
+    for i in range(len(scores)):
+        dominators = teams[better[i]]
+        if len(dominators) < count:
+            continue
+        clubs, club_counts = np.unique(dominators[dominators != teams[i]], return_counts=True)
+        blocked = np.sort(club_counts)[::-1][:full_clubs].sum()
+        keep[i] = len(dominators) - blocked < count
+    return keep
+
+
+def _knapsack(scores, costs, count, capacity):
+    """
+    Best total score picking exactly `count` players with total cost at most
+    `c`, for every `c` up to `capacity`, plus the per-player take tables
+    needed to recover the picks.
+    """
+    best = np.full((count + 1, capacity + 1), -np.inf)
+    best[0] = 0.0
+    takes = []
+    for score, cost in zip(scores, costs):
+        take = np.zeros((count + 1, capacity + 1), dtype=bool)
+        if cost <= capacity:
+            for k in range(count, 0, -1):
+                candidate = best[k - 1, :capacity + 1 - cost] + score
+                improved = candidate > best[k, cost:]
+                best[k, cost:][improved] = candidate[improved]
+                take[k, cost:] = improved
+        takes.append(take)
+    return best[count], takes
+
+
+def _knapsack_picks(takes, costs, count, budget):
+    picks = []
+    for i in range(len(takes) - 1, -1, -1):
+        if count and takes[i][count, budget]:
+            picks.append(i)
+            count -= 1
+            budget -= costs[i]
+    return picks
+
+
+def _max_plus(left, right, limit):
+    """
+    out[c] = max over a <= c of left[c - a] + right[a] (a max-plus
+    convolution), computed only for c <= limit and only over the finite
+    parts of both tables.
+    """
+    out = np.full(len(left), -np.inf)
+    left_start = int(np.argmax(np.isfinite(left)))
+    right_start = int(np.argmax(np.isfinite(right)))
+    size = limit - left_start - right_start + 1
+    if size <= 0 or not np.isfinite(left[left_start]) or not np.isfinite(right[right_start]):
+        return out
+    left = left[left_start:left_start + size]
+    right = right[right_start:right_start + size]
+    padded = np.concatenate([np.full(size - 1, -np.inf), left])
+    windows = sliding_window_view(padded, size)
+    out[left_start + right_start:limit + 1] = (windows + right[::-1]).max(axis=1)
+    return out
+
+
+def _best_split(left, right, budget):
+    """The `a` maximizing left[budget - a] + right[a], and that maximum."""
+    totals = left[budget::-1] + right[:budget + 1]
+    split = int(totals.argmax())
+    return split, totals[split]
+
+
+def _branch_and_bound(position_labels, scores, costs, clubs, positions,
+                      position_limits, capacity, max_per_team):
+    """
+    Exact pure-NumPy solver: a best-first branch-and-bound search whose bound
+    at each node is the optimum with the club limit relaxed (knapsack dynamic
+    programming per position, merged over the budget). Nodes whose relaxed
+    optimum breaks the club limit are split on the players of the
+    over-represented club.
+
+    Returns:
+        list: Row labels of the best squad, or None if there is none.
+    """
+    # Knapsack tables (and their merges) only depend on the players excluded
+    # and forced within each position, so sibling branches share most of them.
+    @lru_cache(maxsize=None)
+    def position_table(position, excluded, forced):
+        labels = [label for label in position_labels[position]
+                  if label not in excluded and label not in forced]
+        count = position_limits[position] - len(forced)
+        if count < 0 or count > len(labels):
+            return None
+        best, takes = _knapsack(scores[labels], costs[labels], count, capacity)
+        return labels, count, best, takes
+
+    # A merge of the first positions only needs budgets that leave room for
+    # the cheapest possible picks in the remaining positions.
+    cheapest = {
+        position: int(np.sort(costs[labels])[:position_limits[position]].sum())
+        for position, labels in position_labels.items()
+    }
+
+    @lru_cache(maxsize=None)
+    def merged_table(states):
+        if len(states) == 1:
+            return position_table(*states[0])[2]
+        limit = capacity - sum(cheapest[position] for position in list(position_limits)[len(states):])
+        return _max_plus(merged_table(states[:-1]), position_table(*states[-1])[2], limit)
+
+    def solve(excluded, forced):
+        """Optimum with the club limit relaxed, given excluded and forced players."""
+        forced = list(forced)
+        if forced and np.bincount(clubs[forced]).max() > max_per_team:
+            return -np.inf, None
+        remaining = capacity - int(costs[forced].sum())
+        states = tuple(
+            (position,
+             frozenset(label for label in excluded if positions[label] == position),
+             frozenset(label for label in forced if positions[label] == position))
+            for position in position_limits)
+        if remaining < 0 or any(position_table(*state) is None for state in states):
+            return -np.inf, None
+
+        picks = []
+        for j in range(len(states) - 1, -1, -1):
+            labels, count, best, takes = position_table(*states[j])
+            if j:
+                spent, total = _best_split(merged_table(states[:j]), best, remaining)
+            else:
+                spent, total = remaining, best[remaining]
+            if j == len(states) - 1:
+                bound = total
+                if not np.isfinite(bound):
+                    return -np.inf, None
+            picks += [labels[i] for i in _knapsack_picks(takes, costs[labels], count, spent)]
+            remaining -= spent
+        return bound + scores[forced].sum(), picks + forced
+
+    best_score, best_squad = -np.inf, None
+    bound, squad = solve(frozenset(), frozenset())
+    heap = [(-bound, 0, frozenset(), frozenset(), squad)]
+    counter = 1
+    while heap:
+        negative_bound, _, excluded, forced, squad = heapq.heappop(heap)
+        if squad is None or -negative_bound <= best_score:
+            continue
+
+        club_counts = np.bincount(clubs[squad])
+        if club_counts.max() <= max_per_team:
+            best_score, best_squad = -negative_bound, squad
+            continue
+
+        club = club_counts.argmax()
+        branch_players = sorted((label for label in squad if clubs[label] == club and label not in forced),
+                                key=lambda label: scores[label])
+        for i, label in enumerate(branch_players):
+            child_excluded = excluded | {label}
+            child_forced = forced | set(branch_players[:i])
+            child_bound, child_squad = solve(child_excluded, child_forced)
+            if child_squad is not None and child_bound > best_score:
+                heapq.heappush(heap, (-child_bound, counter, child_excluded, child_forced, child_squad))
+                counter += 1
+
+    return best_squad
+
+
+def _milp(position_labels, scores, costs, clubs, positions,
+          position_limits, capacity, max_per_team):
+    """
+    Solve the squad selection as an integer program with SciPy's HiGHS
+    backend, with the optimality gap set to zero.
+
+    Returns:
+        list: Row labels of the best squad, or None if there is none.
+    """
+    from scipy.optimize import Bounds, LinearConstraint, milp
+
+    labels = np.array([label for position in position_limits for label in position_labels[position]])
+    team_ids = np.unique(clubs[labels])
+    constraints = [LinearConstraint(costs[labels][None, :], 0, capacity)]
+    constraints.append(LinearConstraint(
+        np.array([positions[labels] == position for position in position_limits], dtype=float),
+        list(position_limits.values()), list(position_limits.values())))
+    constraints.append(LinearConstraint(
+        (clubs[labels][None, :] == team_ids[:, None]).astype(float), 0, max_per_team))
+
+    result = milp(-scores[labels], constraints=constraints, integrality=np.ones(len(labels)),
+                  bounds=Bounds(0, 1), options={"mip_rel_gap": 0})
+    if not result.success:
+        return None
+    return list(labels[result.x > 0.5])
+
+
+def optimize_squad(df, score_column, budget, position_limits, max_per_team=3, solver=None):
+    """
+    Select the squad with the highest total `score_column` under the budget,
+    the per-position limits and the per-club limit.
+
+    The result is provably optimal. Players that are beaten on both score and
+    price by enough others are dropped first, then the rest is solved as an
+    integer program when SciPy is installed, or by a pure-NumPy
+    branch-and-bound search otherwise.
+
+    Parameters:
+        df (pd.DataFrame): Scored players with "ID", "Position", "Price",
+            "team" and `score_column` columns.
+        score_column (str): The column to maximize.
+        budget (float): Total budget in £m.
+        position_limits (dict): Squad size per position, e.g. {"GKP": 2, ...}.
+        max_per_team (int): Maximum players from a single club.
+        solver (str): 'milp' or 'branch-and-bound'; defaults to 'milp' when
+            SciPy is available.
+
+    Returns:
+        pd.DataFrame: The selected rows of `df`, sorted by `score_column`.
+    """
+    if solver is None:
+        solver = "milp" if HAS_SCIPY else "branch-and-bound"
+    if solver not in SOLVERS:
+        raise ValueError("Invalid solver. Use 'milp' or 'branch-and-bound'.")
+    if solver == "milp" and not HAS_SCIPY:
+        raise ValueError("The 'milp' solver needs SciPy. Install it or use 'branch-and-bound'.")
+
+    team_size = sum(position_limits.values())
+    df = df.reset_index(drop=True)
+    costs = _price_units(df["Price"])
+    # A budget above the price of the whole pool constrains nothing, and
+    # would only make the DP tables bigger.
+    capacity = int(min(_price_units([min(budget, df["Price"].sum())])[0], costs.sum()))
+    scores = df[score_column].to_numpy(dtype=float)
+    clubs = df["team"].to_numpy(dtype=np.int64)
+    positions = df["Position"].to_numpy()
+
+    position_labels = {}
+    for position, count in position_limits.items():
+        labels = np.flatnonzero(positions == position)
+        keep = _prune_dominated(scores[labels], costs[labels], clubs[labels],
+                                count, max_per_team, team_size)
+        position_labels[position] = [int(label) for label in labels[keep]]
+
+    best_squad = SOLVERS[solver](position_labels, scores, costs, clubs, positions,
+                                 position_limits, capacity, max_per_team)
+    if best_squad is None:
+        raise ValueError("No squad satisfies the budget, position and club limits.")
+    return df.loc[sorted(best_squad)].sort_values(by=score_column, ascending=False)
+
+
+SOLVERS = {
+    "milp": _milp,
+    "branch-and-bound": _branch_and_bound,
+}
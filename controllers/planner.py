@@ -0,0 +1,245 @@
+import numpy as np
+import pandas as pd
+
+MAX_FREE_TRANSFERS = 5
+STARTERS = 11
+# (minimum, maximum) starters per position in a valid formation
+FORMATION = {"GKP": (1, 1), "DEF": (3, 5), "MID": (2, 5), "FWD": (1, 3)}
+
+
+def best_xi_points(points, position_limits):
+    """
+    Projected points of the best valid starting XI.
+
+    Parameters:
+        points (np.ndarray): Shape (..., squad size, gameweeks), with squad
+            slots grouped by position in `position_limits` order.
+        position_limits (dict): Squad size per position.
+
+    Returns:
+        np.ndarray: Shape (..., gameweeks).
+    """
+    total = 0.0
+    bench_candidates = []
+    start = 0
+    for position, count in position_limits.items():
+        minimum, maximum = FORMATION[position]
+        block = -np.sort(-points[..., start:start + count, :], axis=-2)
+        total = total + block[..., :minimum, :].sum(axis=-2)
+        bench_candidates.append(block[..., minimum:min(maximum, count), :])
+        start += count
+
+    flexible = STARTERS - sum(minimum for minimum, _ in FORMATION.values())
+    rest = -np.sort(-np.concatenate(bench_candidates, axis=-2), axis=-2)
+    return total + rest[..., :flexible, :].sum(axis=-2)
+
+
+class TransferPlanner:
+    """
+    Plan transfers over the next gameweeks from a current squad and bank.
+
+    The search walks forward one gameweek at a time. Each squad state is
+    (squad, free transfers), with the bank implied by the squad. From each
+    state it tries no transfer, the most promising single transfers and
+    pairs of them, charging `hit_cost` for every transfer beyond the free
+    ones and rolling unused free transfers. Identical states reached by
+    different transfer orders are merged, and each gameweek keeps the
+    `beam_width` states with the best points so far plus the points their
+    squad would score with no further transfers. Squad XI values are
+    memoized, so a 5-gameweek horizon runs in seconds.
+    """
+
+    def __init__(self, players, projections, position_limits, max_per_team=3,
+                 hit_cost=4, max_transfers=2, beam_width=150, moves_per_state=12,
+                 candidates_per_position=12):
+        """
+        Parameters:
+            players (pd.DataFrame): "ID", "Position", "Price" and "team" for
+                every player that may be in or join the squad.
+            projections (pd.DataFrame): Projected points per player ID (index)
+                and upcoming gameweek (columns, in order).
+            position_limits (dict): Squad size per position.
+            max_per_team (int): Maximum players from a single club.
+            hit_cost (float): Points deducted for each extra transfer.
+            max_transfers (int): Most transfers considered in one gameweek
+                (0, 1 or 2).
+            beam_width (int): States kept per gameweek.
+            moves_per_state (int): Single transfers expanded per state.
+            candidates_per_position (int): Incoming players considered per
+                position, by projected points and by points per £m.
+        """
+        self.players = players.drop_duplicates("ID").set_index("ID")
+        self.position_limits = position_limits
+        self.max_per_team = max_per_team
+        self.hit_cost = hit_cost
+        self.max_transfers = max_transfers
+        self.beam_width = beam_width
+        self.moves_per_state = moves_per_state
+        self.candidates_per_position = candidates_per_position
+
+        self.events = list(projections.columns)
+        self.ids = self.players.index.to_numpy()
+        self.points = projections.reindex(self.ids, fill_value=0.0).to_numpy(dtype=float)
+        self.prices = np.rint(self.players["Price"].to_numpy(dtype=float) * 10).astype(np.int64)
+        self.clubs = self.players["team"].to_numpy()
+        self.positions = self.players["Position"].to_numpy()
+        self.row = {player_id: row for row, player_id in enumerate(self.ids)}
+
+        self.position_order = {position: i for i, position in enumerate(position_limits)}
+        # Best XI points per canonical squad, kept with the planner.
+        self.xi_points = {}
+
+    def _canonical(self, squad):
+        """Squad rows grouped by position, then sorted, so equal squads share one key."""
+        return tuple(sorted(squad, key=lambda row: (self.position_order[self.positions[row]], row)))
+
+    def _xi_points(self, squad):
+        """Best XI points of a canonical squad for every planned gameweek."""
+        if squad not in self.xi_points:
+            self.xi_points[squad] = best_xi_points(self.points[list(squad)], self.position_limits)
+        return self.xi_points[squad]
+
+    def candidates(self, horizon, start=0):
+        """
+        Incoming players worth considering from gameweek `start` until
+        `horizon`: the best `candidates_per_position` of each position by
+        projected points and by points per £m.
+
+        Returns:
+            dict: Planner rows (sorted) per position.
+        """
+        remaining = self.points[:, start:horizon].sum(axis=1)
+        candidates = {}
+        for position in self.position_limits:
+            rows = np.flatnonzero(self.positions == position)
+            by_points = rows[np.argsort(-remaining[rows])][:self.candidates_per_position]
+            by_value = rows[np.argsort(-remaining[rows] / np.maximum(self.prices[rows], 1))][
+                :self.candidates_per_position]
+            candidates[position] = np.union1d(by_points, by_value)
+        return candidates
+
+    def _moves(self, squad, bank, candidates, start, horizon):
+        """No transfer, the best single transfers and feasible pairs of them."""
+        remaining = self.points[:, start:horizon].sum(axis=1)
+        in_squad = set(squad)
+        club_counts = pd.Series(self.clubs[list(squad)]).value_counts().to_dict()
+
+        singles = []
+        for out in squad:
+            for incoming in candidates[self.positions[out]]:
+                if incoming in in_squad:
+                    continue
+                gain = remaining[incoming] - remaining[out]
+                if gain <= 0 or self.prices[incoming] > bank + self.prices[out]:
+                    continue
+                if self.clubs[incoming] != self.clubs[out] and \
+                        club_counts.get(self.clubs[incoming], 0) >= self.max_per_team:
+                    continue
+                singles.append((gain, out, incoming))
+        singles.sort(reverse=True)
+        singles = [(out, incoming) for _, out, incoming in singles[:self.moves_per_state]]
+
+        moves = [()]
+        if self.max_transfers >= 1:
+            moves += [(move,) for move in singles]
+        if self.max_transfers >= 2:
+            for i, first in enumerate(singles):
+                for second in singles[i + 1:]:
+                    if first[0] == second[0] or first[1] == second[1]:
+                        continue
+                    spent = self.prices[first[1]] + self.prices[second[1]]
+                    sold = self.prices[first[0]] + self.prices[second[0]]
+                    if spent > bank + sold:
+                        continue
+                    counts = dict(club_counts)
+                    for out, incoming in (first, second):
+                        counts[self.clubs[out]] -= 1
+                        counts[self.clubs[incoming]] = counts.get(self.clubs[incoming], 0) + 1
+                    if max(counts.values()) > self.max_per_team:
+                        continue
+                    moves.append((first, second))
+        return moves
+
+    def plan(self, squad_ids, bank, free_transfers, horizon=5):
+        """
+        Find the best transfer plan for the next `horizon` gameweeks.
+
+        Parameters:
+            squad_ids (list): IDs of the current 15 players.
+            bank (float): Money in the bank in £m.
+            free_transfers (int): Free transfers available this gameweek.
+            horizon (int): Number of gameweeks to plan.
+
+        Returns:
+            dict: "total" projected points after hits, and "gameweeks", a list
+            with the event, transfers (out ID, in ID), hits, free transfers
+            available, bank and projected XI points for each gameweek.
+        """
+        if horizon < 1:
+            raise ValueError(f"The planning horizon must be at least 1 gameweek, not {horizon}.")
+        if not self.events:
+            raise ValueError("There are no upcoming gameweeks in the projections to plan.")
+        horizon = min(horizon, len(self.events))
+        unknown = [player_id for player_id in squad_ids if player_id not in self.row]
+        if unknown:
+            raise ValueError(f"Unknown player IDs in the squad: {unknown}")
+        squad = self._canonical(self.row[player_id] for player_id in squad_ids)
+        squad_counts = pd.Series(self.positions[list(squad)]).value_counts()
+        if any(squad_counts.get(position, 0) != count for position, count in self.position_limits.items()):
+            raise ValueError(f"The squad must have {self.position_limits} players per position.")
+        # Squad value plus bank stays constant through transfers.
+        budget = int(round(bank * 10)) + int(self.prices[list(squad)].sum())
+        beam = {(squad, free_transfers): (0.0, None, (), 0)}
+
+        history = []
+        for t in range(horizon):
+            candidates = self.candidates(horizon, t)
+            expanded = {}
+            for (squad, free), (value, _, _, _) in beam.items():
+                squad_bank = budget - int(self.prices[list(squad)].sum())
+                for move in self._moves(squad, squad_bank, candidates, t, horizon):
+                    new_squad = list(squad)
+                    for out, incoming in move:
+                        new_squad[new_squad.index(out)] = incoming
+                    new_squad = self._canonical(new_squad)
+                    hits = max(0, len(move) - free)
+                    new_value = value + self._xi_points(new_squad)[t] - hits * self.hit_cost
+                    new_free = min(MAX_FREE_TRANSFERS, max(free - len(move), 0) + 1)
+                    key = (new_squad, new_free)
+                    if key not in expanded or expanded[key][0] < new_value:
+                        expanded[key] = (new_value, (squad, free), move, hits)
+
+            # Drop states beaten by the same squad with more free transfers.
+            best_by_squad = {}
+            for (squad, free), state in expanded.items():
+                best_by_squad.setdefault(squad, []).append((free, state[0]))
+            expanded = {
+                (squad, free): state for (squad, free), state in expanded.items()
+                if not any(other_free >= free and other_value >= state[0] and
+                           (other_free, other_value) != (free, state[0])
+                           for other_free, other_value in best_by_squad[squad])
+            }
+
+            def outlook(item):
+                (squad, _), (value, _, _, _) = item
+                return value + self._xi_points(squad)[t + 1:horizon].sum()
+
+            beam = dict(sorted(expanded.items(), key=outlook, reverse=True)[:self.beam_width])
+            history.append(beam)
+
+        # Walk back from the best final state to recover the plan.
+        key, (total, parent, move, hits) = max(history[-1].items(), key=lambda item: item[1][0])
+        steps = []
+        for t in range(horizon - 1, -1, -1):
+            value, parent, move, hits = history[t][key]
+            squad, _ = key
+            steps.append({
+                "event": self.events[t],
+                "transfers": [(int(self.ids[out]), int(self.ids[incoming])) for out, incoming in move],
+                "hits": hits,
+                "free_transfers": parent[1],
+                "bank": (budget - int(self.prices[list(squad)].sum())) / 10,
+                "projected": float(self._xi_points(squad)[t]),
+            })
+            key = parent
+        return {"total": float(total), "gameweeks": steps[::-1]}
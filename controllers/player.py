@@ -1,4 +1,58 @@
-from controllers.team import get_team, Team
+import numpy as np
+import pandas as pd
+
+from controllers.scoring import POSITION_NAMES
+from controllers.team import TeamIndex
+
+# (attribute, bootstrap-static key, kind, default when the key is missing),
+# mirroring Player.__init__. "int" and "float" columns are parsed as numbers,
+# with "int" columns kept as floats when they have gaps; "raw" columns keep
+# the values as they are.
+PLAYER_FIELDS = (
+    ("id", "id", "int", None),
+    ("photo", "photo", "raw", None),
+    ("name", "web_name", "raw", None),
+    ("form", "form", "float", 0.0),
+    ("position", "element_type", "int", None),
+    ("fitness", "chance_of_playing_next_round", "float", 100.0),
+    ("team", "team", "int", None),
+    ("bonus", "bonus", "int", None),
+    ("price", "now_cost", "int", None),
+    ("points_per_game", "points_per_game", "float", 0.0),
+    ("selected_by_percent", "selected_by_percent", "float", 0),
+    ("minutes", "minutes", "float", 0),
+    ("starts", "starts", "float", 0),
+    ("penalties_order", "penalties_order", "raw", None),
+    ("total_points", "total_points", "int", 0),
+    ("goals_scored", "goals_scored", "float", 0),
+    ("assists", "assists", "float", 0),
+    ("clean_sheets", "clean_sheets", "float", 0),
+    ("penalties_saved", "penalties_saved", "float", 0),
+    ("saves", "saves", "float", 0),
+    ("goals_conceded", "goals_conceded", "float", 0),
+    ("own_goals", "own_goals", "float", 0),
+    ("penalties_missed", "penalties_missed", "float", 0),
+    ("yellow_cards", "yellow_cards", "float", 0),
+    ("influence", "influence", "float", 0.0),
+    ("creativity", "creativity", "float", 0.0),
+    ("threat", "threat", "float", 0.0),
+    ("ict_index", "ict_index", "float", 0.0),
+    ("xG", "expected_goals", "float", 0.0),
+    ("xA", "expected_assists", "float", 0.0),
+    ("expected_goal_involvements", "expected_goal_involvements", "float", 0.0),
+    ("expected_goals_conceded", "expected_goals_conceded", "float", 0.0),
+    ("influence_rank", "influence_rank", "int", 0),
+    ("threat_rank", "threat_rank", "int", 0),
+    ("creativity_rank", "creativity_rank", "int", 0),
+    ("ict_index_rank", "ict_index_rank", "int", 0),
+    ("expected_goals_per_90", "expected_goals_per_90", "float", 0),
+    ("expected_assists_per_90", "expected_assists_per_90", "float", 0),
+    ("saves_per_90", "saves_per_90", "float", 0),
+    ("starts_per_90", "starts_per_90", "float", 0),
+    ("clean_sheets_per_90", "clean_sheets_per_90", "float", 0),
+    ("corners_and_indirect_freekicks_order", "corners_and_indirect_freekicks_order", "raw", None),
+    ("direct_freekicks_order", "direct_freekicks_order", "raw", None),
+)
 
 
 class Player:
@@ -19,7 +73,9 @@ class Player:
             case 4:
                 self.position_name = "FWD"
 
-        self.fitness = float(player_data.get("chance_of_playing_next_round", 100.0))
+        # None (no news) when read straight from the API rather than a CSV.
+        fitness = player_data.get("chance_of_playing_next_round", 100.0)
+        self.fitness = None if fitness is None else float(fitness)
         self.team = player_data.get("team")
         self.bonus = player_data.get("bonus")
         self.price = player_data.get("now_cost")
@@ -108,30 +164,115 @@ class Player:
         return normalized_score
 
     def fixture_difficulty(self, fixture, teams):
-        team_data = Team(get_team(self.team, teams))
+        """
+        Difficulty of a fixture for this player: own team strength over the
+        opponent's (attack vs. defence for forwards, defence vs. attack otherwise).
+
+        `teams` is a TeamIndex, or a list of team dicts to build one from.
+        """
+        team_index = TeamIndex.of(teams)
         opponent_team_id = fixture.get("opponent_team") or (fixture.get(
             "team_h") if self.team == fixture.get("team_a") else fixture.get("team_a"))
 
-        if opponent_team_id:
-            opponent_team = Team(get_team(opponent_team_id, teams))
-        else:
+        if not opponent_team_id:
             raise ValueError("No valid opponent team found in the fixture data")
 
-        was_home = fixture.get("was_home")
-        team_h = fixture.get("team_h")
+        is_home = bool(fixture.get("was_home") or fixture.get("team_h") == self.team)
+        return float(team_index.difficulty(self.team, opponent_team_id, is_home, self.position))
 
-        if was_home or team_h == self.team:
-            player_strength_type = "strength_attack_home" if self.position == 4 else "strength_defense_home"
-            opponent_strength_type = "strength_defense_away" if self.position == 4 else "strength_attack_away"
+
+def _column(values, length, kind, default):
+    """
+    One typed column from the bootstrap values of a key (None when no
+    player has the key), or `default` everywhere if it is missing.
+    """
+    if values is None:
+        if kind == "float" or (kind == "int" and default is not None):
+            return np.full(length, default, dtype=float if kind == "float" else np.int64)
+        return np.full(length, default, dtype=object)
+    if kind == "raw":
+        return np.asarray(values, dtype=object)
+    try:
+        # Numbers, numeric strings and None (as NaN) convert directly.
+        numbers = np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        numbers = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=float)
+    if kind == "int" and not np.isnan(numbers).any():
+        return numbers.astype(np.int64)
+    return numbers
+
+
+class PlayerTable:
+    """
+    Every player of the bootstrap data as typed NumPy columns (struct of
+    arrays), built once from the `elements` rows. Columns are named after
+    the `Player` attributes, and rows are handed out as `PlayerRow` views.
+    """
+
+    def __init__(self, frame):
+        """
+        Parameters:
+            frame (pd.DataFrame | list): bootstrap-static `elements` rows, as
+                a frame or as the decoded API dicts (read without building
+                a frame).
+        """
+        length = len(frame)
+        if isinstance(frame, pd.DataFrame):
+            values = {key: frame[key].to_numpy(dtype=object) if key in frame.columns else None
+                      for _, key, _, _ in PLAYER_FIELDS}
         else:
-            player_strength_type = "strength_attack_away" if self.position == 4 else "strength_defense_away"
-            opponent_strength_type = "strength_defense_home" if self.position == 4 else "strength_attack_home"
+            keys = set().union(*frame) if frame else set()
+            values = {key: [record.get(key) for record in frame] if key in keys else None
+                      for _, key, _, _ in PLAYER_FIELDS}
+        self.columns = {attribute: _column(values[key], length, kind, default)
+                        for attribute, key, kind, default in PLAYER_FIELDS}
+        self.columns["position_name"] = np.array(
+            [POSITION_NAMES.get(position) for position in self.columns["position"].tolist()], dtype=object)
+        self.row_of = {player_id: row for row, player_id in enumerate(self.columns["id"].tolist())}
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def __getitem__(self, row):
+        if not -len(self) <= row < len(self):
+            raise IndexError("player row out of range")
+        return PlayerRow(self, row % len(self))
+
+    def __iter__(self):
+        return (PlayerRow(self, row) for row in range(len(self)))
+
+    def player(self, player_id):
+        """The row view of the player with this ID."""
+        return PlayerRow(self, self.row_of[player_id])
+
+    def availability(self):
+        """`chance_of_playing_next_round` as a fraction, 1.0 where it is unknown."""
+        fitness = self.columns["fitness"].astype(float)
+        return np.where(np.isnan(fitness), 1.0, fitness / 100)
+
+
+class PlayerRow:
+    """
+    A `Player`-compatible view of one row of a PlayerTable. It only holds the
+    table and row number; attributes are read from the columns on access.
+    """
+
+    __slots__ = ("table", "row")
+
+    calculate_performance_score_per_gw = Player.calculate_performance_score_per_gw
+    fixture_difficulty = Player.fixture_difficulty
 
-        # Retrieve team strengths
-        player_team_strength = getattr(team_data, player_strength_type, 1000)
-        opponent_team_strength = getattr(
-            opponent_team, opponent_strength_type, 1000)
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
 
-        return (player_team_strength / opponent_team_strength)
+    def __getattr__(self, name):
+        try:
+            column = self.table.columns[name]
+        except KeyError:
+            raise AttributeError(f"'PlayerRow' object has no attribute {name!r}") from None
+        value = column[self.row]
+        return value.item() if isinstance(value, np.generic) else value
 
-    
\ No newline at end of file
+    def __repr__(self):
+        return f"PlayerRow(id={self.id}, name={self.name!r})"
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+
+def bootstrap_scores(table):
+    """
+    A cheap stand-in for the history-based score, from bootstrap-static
+    fields only: form, points per game and xG + xA per 90, scaled by the
+    share of the most minutes any player of the same position has played.
+
+    Parameters:
+        table (PlayerTable): The bootstrap players.
+
+    Returns:
+        tuple: (score, score per £m) arrays, one value per table row.
+    """
+    columns = table.columns
+    per_90 = np.nan_to_num(columns["expected_goals_per_90"] + columns["expected_assists_per_90"])
+    quality = np.nan_to_num(columns["points_per_game"]) + np.nan_to_num(columns["form"]) + 4 * per_90
+    minutes = np.nan_to_num(columns["minutes"].astype(float))
+    most_minutes = pd.Series(minutes).groupby(columns["position"]).transform("max").to_numpy()
+    share = np.divide(minutes, most_minutes, out=np.zeros(len(minutes)), where=most_minutes > 0)
+    score = quality * np.sqrt(share)
+    price = np.nan_to_num(columns["price"].astype(float)) / 10
+    return score, score / np.log(price + 1, out=np.ones(len(price)), where=price > 0)
+
+
+def select_candidates(table, player_ids, top_k, keep_ids=()):
+    """
+    The players worth a detailed, history-based scoring: per position, the
+    `top_k` best by `bootstrap_scores` and the `top_k` best per £m, plus
+    `keep_ids` (e.g. the current squad).
+
+    Parameters:
+        table (PlayerTable): The bootstrap players.
+        player_ids (list): The players to choose from (e.g. the fit ones).
+        top_k (int): Players kept per position and ranking.
+        keep_ids (iterable): Players always kept when in `player_ids`.
+
+    Returns:
+        list: The kept IDs, in `player_ids` order.
+    """
+    rows = np.array([table.row_of[player_id] for player_id in player_ids], dtype=np.int64)
+    score, value = bootstrap_scores(table)
+    positions = table.columns["position"][rows]
+    kept = set(keep_ids)
+    for position in np.unique(positions):
+        members = rows[positions == position]
+        for ranking in (score, value):
+            best = members[np.argsort(-ranking[members], kind="stable")[:top_k]]
+            kept.update(table.columns["id"][best].tolist())
+    return [player_id for player_id in player_ids if player_id in kept]
+
+
+def prefilter_report(scores, table, top_ks, keep_ids=(), top_n=20, select=None, objective="Combined score"):
+    """
+    How much of a full run's ranking each pre-filter size keeps.
+
+    Parameters:
+        scores (pd.DataFrame): Full-run `score_league` output.
+        table (PlayerTable): The bootstrap players.
+        top_ks (list): Pre-filter sizes to try.
+        keep_ids (iterable): Players always kept.
+        top_n (int): Size of the per-position top list whose recall is reported.
+        select (callable): Optional squad selection, from scores to squad
+            rows, to compare the squad picked from the kept players.
+        objective (str): The squad column `select` maximizes.
+
+    Returns:
+        pd.DataFrame: One row per K with the share of players (and element-
+        summary requests) skipped, the recall of each position's top
+        `top_n` by "Combined score", and with `select`, how many of the full
+        run's squad are still picked and how much of its `objective` is lost.
+    """
+    player_ids = scores["ID"].tolist()
+    top = scores.sort_values("Combined score", ascending=False).groupby("Position").head(top_n)
+    full_squad = select(scores) if select else None
+    rows = []
+    for top_k in top_ks:
+        kept = set(select_candidates(table, player_ids, top_k, keep_ids))
+        row = {
+            "K": top_k,
+            "kept": len(kept),
+            "skipped": 1 - len(kept) / len(player_ids) if player_ids else 0.0,
+            f"top-{top_n} recall": top["ID"].isin(kept).mean(),
+        }
+        for position, group in top.groupby("Position", sort=False):
+            row[f"{position} recall"] = group["ID"].isin(kept).mean()
+        if select:
+            squad = select(scores[scores["ID"].isin(kept)])
+            row["squad overlap"] = int(squad["ID"].isin(full_squad["ID"]).sum())
+            row["squad score lost"] = full_squad[objective].sum() - squad[objective].sum()
+        rows.append(row)
+    return pd.DataFrame(rows)
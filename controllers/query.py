@@ -0,0 +1,217 @@
+import bisect
+import heapq
+import math
+
+import numpy as np
+
+from controllers.scoring import POSITION_NAMES
+
+# Width of a price band in £m, and the ownership (selected_by_percent)
+# band boundaries: [0, 1), [1, 5), [5, 10), [10, 20) and 20+.
+PRICE_BAND = 0.5
+OWNERSHIP_BANDS = [1.0, 5.0, 10.0, 20.0]
+QUERY_FIELDS = ["position", "min_price", "max_price", "min_ownership", "max_ownership",
+                "teams", "exclude_teams", "exclude", "min_fitness", "limit"]
+
+
+def _price_band(price):
+    return math.floor(price / PRICE_BAND + 1e-9)
+
+
+def _ownership_band(ownership):
+    return bisect.bisect_right(OWNERSHIP_BANDS, ownership)
+
+
+def _same(value, other):
+    return value == other or (value != value and other != other)
+
+
+def _sort_key(record, score_column):
+    score = record[score_column]
+    return (-score if score == score else math.inf, record["ID"])
+
+
+class PlayerQuery:
+    """
+    Top-K filtered queries over a scored league, such as "the best MID under
+    £7.0m owned by less than 5%, not from club 3".
+
+    Players are kept in small lists sorted by score: one per (position,
+    price band, ownership band) and one per club. A query merges only the
+    lists whose bands can match, in score order, and stops as soon as it
+    has `limit` players passing the exact filters, so it reads a few dozen
+    players instead of sorting the whole table.
+
+    The lists are updated in place (`update`, `add`, `remove`, `sync`) when
+    a player's score, price, ownership, fitness or club changes.
+
+    Parameters:
+        scores (pd.DataFrame): `score_league` output ("ID", "Player",
+            "Position", "Price", "team", "Fitness" and `score_column`),
+            optionally with "Ownership" (selected_by_percent).
+        score_column (str): The column players are ranked by.
+    """
+
+    def __init__(self, scores, score_column="Combined score"):
+        self.score_column = score_column
+        self.players = {}
+        self.buckets = {}
+        self.by_team = {}
+        for record in self._records(scores):
+            self.add(record)
+
+    def _records(self, scores):
+        columns = ["ID", "Player", "Position", "Price", "team", "Fitness", self.score_column]
+        records = scores[columns].to_dict(orient="records")
+        ownership = scores["Ownership"].to_numpy(dtype=float) if "Ownership" in scores.columns \
+            else np.zeros(len(records))
+        for record, owned in zip(records, ownership):
+            record["Ownership"] = 0.0 if np.isnan(owned) else float(owned)
+        return records
+
+    def _bucket(self, record):
+        return record["Position"], _price_band(record["Price"]), _ownership_band(record["Ownership"])
+
+    def add(self, record):
+        """Index a player (a dict with the columns named in the class docstring)."""
+        record = dict(record, ID=int(record["ID"]))
+        if record["ID"] in self.players:
+            self.remove(record["ID"])
+        self.players[record["ID"]] = record
+        key = _sort_key(record, self.score_column)
+        bisect.insort(self.buckets.setdefault(self._bucket(record), []), key)
+        bisect.insort(self.by_team.setdefault(record["team"], []), key)
+
+    def remove(self, player_id):
+        """Drop a player from the indexes."""
+        record = self.players.pop(player_id)
+        key = _sort_key(record, self.score_column)
+        for lists, name in ((self.buckets, self._bucket(record)), (self.by_team, record["team"])):
+            entries = lists[name]
+            del entries[bisect.bisect_left(entries, key)]
+            if not entries:
+                del lists[name]
+
+    def update(self, player_id, **changes):
+        """
+        Change some of a player's fields, e.g. `update(328, Price=7.6)`, moving
+        it between lists only if its score, bands or club changed.
+        """
+        record = self.players[player_id]
+        changes = {name: value for name, value in changes.items() if not _same(record.get(name), value)}
+        if not changes:
+            return
+        moves = {self.score_column, "Price", "Ownership", "Position", "team"}.intersection(changes)
+        if moves:
+            self.add(dict(record, **changes))
+        else:
+            record.update(changes)
+
+    def sync(self, scores):
+        """
+        Bring the indexes in line with a newer scored table, touching only
+        the players that were added, removed or changed.
+
+        Returns:
+            int: The number of players added, removed or changed.
+        """
+        records = {int(record["ID"]): record for record in self._records(scores)}
+        touched = 0
+        for player_id in set(self.players) - set(records):
+            self.remove(player_id)
+            touched += 1
+        for player_id, record in records.items():
+            current = self.players.get(player_id)
+            if current is None:
+                self.add(record)
+            elif not all(_same(current[name], value) for name, value in record.items()):
+                self.update(player_id, **{name: value for name, value in record.items() if name != "ID"})
+            else:
+                continue
+            touched += 1
+        return touched
+
+    def top(self, position=None, min_price=None, max_price=None, min_ownership=None, max_ownership=None,
+            teams=None, exclude_teams=(), exclude=(), min_fitness=0.0, limit=10):
+        """
+        The best players by the score column passing every given filter.
+
+        Parameters:
+            position (str): "GKP", "DEF", "MID" or "FWD".
+            min_price, max_price (float): Price bounds in £m, inclusive.
+            min_ownership, max_ownership (float): selected_by_percent bounds;
+                the maximum is exclusive ("owned by less than 5%").
+            teams (iterable): Only these clubs.
+            exclude_teams (iterable): Not these clubs.
+            exclude (iterable): Not these player IDs.
+            min_fitness (float): Lowest chance of playing, 0 to 1.
+            limit (int): Players returned, at least 1.
+
+        Returns:
+            list: Player dicts, best first.
+        """
+        if limit < 1:
+            raise ValueError(f"The limit must be at least 1, not {limit}.")
+        if teams is not None:
+            sources = [self.by_team[team] for team in set(teams) - set(exclude_teams) if team in self.by_team]
+        else:
+            low_price = -math.inf if min_price is None else _price_band(min_price)
+            high_price = math.inf if max_price is None else _price_band(max_price)
+            low_owned = -math.inf if min_ownership is None else _ownership_band(min_ownership)
+            high_owned = math.inf if max_ownership is None else _ownership_band(max_ownership)
+            sources = [entries for (bucket_position, price_band, owned_band), entries in self.buckets.items()
+                       if (position is None or bucket_position == position)
+                       and low_price <= price_band <= high_price and low_owned <= owned_band <= high_owned]
+
+        exclude, exclude_teams = set(exclude), set(exclude_teams)
+        found = []
+        for _, player_id in heapq.merge(*sources) if len(sources) > 1 else (sources[0] if sources else ()):
+            record = self.players[player_id]
+            if (player_id in exclude or record["team"] in exclude_teams
+                    or (position is not None and record["Position"] != position)
+                    or (min_price is not None and record["Price"] < min_price - 1e-9)
+                    or (max_price is not None and record["Price"] > max_price + 1e-9)
+                    or (min_ownership is not None and record["Ownership"] < min_ownership)
+                    or (max_ownership is not None and record["Ownership"] >= max_ownership)
+                    or not record["Fitness"] >= min_fitness):
+                continue
+            found.append(dict(record))
+            if len(found) == limit:
+                break
+        return found
+
+    def differentials(self, max_ownership=5.0, limit=3, min_fitness=0.75):
+        """The best `limit` players per position owned by less than `max_ownership` percent."""
+        return {position: self.top(position=position, max_ownership=max_ownership,
+                                   min_fitness=min_fitness, limit=limit)
+                for position in POSITION_NAMES.values()}
+
+
+def parse_query(terms):
+    """
+    `PlayerQuery.top` arguments from "name=value" strings, e.g.
+    ["position=MID", "max_price=7.0", "max_ownership=5", "exclude_teams=3,7"].
+    """
+    query = {}
+    for term in terms:
+        name, _, value = term.partition("=")
+        if name not in QUERY_FIELDS or not value:
+            raise ValueError(f"Invalid query term '{term}'. Use name=value with a name from {QUERY_FIELDS}.")
+        try:
+            if name == "position":
+                query[name] = value.upper()
+            elif name in ("teams", "exclude_teams", "exclude"):
+                query[name] = [int(item) for item in value.split(",") if item]
+            elif name == "limit":
+                query[name] = int(value)
+            else:
+                query[name] = float(value)
+        except ValueError:
+            kind = {"teams": "comma-separated whole numbers", "exclude_teams": "comma-separated whole numbers",
+                    "exclude": "comma-separated whole numbers", "limit": "a whole number"}.get(name, "a number")
+            raise ValueError(f"Invalid query term '{term}': {name} must be {kind}.") from None
+        if name == "limit" and query[name] < 1:
+            raise ValueError(f"Invalid query term '{term}': limit must be at least 1.")
+        if isinstance(query[name], float) and query[name] != query[name]:
+            raise ValueError(f"Invalid query term '{term}': {name} must be a number.")
+    return query
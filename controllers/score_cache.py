@@ -0,0 +1,169 @@
+import hashlib
+import json
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# Bump when the scoring formulas change, so old cached scores are ignored.
+CACHE_VERSION = 1
+# The inputs scoring reads, per source. Other fields (transfers, ownership,
+# form...) change all the time without affecting the scores.
+INPUT_COLUMNS = {
+    "players": ["id", "web_name", "element_type", "team", "now_cost", "chance_of_playing_next_round"],
+    "history": ["round", "opponent_team", "was_home", "minutes", "expected_goals", "expected_assists",
+                "expected_goal_involvements", "expected_goals_conceded", "ict_index", "total_points"],
+    "history_past": ["season_name", "minutes", "expected_goals", "expected_assists",
+                     "expected_goal_involvements", "expected_goals_conceded", "ict_index", "total_points"],
+    "fixtures": ["event", "team_h", "team_a"],
+}
+TEXT_COLUMNS = {"web_name", "season_name"}
+
+
+def _normalized(df, columns):
+    """The input columns with stable dtypes, so a NaN elsewhere in the league cannot change a hash."""
+    normalized = pd.DataFrame(index=df.index)
+    for column in columns:
+        values = df[column] if column in df.columns else pd.Series(np.nan, index=df.index)
+        if column in TEXT_COLUMNS:
+            normalized[column] = values.astype(str)
+        else:
+            normalized[column] = pd.to_numeric(values, errors="coerce").astype(float)
+    return normalized
+
+
+def _frame_hashes(df, columns, player_ids):
+    """One 64-bit hash per player of their rows in a long-format frame, in row order."""
+    hashes = np.zeros(len(player_ids), dtype=np.uint64)
+    if df is None or df.empty or "player_id" not in df.columns:
+        return hashes
+    df = df[df["player_id"].isin(player_ids)]
+    df = df.iloc[np.argsort(df["player_id"].to_numpy(), kind="stable")]
+    owners = df["player_id"].to_numpy(dtype=np.int64)
+    rows = _normalized(df, columns)
+    rows["order"] = df.groupby("player_id").cumcount().to_numpy()
+    row_hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+    if not len(row_hashes):
+        return hashes
+
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    combined = np.bitwise_xor.reduceat(row_hashes, starts)
+    positions = pd.Index(player_ids).get_indexer(owners[starts])
+    hashes[positions] = combined
+    return hashes
+
+
+def input_hashes(players, history, past_history, fixtures, team_index, settings):
+    """
+    Hash everything a player's score depends on.
+
+    Parameters:
+        players (pd.DataFrame): bootstrap-static `elements` rows to score.
+        history, past_history, fixtures (pd.DataFrame): Long-format rows with
+            a `player_id` column.
+        team_index (TeamIndex): Team strengths. Every club shows up in some
+            player's history or fixtures, so the whole difficulty table is
+            part of every key.
+        settings (tuple): Scoring constants and the engine, e.g.
+            ("vectorized", CURRENT_SEASON, DECAY_FACTOR).
+
+    Returns:
+        pd.Series: A hex key per player ID, in the order of `players`.
+    """
+    player_ids = players["id"].to_numpy(dtype=np.int64)
+    shared = hashlib.sha1(repr((CACHE_VERSION, settings)).encode())
+    shared.update(np.ascontiguousarray(team_index.difficulty_table).tobytes())
+
+    parts = pd.DataFrame({
+        "players": pd.util.hash_pandas_object(
+            _normalized(players, INPUT_COLUMNS["players"]), index=False).to_numpy(),
+        "history": _frame_hashes(history, INPUT_COLUMNS["history"], player_ids),
+        "history_past": _frame_hashes(past_history, INPUT_COLUMNS["history_past"], player_ids),
+        "fixtures": _frame_hashes(fixtures, INPUT_COLUMNS["fixtures"], player_ids),
+    })
+    player_hashes = pd.util.hash_pandas_object(parts, index=False).to_numpy()
+    prefix = shared.hexdigest()[:16]
+    return pd.Series([f"{prefix}{value:016x}" for value in player_hashes],
+                     index=pd.Index(player_ids, name="player_id"))
+
+
+class ScoreCache:
+    """
+    Score rows from earlier runs, stored in SQLite with the hash of the
+    inputs they were computed from.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores (player_id INTEGER PRIMARY KEY, input_hash TEXT, row TEXT)")
+        self.conn.commit()
+
+    def lookup(self, keys):
+        """
+        Parameters:
+            keys (pd.Series): Input hashes indexed by player ID.
+
+        Returns:
+            tuple: (list of cached score rows whose hash still matches,
+            list of player IDs that must be scored again)
+        """
+        stored = dict(
+            (player_id, (input_hash, row)) for player_id, input_hash, row in
+            self.conn.execute("SELECT player_id, input_hash, row FROM scores"))
+        hits, misses = [], []
+        for player_id, key in keys.items():
+            entry = stored.get(int(player_id))
+            if entry and entry[0] == key:
+                hits.append(json.loads(entry[1]))
+            else:
+                misses.append(int(player_id))
+        return hits, misses
+
+    def update(self, keys, scores):
+        """Store freshly computed score rows (with an "ID" column) under their keys."""
+        rows = scores.to_dict(orient="records")
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO scores (player_id, input_hash, row) VALUES (?, ?, ?)",
+                ((int(row["ID"]), keys[row["ID"]], json.dumps(row, default=lambda value: value.item()))
+                 for row in rows))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def score_with_cache(cache, keys, score_players):
+    """
+    Score only the players whose inputs changed since they were cached.
+
+    Parameters:
+        cache (ScoreCache): The cache to read and update.
+        keys (pd.Series): Input hashes indexed by player ID, in output order.
+        score_players (callable): Takes a list of player IDs and returns
+            their score rows as a DataFrame with an "ID" column. With no
+            players it is called with an empty list, for the empty frame's
+            columns.
+
+    Returns:
+        tuple: (scores DataFrame in the order of `keys`, hits, misses)
+    """
+    hits, misses = cache.lookup(keys)
+    frames = [pd.DataFrame(hits)] if hits else []
+    if misses:
+        fresh = score_players(misses)
+        cache.update(keys, fresh)
+        frames.append(fresh)
+    if not frames:
+        return score_players([]), 0, 0
+
+    scores = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    order = pd.Index(scores["ID"]).get_indexer(keys.index)
+    return scores.iloc[order].reset_index(drop=True), len(hits), len(misses)
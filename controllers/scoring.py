@@ -0,0 +1,270 @@
+import numpy as np
+import pandas as pd
+
+from controllers.team import TeamIndex
+
+GAMEWEEKS_PER_SEASON = 38
+FORWARD = 4
+POSITION_NAMES = {1: "GKP", 2: "DEF", 3: "MID", 4: "FWD"}
+SCORE_COLUMNS = [
+    "ID", "GW played", "Player", "Price", "Position", "Past History Score",
+    "Performance Score", "Previous Fixtures", "Upcoming Fixtures", "Combined score",
+    "Combined with availability", "Fitness", "Gw score", "team",
+]
+
+
+def performance_scores(rows, position):
+    """Vectorized `Player.calculate_performance_score_per_gw` over gameweek or season rows."""
+    x_total = rows["expected_goals"] + rows["expected_assists"] + rows["expected_goal_involvements"]
+    x_total = np.where(np.asarray(position) != FORWARD, x_total - rows["expected_goals_conceded"], x_total)
+    total_score = rows["ict_index"].to_numpy() + rows["total_points"].to_numpy() + x_total
+    return np.fmax(0, np.round(total_score, 2))
+
+
+def _player_rows(df, player_ids, columns):
+    """Rows of a long-format frame belonging to `player_ids`, with numeric `columns`."""
+    if df is None or "player_id" not in df.columns:
+        df = pd.DataFrame(columns=["player_id"])
+    df = df[df["player_id"].isin(player_ids)].copy()
+    for column in columns:
+        df[column] = pd.to_numeric(df[column], errors="coerce") if column in df.columns else 0.0
+    df["player_id"] = df["player_id"].astype(np.int64)
+    return df
+
+
+def score_components(players, history, past_history, fixtures, teams):
+    """
+    The parts of the scoring engine that do not depend on its settings
+    (season, decay factor, ...), computed once and shared by `score_league`,
+    the parameter sweep and live rescoring, which combine them with
+    different settings or gameweek rows.
+
+    Parameters:
+        players (pd.DataFrame): bootstrap-static `elements` rows to score.
+        history (pd.DataFrame): gameweek history rows with a `player_id` column.
+        past_history (pd.DataFrame): past season rows with a `player_id` column.
+        fixtures (pd.DataFrame): fixture rows with a `player_id` column.
+        teams (TeamIndex): Team strengths, or a list of team dicts.
+
+    Returns:
+        dict: The player index, per-row frames for past seasons ("past":
+        score, minutes_weight, season_year, season_count, season_order) and
+        played gameweeks ("played": score, difficulty, round, round_share), the
+        upcoming fixture rows, and per-player arrays: total_score, num_gws,
+        upcoming_difficulty, gw_difficulty, price and availability.
+    """
+    team_index = TeamIndex.of(teams)
+    player_ids = players["id"].to_numpy(dtype=np.int64)
+    index = pd.Index(player_ids, name="player_id")
+    position_by_id = pd.Series(players["element_type"].to_numpy(), index=index)
+    team_by_id = pd.Series(players["team"].to_numpy(), index=index)
+    stat_columns = ["expected_goals", "expected_assists", "expected_goal_involvements",
+                    "expected_goals_conceded", "ict_index", "total_points", "minutes"]
+
+    # Past seasons
+    past = _player_rows(past_history, player_ids, stat_columns)
+    past_position = position_by_id.reindex(past["player_id"]).to_numpy()
+    max_minutes = past.groupby("player_id")["minutes"].transform("max").to_numpy()
+    season_minutes = past["minutes"].to_numpy()
+    past = pd.DataFrame({
+        "player_id": past["player_id"].to_numpy(),
+        "score": performance_scores(past, past_position),
+        "minutes_weight": np.where(season_minutes > 0,
+                                   1 + season_minutes / np.where(max_minutes > 0, max_minutes, 1), 1),
+        "season_year": past["season_name"].astype(str).str.split("/").str[0].astype(np.int64).to_numpy()
+        if len(past) else np.zeros(0, dtype=np.int64),
+        "season_count": past.groupby("player_id")["player_id"].transform("size").to_numpy(),
+        "season_order": past.groupby("player_id").cumcount().to_numpy(),
+    })
+
+    # Played gameweeks
+    played = _player_rows(history, player_ids, stat_columns + ["round", "opponent_team"])
+    played = played[played["minutes"] > 0]
+    played_position = position_by_id.reindex(played["player_id"]).to_numpy()
+    last_played_gw = played.groupby("player_id")["round"].transform("max").to_numpy()
+    was_home = played["was_home"].astype(bool).to_numpy() if "was_home" in played.columns \
+        else np.zeros(len(played), dtype=bool)
+    played = pd.DataFrame({
+        "player_id": played["player_id"].to_numpy(),
+        "score": performance_scores(played, played_position),
+        "difficulty": team_index.difficulty(
+            team_by_id.reindex(played["player_id"]).to_numpy(),
+            played["opponent_team"].to_numpy(), was_home, played_position),
+        "round": played["round"].to_numpy(),
+        "round_share": played["round"].to_numpy() / last_played_gw,
+    })
+    gameweeks = played.groupby("player_id").agg(
+        total_score=("score", "sum"), num_gws=("score", "size")
+    ).reindex(index, fill_value=0)
+
+    # Upcoming fixtures, weighted towards the next gameweek
+    upcoming = _player_rows(fixtures, player_ids, ["event", "team_h", "team_a"])
+    upcoming = upcoming[upcoming["event"].notna()]
+    upcoming_team = team_by_id.reindex(upcoming["player_id"]).to_numpy()
+    upcoming_home = upcoming["team_h"].to_numpy() == upcoming_team
+    upcoming_opponent = np.where(upcoming_team == upcoming["team_a"].to_numpy(),
+                                 upcoming["team_h"].to_numpy(), upcoming["team_a"].to_numpy())
+    upcoming["difficulty"] = team_index.difficulty(
+        upcoming_team, upcoming_opponent, upcoming_home,
+        position_by_id.reindex(upcoming["player_id"]).to_numpy())
+    next_event = upcoming.groupby("player_id")["event"].transform("min").to_numpy()
+    upcoming["weighted"] = upcoming["difficulty"] * (
+        1 + 1 / np.maximum(upcoming["event"].to_numpy() - next_event, 1))
+    upcoming_difficulty = upcoming.groupby("player_id")["weighted"].sum().reindex(index, fill_value=0)
+    next_fixture = upcoming[upcoming["event"].to_numpy() == next_event]
+    gw_difficulty = next_fixture.groupby("player_id")["difficulty"].first().reindex(index, fill_value=0)
+
+    if "chance_of_playing_next_round" in players.columns:
+        fitness = pd.to_numeric(players["chance_of_playing_next_round"], errors="coerce")
+        player_availability = (fitness.fillna(100) / 100).to_numpy()
+    else:
+        player_availability = np.ones(len(index))
+
+    return {
+        "index": index,
+        "past": past,
+        "played": played,
+        "upcoming": upcoming,
+        "total_score": gameweeks["total_score"].to_numpy(dtype=float),
+        "num_gws": gameweeks["num_gws"].to_numpy(),
+        "upcoming_difficulty": upcoming_difficulty.to_numpy(dtype=float),
+        "gw_difficulty": gw_difficulty.to_numpy(dtype=float),
+        "price": players["now_cost"].to_numpy(dtype=float),
+        "availability": player_availability,
+    }
+
+
+def _score(players, history, past_history, fixtures, teams, current_season, decay_factor):
+    """
+    The scoring engine behind `score_league` and `project_gameweeks`.
+
+    Returns:
+        tuple: (scores DataFrame, average performance score per player ID,
+        upcoming fixture rows with their difficulty).
+    """
+    parts = score_components(players, history, past_history, fixtures, teams)
+    index = parts["index"]
+
+    # Past seasons: past_score = (past_score + score * weight) / 38 per season,
+    # unrolled as a geometric sum so it can be aggregated per player.
+    past = parts["past"]
+    season_count = past["season_count"].to_numpy()
+    recency_weight = 1 + (current_season - past["season_year"].to_numpy()) / season_count
+    past = past.assign(weighted=past["score"].to_numpy() * recency_weight * past["minutes_weight"].to_numpy()
+                       * decay_factor / np.power(float(GAMEWEEKS_PER_SEASON),
+                                                 season_count - past["season_order"].to_numpy()))
+    seasons = past.groupby("player_id")["weighted"].agg(["sum", "size"]).reindex(index, fill_value=0)
+    past_history_score = seasons["sum"] + np.power(float(GAMEWEEKS_PER_SEASON), -seasons["size"].astype(float))
+
+    # Played gameweeks, weighted towards the most recent ones
+    played = parts["played"]
+    played = played.assign(weighted=played["difficulty"].to_numpy() * (1 + played["round_share"].to_numpy()))
+    previous_difficulty = played.groupby("player_id")["weighted"].sum() \
+        .reindex(index, fill_value=0).to_numpy(dtype=float)
+
+    num_gws = parts["num_gws"]
+    average_performance_score = np.divide(
+        parts["total_score"] * past_history_score.to_numpy(), num_gws,
+        out=np.zeros(len(index)), where=num_gws > 0)
+
+    price = parts["price"]
+    price_factor = np.log(np.where(price > 0, price, 0) + 1)
+    aggregate_score = np.divide(average_performance_score, price_factor,
+                                out=np.zeros(len(index)), where=price > 0)
+
+    total_difficulty = previous_difficulty - parts["upcoming_difficulty"]
+    combined_score = aggregate_score / (1 + np.abs(total_difficulty))
+    player_availability = parts["availability"]
+
+    scores = pd.DataFrame({
+        "ID": index.to_numpy(),
+        "GW played": num_gws,
+        "Player": players["web_name"].to_numpy(),
+        "Price": price / 10,
+        "Position": players["element_type"].map(POSITION_NAMES).to_numpy(),
+        "Past History Score": past_history_score.to_numpy(),
+        "Performance Score": aggregate_score,
+        "Previous Fixtures": previous_difficulty,
+        "Upcoming Fixtures": parts["upcoming_difficulty"],
+        "Combined score": combined_score,
+        "Combined with availability": combined_score * player_availability,
+        "Fitness": player_availability,
+        "Gw score": average_performance_score / (1 + parts["gw_difficulty"]),
+        "team": players["team"].to_numpy(),
+    }, columns=SCORE_COLUMNS)
+    return scores, pd.Series(average_performance_score, index=index), parts["upcoming"]
+
+
+def score_league(players, history, past_history, fixtures, teams, current_season, decay_factor):
+    """
+    Score every player at once, producing the same columns as the per-player
+    `calculate_performance` in main.py.
+
+    Gameweek, season and fixture rows for the whole league are processed as
+    long-format frames (one row per player and gameweek, keyed by
+    `player_id`) with grouped aggregations instead of per-row Python calls.
+    Players without any fixtures, where the per-player version raises, get a
+    next-fixture difficulty of 0.
+
+    Parameters:
+        players (pd.DataFrame): bootstrap-static `elements` rows to score.
+        history (pd.DataFrame): gameweek history rows with a `player_id` column.
+        past_history (pd.DataFrame): past season rows with a `player_id` column.
+        fixtures (pd.DataFrame): fixture rows with a `player_id` column.
+        teams (TeamIndex): Team strengths, or a list of team dicts.
+        current_season (int): Start year of the current season.
+        decay_factor (float): Weight applied to past seasons.
+
+    Returns:
+        pd.DataFrame: One row per player, in the order of `players`.
+    """
+    return _score(players, history, past_history, fixtures, teams, current_season, decay_factor)[0]
+
+
+def project_gameweeks(players, history, past_history, fixtures, teams, current_season, decay_factor):
+    """
+    Projected score per player for each upcoming gameweek: the "Gw score"
+    formula (average performance score / (1 + fixture difficulty)) applied to
+    every fixture, summed over double gameweeks and 0 in blank gameweeks.
+
+    Takes the same arguments as `score_league`.
+
+    Returns:
+        pd.DataFrame: Indexed by player ID, with one column per upcoming event.
+    """
+    _, average_performance_score, upcoming = _score(
+        players, history, past_history, fixtures, teams, current_season, decay_factor)
+    upcoming = upcoming.assign(
+        projected=average_performance_score.reindex(upcoming["player_id"]).to_numpy()
+        / (1 + upcoming["difficulty"].to_numpy()),
+        event=upcoming["event"].astype(np.int64))
+    projections = upcoming.pivot_table(index="player_id", columns="event", values="projected",
+                                       aggfunc="sum", fill_value=0.0)
+    return projections.reindex(average_performance_score.index, fill_value=0.0)
+
+
+def compare_with_reference(scores, reference, rtol=1e-9, atol=1e-12):
+    """
+    Compare `score_league` output against `calculate_performance` rows.
+
+    Returns:
+        pd.DataFrame: The (ID, column, engine, reference) values that differ;
+        empty when both paths agree.
+    """
+    scores = scores.set_index("ID").sort_index()
+    reference = reference.set_index("ID").sort_index()
+    if not scores.index.equals(reference.index):
+        raise ValueError("Scored players differ between the engine and the reference.")
+
+    mismatches = []
+    for column in scores.columns:
+        engine_values = scores[column]
+        reference_values = reference[column]
+        if pd.api.types.is_numeric_dtype(reference_values):
+            equal = np.isclose(engine_values.astype(float), reference_values.astype(float),
+                               rtol=rtol, atol=atol, equal_nan=True)
+        else:
+            equal = (engine_values == reference_values).to_numpy()
+        for player_id in scores.index[~equal]:
+            mismatches.append((player_id, column, engine_values[player_id], reference_values[player_id]))
+    return pd.DataFrame(mismatches, columns=["ID", "column", "engine", "reference"])
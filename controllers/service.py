@@ -0,0 +1,319 @@
+import json
+import logging
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from controllers.optimizer import optimize_squad
+from controllers.query import PlayerQuery, parse_query
+from controllers.lineup import split_lineup
+
+logger = logging.getLogger("fpl_buddy")
+
+
+def _records(df):
+    """JSON-ready rows, with NaN as null."""
+    return json.loads(df.to_json(orient="records"))
+
+
+class LeagueSnapshot:
+    """
+    A scored league held in memory and answering queries against it.
+
+    Parameters:
+        scores (pd.DataFrame): `score_league` output for the fit players,
+            optionally with "Ownership" (selected_by_percent).
+        budget (float): Squad budget in £m.
+        position_limits (dict): Squad size per position.
+        previous (LeagueSnapshot): The snapshot this one replaces. Its
+            PlayerQuery is synced to the new scores and shared instead of
+            being built again.
+    """
+
+    def __init__(self, scores, budget, position_limits, max_per_team=3, previous=None):
+        self.scores = scores.set_index("ID", drop=False).sort_values(by="Combined score", ascending=False)
+        self.budget = budget
+        self.position_limits = position_limits
+        self.max_per_team = max_per_team
+        self.loaded_at = time.time()
+        self.squads = {}
+        self.lock = threading.Lock()
+        if previous is None:
+            self.index = PlayerQuery(self.scores)
+            self.index_lock = threading.Lock()
+        else:
+            # The previous snapshot keeps answering while the index is synced.
+            self.index = previous.index
+            self.index_lock = previous.index_lock
+            with self.index_lock:
+                self.index.sync(self.scores)
+
+    def player(self, player_id):
+        if player_id not in self.scores.index:
+            raise KeyError(f"No scored player with ID {player_id}.")
+        return _records(self.scores.loc[[player_id]])[0]
+
+    def _available(self, min_availability, exclude=()):
+        players = self.scores[self.scores["Fitness"] >= min_availability]
+        return players[~players["ID"].isin(exclude)]
+
+    def query(self, **filters):
+        """Full rows of the best players passing `PlayerQuery.top` filters."""
+        with self.index_lock:
+            found = self.index.top(**filters)
+        # A replaced snapshot may share an index that has moved on.
+        return _records(self.scores.loc[[record["ID"] for record in found if record["ID"] in self.scores.index]])
+
+    def differentials(self, max_ownership=5.0, limit=3, min_availability=0.75):
+        """The best players per position owned by less than `max_ownership` percent."""
+        return {position: self.query(position=position, max_ownership=max_ownership,
+                                     min_fitness=min_availability, limit=limit)
+                for position in self.position_limits}
+
+    def replacement(self, player_id, max_price=None, min_availability=0.75, squad=(), limit=5):
+        """
+        The best players of the same position as `player_id` costing at most
+        `max_price` (default: the player's own price), skipping `squad`
+        members and clubs the rest of `squad` already has the maximum from.
+        """
+        player = self.player(player_id)
+        others = self.scores[self.scores["ID"].isin(set(squad) - {player_id})]
+        full_clubs = others["team"].value_counts()
+        full_clubs = full_clubs[full_clubs >= self.max_per_team].index
+        return self.query(position=player["Position"], max_price=player["Price"] if max_price is None else max_price,
+                          min_fitness=min_availability, exclude=set(squad) | {player_id},
+                          exclude_teams=full_clubs, limit=limit)
+
+    def best_xi(self, min_availability=0.0, weight_availability=True, budget=None, exclude=(), include=()):
+        """
+        The best squad under the budget, position and club limits, with its
+        starting XI, bench (in substitution order), captain and vice-captain.
+
+        Availability decisions that `select_team` asks about interactively
+        are parameters here: players below `min_availability` are left out,
+        and with `weight_availability` every score is multiplied by the
+        player's chance of playing. `include` players are always picked.
+        Results are cached per snapshot and parameters.
+        """
+        # Anything above the price of every player buys the same squad.
+        budget = min(self.budget if budget is None else budget, round(float(self.scores["Price"].sum()), 1))
+        key = (min_availability, weight_availability, budget, tuple(sorted(exclude)), tuple(sorted(include)))
+        with self.lock:
+            if key in self.squads:
+                return self.squads[key]
+
+        pool = self._available(min_availability, exclude).copy()
+        pool = pd.concat([pool, self.scores[self.scores["ID"].isin(set(include) - set(pool["ID"]))]])
+        pool["Priority_Score"] = pool["Combined score"] * (pool["Fitness"] if weight_availability else 1.0)
+        # Forced picks outscore any possible squad without them.
+        pool.loc[pool["ID"].isin(include), "Priority_Score"] += pool["Priority_Score"].abs().sum() + 1
+        squad = optimize_squad(pool, "Priority_Score", budget, self.position_limits, self.max_per_team)
+        starters, bench, captain, vice_captain = split_lineup(squad, "Gw score")
+        result = {
+            "starters": _records(starters.drop(columns="Priority_Score")),
+            "bench": _records(bench.drop(columns="Priority_Score")),
+            "captain": captain,
+            "vice_captain": vice_captain,
+            "cost": round(float(squad["Price"].sum()), 1),
+        }
+        with self.lock:
+            self.squads[key] = result
+        return result
+
+
+class RecommendationService:
+    """
+    A local HTTP/JSON service over a LeagueSnapshot that is rebuilt in the
+    background every `interval` seconds.
+
+    Queries always read the current snapshot; a refresh builds a new one
+    and swaps it in when ready, so answers never wait on fetching or
+    scoring. A failed refresh is logged and the previous snapshot kept.
+
+    Parameters:
+        load (callable): Called with the current LeagueSnapshot (None the
+            first time), returns a new one.
+        interval (float): Seconds between refreshes (0 disables them).
+        host (str): Interface to bind.
+        port (int): Port to bind.
+    """
+
+    def __init__(self, load, interval=3600, host="127.0.0.1", port=8000):
+        self.load = load
+        self.interval = interval
+        self.snapshot = None
+        self.refreshes = 0
+        self.last_error = None
+        self.refresh_lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def refresh(self):
+        """Build a new snapshot and swap it in. Returns False if one is already being built."""
+        if not self.refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            started = time.perf_counter()
+            self.snapshot = self.load(self.snapshot)
+            self.refreshes += 1
+            self.last_error = None
+            logger.info("Snapshot refreshed in %.1fs (%d players).",
+                        time.perf_counter() - started, len(self.snapshot.scores))
+        except Exception as exc:
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            logger.warning("Refresh failed, keeping the previous snapshot: %s", self.last_error)
+        finally:
+            self.refresh_lock.release()
+        return True
+
+    def _refresh_loop(self):
+        self.refresh()
+        while self.interval and not self.stopped.wait(self.interval):
+            self.refresh()
+
+    def status(self):
+        snapshot = self.snapshot
+        return {
+            "players": len(snapshot.scores) if snapshot else 0,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "refreshes": self.refreshes,
+            "refreshing": self.refresh_lock.locked(),
+            "last_error": self.last_error,
+        }
+
+    def answer(self, method, path, params):
+        """
+        Route a request to the snapshot.
+
+        Returns:
+            tuple: (HTTP status, JSON-ready body)
+        """
+        snapshot = self.snapshot
+        if path == "/health":
+            return 200, self.status()
+        if path == "/refresh" and method == "POST":
+            started = not self.refresh_lock.locked()
+            threading.Thread(target=self.refresh, daemon=True).start()
+            return 202, {"started": started}
+        if snapshot is None:
+            return 503, {"error": "The league is still loading."}
+        if path.startswith("/players/"):
+            return 200, snapshot.player(_id(path.rsplit("/", 1)[1], "player ID"))
+        if path == "/replacement":
+            if "player" not in params:
+                raise ValueError("The 'player' parameter is required.")
+            return 200, snapshot.replacement(
+                _id(params["player"], "'player' parameter"), _float(params, "max_price"),
+                _float(params, "min_availability", 0.75), _ids(params, "squad"), _limit(params, 5))
+        if path == "/query":
+            return 200, snapshot.query(**parse_query(f"{name}={value}" for name, value in params.items()))
+        if path == "/differentials":
+            return 200, snapshot.differentials(_float(params, "max_ownership", 5.0), _limit(params, 3),
+                                               _float(params, "min_availability", 0.75))
+        if path == "/best-xi":
+            return 200, snapshot.best_xi(
+                _float(params, "min_availability", 0.0),
+                params.get("weight_availability", "1") not in {"0", "false", "no"},
+                _float(params, "budget"), _ids(params, "exclude"), _ids(params, "include"))
+        return 404, {"error": f"Unknown path {path}."}
+
+    def _handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug("%s %s", self.address_string(), format % args)
+
+            def _respond(self, method):
+                url = urlparse(self.path)
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                try:
+                    status, body = service.answer(method, url.path.rstrip("/") or "/", params)
+                except KeyError as exc:
+                    status, body = 404, {"error": str(exc.args[0]) if exc.args else "Not found."}
+                except ValueError as exc:
+                    status, body = 400, {"error": str(exc)}
+                except Exception:
+                    logger.exception("Failed to answer %s %s", method, self.path)
+                    status, body = 500, {"error": "Internal error."}
+                payload = json.dumps(body, default=_json_default).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+        return Handler
+
+    def serve_forever(self):
+        """
+        Serve until interrupted. The first snapshot loads in the background;
+        queries get a 503 until it is ready.
+        """
+        threading.Thread(target=self._refresh_loop, daemon=True).start()
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stopped.set()
+            self.server.server_close()
+
+
+def _float(params, name, default=None):
+    if name not in params:
+        return default
+    try:
+        value = float(params[name])
+    except ValueError:
+        raise ValueError(f"The '{name}' parameter must be a number, not '{params[name]}'.") from None
+    if not math.isfinite(value):
+        raise ValueError(f"The '{name}' parameter must be a finite number, not '{params[name]}'.")
+    return value
+
+
+def _id(value, what):
+    """A player ID from request text, or a ValueError naming `what` was wrong."""
+    try:
+        player_id = int(value)
+    except ValueError:
+        raise ValueError(f"The {what} must be a whole number, not '{value}'.") from None
+    if player_id < 1:
+        raise ValueError(f"The {what} must be positive, not '{value}'.")
+    return player_id
+
+
+def _ids(params, name):
+    return [_id(player_id, f"'{name}' parameter (comma-separated player IDs)")
+            for player_id in params.get(name, "").split(",") if player_id]
+
+
+def _limit(params, default):
+    if "limit" not in params:
+        return default
+    return _id(params["limit"], "'limit' parameter")
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
@@ -0,0 +1,179 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+CHUNK_SIZE = 10_000
+PERCENTILES = (10, 50, 90)
+
+
+def _simulate_chunk(model, sims, gameweeks, seed):
+    """
+    Simulate `sims` runs of `gameweeks` gameweeks for one squad.
+
+    Returns:
+        tuple: (points per player, shape (sims, players); squad points before
+        the captain's bonus, shape (sims,); and the captain's bonus for each
+        captain choice, shape (sims, starters))
+    """
+    rng = np.random.default_rng(seed)
+    appearances, counts, play_probability = model["appearances"], model["counts"], model["play_probability"]
+    starters, bench, goalkeeper = model["starters"], model["bench"], model["goalkeeper"]
+    captains, vices = model["captains"], model["vices"]
+
+    player_points = np.zeros((sims, len(counts)))
+    squad_points = np.zeros(sims)
+    captain_bonus = np.zeros((sims, len(captains)))
+    for _ in range(gameweeks):
+        # A player appears with their availability times their appearance
+        # rate, and then scores one of their past appearances at random.
+        played = rng.random((sims, len(counts))) < play_probability
+        picks = (rng.random((sims, len(counts))) * np.maximum(counts, 1)).astype(np.int64)
+        points = np.where(played, np.take_along_axis(appearances, picks.T, axis=1).T, 0.0)
+        player_points += points
+
+        total = points[:, starters].sum(axis=1)
+        # Automatic substitutions: the bench goalkeeper for the starting one,
+        # and outfield bench players in order for outfield starters who did
+        # not play (formation minimums are not enforced).
+        starter_goalkeeper, bench_goalkeeper = goalkeeper
+        if starter_goalkeeper >= 0 and bench_goalkeeper >= 0:
+            total += np.where(~played[:, starter_goalkeeper] & played[:, bench_goalkeeper],
+                              points[:, bench_goalkeeper], 0.0)
+        outfield_starters = [row for row in starters if row != starter_goalkeeper]
+        outfield_bench = [row for row in bench if row != bench_goalkeeper]
+        if outfield_bench:
+            missing = (~played[:, outfield_starters]).sum(axis=1)
+            bench_played = played[:, outfield_bench]
+            used = bench_played & (np.cumsum(bench_played, axis=1) <= missing[:, None])
+            total += (points[:, outfield_bench] * used).sum(axis=1)
+
+        # The captain's points count twice, or the vice-captain's if the
+        # captain did not play.
+        captain_bonus += np.where(played[:, captains], points[:, captains],
+                                  np.where(played[:, vices], points[:, vices], 0.0))
+        squad_points += total
+    return player_points, squad_points, captain_bonus
+
+
+class PointsSimulator:
+    """
+    Monte Carlo points for players and squads, resampled from each player's
+    own gameweek history.
+
+    In every simulated gameweek a player plays with probability
+    availability x (share of their gameweeks with minutes), and then scores
+    the points of one of their past appearances, drawn uniformly.
+    Draws are NumPy-batched over simulations and players, in chunks of
+    CHUNK_SIZE simulations with their own seeds, so results only depend on
+    the seed and not on the number of workers.
+    """
+
+    def __init__(self, history, availability):
+        """
+        Parameters:
+            history (pd.DataFrame): Gameweek rows with "player_id", "minutes"
+                and "total_points" columns.
+            availability (pd.Series): Chance of playing (0 to 1) per player ID,
+                as from `normalize_fitness`.
+        """
+        history = history[["player_id", "minutes", "total_points"]].apply(pd.to_numeric, errors="coerce")
+        history = history.dropna(subset=["player_id"]).fillna(0)
+        self.rows_per_player = history.groupby("player_id").size()
+        appearances = history[history["minutes"] > 0]
+        self.appearances = {int(player_id): group.to_numpy(dtype=float)
+                            for player_id, group in appearances.groupby("player_id")["total_points"]}
+        self.availability = availability
+
+    def _model(self, squad_ids, starters, positions, captains):
+        """The arrays the simulation needs for a squad (picklable, for workers)."""
+        counts = np.array([len(self.appearances.get(player_id, ())) for player_id in squad_ids])
+        appearances = np.zeros((len(squad_ids), max(counts.max(initial=0), 1)))
+        for row, player_id in enumerate(squad_ids):
+            appearances[row, :counts[row]] = self.appearances.get(player_id, ())
+        rows = self.rows_per_player.reindex(squad_ids, fill_value=0).to_numpy()
+        appearance_rate = np.divide(counts, rows, out=np.zeros(len(rows)), where=rows > 0)
+        play_probability = appearance_rate * self.availability.reindex(squad_ids, fill_value=1.0).to_numpy()
+
+        bench = [row for row in range(len(squad_ids)) if row not in starters]
+        goalkeeper = tuple(next((row for row in group if positions[row] == "GKP"), -1)
+                           for group in (starters, bench))
+        return {
+            "appearances": appearances, "counts": counts, "play_probability": play_probability,
+            "starters": list(starters), "bench": bench, "goalkeeper": goalkeeper,
+            "captains": np.array([captain for captain, _ in captains]),
+            "vices": np.array([vice for _, vice in captains]),
+        }
+
+    def expected_points(self, player_ids):
+        """Expected points per gameweek for each player, without simulating."""
+        model = self._model(list(player_ids), [], [None] * len(player_ids), [])
+        means = np.divide(model["appearances"].sum(axis=1), model["counts"],
+                          out=np.zeros(len(model["counts"])), where=model["counts"] > 0)
+        return pd.Series(means * model["play_probability"], index=list(player_ids))
+
+    def simulate_squad(self, starters, bench, positions, sims=20_000, gameweeks=1, seed=0, workers=1):
+        """
+        Simulate a squad's points, with automatic substitutions and every
+        starter considered as captain.
+
+        Parameters:
+            starters (list): IDs of the starting XI.
+            bench (list): IDs of the substitutes, in bench order.
+            positions (dict): Position name ("GKP", ...) per player ID.
+            sims (int): Number of simulations.
+            gameweeks (int): Gameweeks per simulation (e.g. 38 for a season).
+            seed (int): Seed for the random draws.
+            workers (int): Processes to spread the chunks of simulations over.
+
+        Returns:
+            dict: "players" (a DataFrame of expected points, spread and play
+            probability per player), "captains" (a DataFrame of squad points
+            for each captain choice, best first) and "squad" (the percentiles
+            of the squad's points with the best captain).
+        """
+        squad_ids = list(starters) + list(bench)
+        starter_rows = list(range(len(starters)))
+        expected = self.expected_points(squad_ids).to_numpy()
+        # Each starter as captain, with the best other starter as vice-captain.
+        order = sorted(starter_rows, key=lambda row: -expected[row])
+        captains = [(row, order[0] if order[0] != row else order[1]) for row in starter_rows]
+        model = self._model(squad_ids, starter_rows, [positions[player_id] for player_id in squad_ids], captains)
+
+        chunks = [min(CHUNK_SIZE, sims - start) for start in range(0, sims, CHUNK_SIZE)]
+        seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_simulate_chunk, [model] * len(chunks), chunks,
+                                            [gameweeks] * len(chunks), seeds))
+        else:
+            results = [_simulate_chunk(model, size, gameweeks, chunk_seed)
+                       for size, chunk_seed in zip(chunks, seeds)]
+        player_points = np.concatenate([result[0] for result in results])
+        captain_bonus = np.concatenate([result[2] for result in results])
+        squad_points = np.concatenate([result[1] for result in results])[:, None] + captain_bonus
+
+        player_percentiles = np.percentile(player_points, PERCENTILES, axis=0)
+        players = pd.DataFrame({
+            "ID": squad_ids,
+            "Position": [positions[player_id] for player_id in squad_ids],
+            "Starter": [row in starter_rows for row in range(len(squad_ids))],
+            "Play probability": model["play_probability"],
+            "Expected": player_points.mean(axis=0),
+            "Std": player_points.std(axis=0),
+            **{f"P{q}": values for q, values in zip(PERCENTILES, player_percentiles)},
+        })
+
+        captain_percentiles = np.percentile(squad_points, PERCENTILES, axis=0)
+        captain_table = pd.DataFrame({
+            "Captain": [squad_ids[captain] for captain, _ in captains],
+            "Vice": [squad_ids[vice] for _, vice in captains],
+            "Expected squad points": squad_points.mean(axis=0),
+            "Captain EV": captain_bonus.mean(axis=0),
+            **{f"P{q}": values for q, values in zip(PERCENTILES, captain_percentiles)},
+        }).sort_values("Expected squad points", ascending=False, ignore_index=True)
+
+        best = squad_points[:, int(np.argmax(squad_points.mean(axis=0)))]
+        squad = {"sims": sims, "gameweeks": gameweeks, "mean": float(best.mean()), "std": float(best.std()),
+                 **{f"p{q}": float(np.percentile(best, q)) for q in (5, 10, 25, 50, 75, 90, 95)}}
+        return {"players": players, "captains": captain_table, "squad": squad}
@@ -0,0 +1,48 @@
+import gzip
+import importlib.util
+import json
+import os
+import zlib
+
+# orjson decodes several times faster than the standard library; it is
+# optional, and only imported when a payload is decoded.
+HAS_ORJSON = importlib.util.find_spec("orjson") is not None
+
+
+def decode(content):
+    """Decode a JSON payload (bytes) with orjson when available."""
+    if HAS_ORJSON:
+        import orjson
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def save_payload(path, content):
+    """
+    Keep a raw API response body as a gzip-compressed snapshot, written
+    atomically so readers never see a partial file.
+
+    Parameters:
+        path (str): Where to write, e.g. "fpl_data/snapshots/bootstrap-static.json.gz".
+        content (bytes): The response body, exactly as received.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with gzip.open(temp_path, "wb", compresslevel=6) as file:
+        file.write(content)
+    os.replace(temp_path, path)
+
+
+def load_payload(path):
+    """
+    Decompress and decode a snapshot written by `save_payload`.
+
+    Raises:
+        ValueError: If the file is not gzip, is truncated or does not hold
+            JSON, e.g. after a disk error.
+    """
+    try:
+        with gzip.open(path, "rb") as file:
+            return decode(file.read())
+    except (gzip.BadGzipFile, EOFError, zlib.error, ValueError) as exc:
+        raise ValueError(f"The snapshot {path} is corrupt or truncated: {exc}") from exc
@@ -0,0 +1,168 @@
+import glob
+import os
+import re
+import sqlite3
+import time
+
+import pandas as pd
+from pandas.api.types import is_object_dtype, is_string_dtype
+
+KINDS = ("history", "history_past", "fixtures")
+
+
+def _coerce_columns(df):
+    """Parse numeric strings (e.g. "4.5" from the API) the way read_csv would."""
+    for column in df.columns:
+        if is_object_dtype(df[column]) or is_string_dtype(df[column]):
+            try:
+                df[column] = pd.to_numeric(df[column])
+            except (ValueError, TypeError):
+                pass
+    return df
+
+
+class GameweekStore:
+    """
+    A single SQLite database holding history, past-history and fixtures for
+    every player, in place of one CSV file per player and data type.
+
+    Each data type is a table of rows keyed by `player_id` (with an index on
+    it), so one player or the whole league can be read with a single query.
+    Columns are added on demand when the API starts returning new fields.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS players (player_id INTEGER PRIMARY KEY, fetched_at REAL)")
+        self.columns = {}
+        for kind in KINDS:
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{kind}" (player_id INTEGER NOT NULL)')
+            self.conn.execute(
+                f'CREATE INDEX IF NOT EXISTS "idx_{kind}_player_id" ON "{kind}" (player_id)')
+            self.columns[kind] = [row[1] for row in self.conn.execute(f'PRAGMA table_info("{kind}")')]
+        self.conn.commit()
+
+    def _ensure_columns(self, kind, columns):
+        for column in columns:
+            if column not in self.columns[kind]:
+                self.conn.execute(f'ALTER TABLE "{kind}" ADD COLUMN "{column}"')
+                self.columns[kind].append(column)
+
+    def write_rows(self, player_id, kind, rows):
+        """
+        Replace the stored rows of one data type for a player.
+
+        Parameters:
+            player_id (int): The ID of the player.
+            kind (str): 'history_past', 'history' or 'fixtures'.
+            rows (list | pd.DataFrame): The rows to store.
+        """
+        if kind not in KINDS:
+            raise ValueError("Invalid data type. Use 'history_past', 'history' or 'fixtures'.")
+
+        df = rows if isinstance(rows, pd.DataFrame) else _coerce_columns(pd.DataFrame(rows))
+        df = df.drop(columns=["player_id"], errors="ignore")
+        self.conn.execute(f'DELETE FROM "{kind}" WHERE player_id = ?', (int(player_id),))
+        if df.empty:
+            return
+
+        columns = list(df.columns)
+        self._ensure_columns(kind, columns)
+        column_sql = ", ".join(f'"{column}"' for column in ["player_id"] + columns)
+        placeholders = ", ".join("?" * (len(columns) + 1))
+        values = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        self.conn.executemany(
+            f'INSERT INTO "{kind}" ({column_sql}) VALUES ({placeholders})',
+            ((int(player_id),) + row for row in values))
+
+    def write_summary(self, player_id, data, fetched_at=None):
+        """
+        Store an element-summary payload (all three data types) for a player.
+
+        Parameters:
+            player_id (int): The ID of the player.
+            data (dict): The decoded element-summary payload.
+            fetched_at (float): When the data was fetched, defaults to now.
+        """
+        with self.conn:
+            for kind in KINDS:
+                self.write_rows(player_id, kind, data.get(kind, []))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO players (player_id, fetched_at) VALUES (?, ?)",
+                (int(player_id), fetched_at if fetched_at is not None else time.time()))
+
+    def read_player(self, player_id, kind):
+        """Return one player's rows of the given data type as a DataFrame."""
+        df = pd.read_sql_query(
+            f'SELECT * FROM "{kind}" WHERE player_id = ? ORDER BY rowid',
+            self.conn, params=(int(player_id),))
+        # Stores written before numeric strings were parsed hold them as TEXT.
+        return _coerce_columns(df.drop(columns=["player_id"]))
+
+    def read_all(self, kind):
+        """
+        Return every player's rows of the given data type in one bulk read.
+
+        Rows keep their original order within each player, and the
+        `player_id` column identifies the owner of each row.
+        """
+        return _coerce_columns(pd.read_sql_query(
+            f'SELECT * FROM "{kind}" ORDER BY player_id, rowid', self.conn))
+
+    def fetched_at(self, player_id):
+        row = self.conn.execute(
+            "SELECT fetched_at FROM players WHERE player_id = ?", (int(player_id),)).fetchone()
+        return row[0] if row else None
+
+    def is_outdated(self, player_id, max_age_days=10):
+        fetched_at = self.fetched_at(player_id)
+        if fetched_at is None:
+            return True
+        return (time.time() - fetched_at) > max_age_days * 86400
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def migrate_csv_dirs(store, dirs):
+    """
+    One-shot migration of the per-player CSV cache into a GameweekStore.
+
+    Parameters:
+        store (GameweekStore): The store to fill.
+        dirs (dict): Maps 'history_past', 'history' and 'fixtures' to the
+            directories holding the `player_{id}_{kind}.csv` files.
+
+    Returns:
+        int: The number of players migrated.
+    """
+    migrated = {}
+    with store.conn:
+        for kind, directory in dirs.items():
+            pattern = re.compile(rf"player_(\d+)_{kind}\.csv$")
+            for file_path in glob.glob(os.path.join(directory, f"player_*_{kind}.csv")):
+                match = pattern.search(os.path.basename(file_path))
+                if not match:
+                    continue
+                player_id = int(match.group(1))
+                try:
+                    df = pd.read_csv(file_path)
+                except pd.errors.EmptyDataError:
+                    df = pd.DataFrame()
+                store.write_rows(player_id, kind, df)
+                # Freshness follows the history file, as the CSV cache did.
+                if kind == "history" or player_id not in migrated:
+                    migrated[player_id] = os.path.getmtime(file_path)
+
+        store.conn.executemany(
+            "INSERT OR REPLACE INTO players (player_id, fetched_at) VALUES (?, ?)",
+            migrated.items())
+    return len(migrated)
@@ -0,0 +1,181 @@
+import heapq
+import logging
+import math
+import queue
+import threading
+
+import pandas as pd
+
+from controllers.fetcher import SUMMARY_KINDS
+
+logger = logging.getLogger("fpl_buddy")
+
+# Players per scored batch, and decoded batches waiting to be scored.
+STREAM_BATCH = 50
+STREAM_QUEUE = 4
+_DONE = object()
+
+
+class TopK:
+    """
+    The best `k` players per position seen so far, in one min-heap per
+    position: a player only enters when they beat the worst one kept.
+
+    Parameters:
+        k (int): Players kept per position.
+        score_column (str): The column players are ranked by.
+    """
+
+    def __init__(self, k, score_column="Combined score"):
+        self.k = k
+        self.score_column = score_column
+        self.heaps = {}
+
+    def push(self, scores):
+        """Offer every row of a `score_league` frame. Returns how many entered a heap."""
+        entered = 0
+        for record in scores.to_dict(orient="records"):
+            score = record[self.score_column]
+            entry = (score if score == score else -math.inf, -record["ID"], record)
+            heap = self.heaps.setdefault(record["Position"], [])
+            if len(heap) < self.k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+            else:
+                continue
+            entered += 1
+        return entered
+
+    def ranking(self):
+        """{position: player dicts, best first}."""
+        return {position: [record for _, _, record in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+                for position, heap in self.heaps.items()}
+
+
+class StreamingScorer:
+    """
+    Score players while their gameweek data is still arriving, keeping only
+    the best `k` per position.
+
+    Three stages overlap: the element-summary payloads are fetched (and
+    decoded) on the fetcher's threads, a decoding thread turns them into
+    long-format frames `batch_size` players at a time, and the calling thread
+    scores each batch with `score_league` and offers it to a TopK. A bounded
+    queue of `max_batches` sits between the last two stages, so a slow
+    scorer holds up the fetch instead of piling up payloads, and nothing
+    outlives its batch but the kept players: memory stays flat with the size
+    of the league. Players are scored independently, so the final top K
+    matches ranking a full `score_league` run.
+
+    Parameters:
+        players (pd.DataFrame): bootstrap-static `elements` rows to score.
+        score (callable): Scores a batch, called as
+            score(players, history, history_past, fixtures).
+        fixtures (callable): Upcoming fixture rows of a list of player IDs,
+            with a `player_id` column.
+        k (int): Players kept per position.
+        batch_size (int): Players per scored batch.
+        max_batches (int): Decoded batches waiting to be scored.
+    """
+
+    def __init__(self, players, score, fixtures, k=10, batch_size=STREAM_BATCH, max_batches=STREAM_QUEUE):
+        self.players = players.set_index("id", drop=False)
+        self.score = score
+        self.fixtures = fixtures
+        self.top = TopK(k)
+        self.batch_size = batch_size
+        self.batches = queue.Queue(maxsize=max_batches)
+        self.stopped = threading.Event()
+        self.decoder = None
+        self.scored = 0
+
+    def _put(self, item):
+        """Queue an item, giving up if the consumer has stopped."""
+        while not self.stopped.is_set():
+            try:
+                self.batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode(self, summaries):
+        """
+        Decoding stage: group summaries into batches of long-format frames.
+        The summaries are closed when it ends, however it ends, so a fetch
+        stream behind them stops too.
+        """
+        try:
+            batch = []
+            for player_id, summary in summaries:
+                if self.stopped.is_set():
+                    return
+                if player_id not in self.players.index:
+                    continue
+                batch.append((player_id, summary))
+                if len(batch) == self.batch_size:
+                    if not self._put(self._frames(batch)):
+                        return
+                    batch = []
+            if batch:
+                self._put(self._frames(batch))
+            self._put(_DONE)
+        except Exception as exc:
+            self._put(exc)
+        finally:
+            close = getattr(summaries, "close", None)
+            if close:
+                close()
+
+    def _frames(self, batch):
+        """The bootstrap rows and history, history_past and fixtures frames of a batch."""
+        ids = [player_id for player_id, _ in batch]
+        frames = {}
+        for kind in SUMMARY_KINDS:
+            # Payload rows become one frame per batch; cached frames are concatenated.
+            records, parts = [], []
+            for player_id, summary in batch:
+                rows = summary.get(kind)
+                if isinstance(rows, pd.DataFrame):
+                    if not rows.empty:
+                        parts.append(rows.assign(player_id=player_id))
+                elif rows:
+                    records.extend(dict(row, player_id=player_id) for row in rows)
+            if records:
+                parts.append(pd.DataFrame.from_records(records))
+            frames[kind] = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["player_id"])
+        frames["fixtures"] = self.fixtures(ids)
+        return self.players.loc[ids].reset_index(drop=True), frames
+
+    def run(self, summaries):
+        """
+        Score players as their summaries arrive.
+
+        Parameters:
+            summaries (iterable): (player ID, summary) pairs, where a summary
+                maps "history" and "history_past" to the payload's row dicts
+                or to a DataFrame. It is consumed on the decoding thread and
+                closed (when it has a `close`) once the run ends.
+
+        Yields:
+            tuple: (players scored so far, {position: best players so far})
+            after every batch; the last one is final.
+        """
+        self.decoder = threading.Thread(target=self._decode, args=(summaries,), daemon=True)
+        self.decoder.start()
+        try:
+            while True:
+                item = self.batches.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                players, frames = item
+                self.top.push(self.score(players, frames["history"], frames["history_past"], frames["fixtures"]))
+                self.scored += len(players)
+                yield self.scored, self.top.ranking()
+        finally:
+            # Lets the decoding thread stop, and close the summaries, if the
+            # caller stops early or scoring fails.
+            self.stopped.set()
@@ -0,0 +1,295 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from controllers.scoring import GAMEWEEKS_PER_SEASON, POSITION_NAMES, score_components
+
+# The scoring settings a sweep can vary, with the value `score_league` uses
+# (DECAY_FACTOR and CURRENT_SEASON come from main.py):
+#   decay_factor    weight of past seasons
+#   current_season  the year past seasons' recency is measured from
+#   season_length   the "/ 38" each older season is divided by once more
+#   price_offset    the 1 in the log(price + 1) price factor (price in tenths)
+#   gw_recency      the 1 in the (1 + round / last played round) weight of
+#                   played gameweeks' difficulty; 0 weighs them all the same
+SWEEP_PARAMETERS = ["decay_factor", "current_season", "season_length", "price_offset", "gw_recency"]
+
+
+def default_parameters(current_season, decay_factor):
+    """The configuration `score_league(..., current_season, decay_factor)` scores with."""
+    return {"decay_factor": decay_factor, "current_season": current_season,
+            "season_length": GAMEWEEKS_PER_SEASON, "price_offset": 1, "gw_recency": 1}
+
+
+def parse_grid(specs, defaults):
+    """
+    Parameter grids from "name=values" strings, where values are separated
+    by commas or given as an inclusive "start:stop:step" range.
+
+    Parameters:
+        specs (list): e.g. ["decay_factor=0.3,0.5,0.7", "price_offset=1:5:1"].
+        defaults (dict): The value of every parameter in SWEEP_PARAMETERS;
+            parameters without a spec are kept at it.
+
+    Returns:
+        dict: A list of values per parameter, in SWEEP_PARAMETERS order.
+    """
+    grid = {name: [defaults[name]] for name in SWEEP_PARAMETERS}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in grid or not values:
+            raise ValueError(f"Invalid sweep '{spec}'. Use name=v1,v2 or name=start:stop:step "
+                             f"with a name from {SWEEP_PARAMETERS}.")
+        is_range = ":" in values
+        try:
+            numbers = [float(value) for value in values.split(":" if is_range else ",")]
+            if is_range:
+                start, stop, step = numbers
+        except ValueError:
+            raise ValueError(f"Invalid sweep '{spec}': {name} must be comma-separated numbers (name=v1,v2) "
+                             f"or a range (name=start:stop:step).") from None
+        if not np.isfinite(numbers).all():
+            raise ValueError(f"Invalid sweep '{spec}': {name} must be finite numbers.")
+        if is_range:
+            if step <= 0:
+                raise ValueError(f"Invalid sweep '{spec}': the step must be positive.")
+            grid[name] = np.round(np.arange(start, stop + step / 2, step), 10).tolist()
+        else:
+            grid[name] = numbers
+    return grid
+
+
+def configurations(grid):
+    """Every combination of a grid, one row per configuration."""
+    return pd.DataFrame(list(itertools.product(*grid.values())), columns=list(grid))
+
+
+class ParameterSweep:
+    """
+    Score the league under many scoring configurations at once.
+
+    Everything in the scoring engine that does not depend on its settings
+    (performance scores, fixture difficulties, minutes weights...) is
+    computed once. Each setting enters the score in a way that can be
+    factored out of the per-row sums, so a configuration is then a handful
+    of array operations over per-player totals, broadcast over a
+    (configuration, player) matrix. The default configuration reproduces
+    `score_league` to floating-point rounding.
+
+    Parameters:
+        players (pd.DataFrame): bootstrap-static `elements` rows to score.
+        history, past_history, fixtures (pd.DataFrame): As for `score_league`.
+        teams (TeamIndex): Team strengths, or a list of team dicts.
+    """
+
+    def __init__(self, players, history, past_history, fixtures, teams):
+        parts = score_components(players, history, past_history, fixtures, teams)
+        index = parts["index"]
+        self.players = pd.DataFrame({
+            "ID": index.to_numpy(),
+            "Player": players["web_name"].to_numpy(),
+            "Price": parts["price"] / 10,
+            "Position": players["element_type"].map(POSITION_NAMES).to_numpy(),
+            "Fitness": parts["availability"],
+            "team": players["team"].to_numpy(),
+        })
+        self.total_score = parts["total_score"]
+        self.num_gws = parts["num_gws"]
+        self.price = parts["price"]
+        self.upcoming_difficulty = parts["upcoming_difficulty"]
+        self.gw_difficulty = parts["gw_difficulty"]
+
+        past = parts["past"]
+        self.past_rows = index.get_indexer(past["player_id"])
+        self.past_base = past["score"].to_numpy() * past["minutes_weight"].to_numpy()
+        self.past_exponent = (past["season_count"] - past["season_order"]).to_numpy(dtype=float)
+        self.past_count = past["season_count"].to_numpy(dtype=float)
+        self.past_year = past["season_year"].to_numpy(dtype=float)
+        self.season_count = np.bincount(self.past_rows, minlength=len(index)).astype(float)
+
+        # Previous fixtures = sum(difficulty) + gw_recency * sum(difficulty * round share)
+        played = parts["played"]
+        rows = index.get_indexer(played["player_id"])
+        difficulty = played["difficulty"].to_numpy(dtype=float)
+        self.previous = np.bincount(rows, difficulty, minlength=len(index))
+        self.previous_recent = np.bincount(rows, difficulty * played["round_share"].to_numpy(),
+                                           minlength=len(index))
+        self.past_sums = {}
+
+    def _past(self, season_length):
+        """
+        Per-player sums of the past-season terms for one season length:
+        with a = score * minutes weight / season_length ** (seasons left),
+        sum(a), sum(a / season count) and sum(a * season year / season count).
+        """
+        if season_length not in self.past_sums:
+            a = self.past_base / np.power(float(season_length), self.past_exponent)
+            size = len(self.num_gws)
+            self.past_sums[season_length] = (
+                np.bincount(self.past_rows, a, minlength=size),
+                np.bincount(self.past_rows, a / self.past_count, minlength=size),
+                np.bincount(self.past_rows, a * self.past_year / self.past_count, minlength=size),
+            )
+        return self.past_sums[season_length]
+
+    def scores(self, configs):
+        """
+        "Combined score" and "Gw score" under each configuration.
+
+        Parameters:
+            configs (pd.DataFrame): One row per configuration, with a column
+                per name in SWEEP_PARAMETERS.
+
+        Returns:
+            tuple: (combined, gw) arrays of shape (configurations, players).
+        """
+        combined = np.empty((len(configs), len(self.num_gws)))
+        gw = np.empty_like(combined)
+        column = {name: configs[name].to_numpy(dtype=float)[:, None] for name in SWEEP_PARAMETERS}
+        lengths = column["season_length"][:, 0]
+        has_price = self.price > 0
+        for season_length in np.unique(lengths):
+            rows = lengths == season_length
+            total, per_season, year_per_season = self._past(season_length)
+            # sum(a * (1 + (current_season - year) / count)) * decay_factor + length ** -seasons
+            past_history_score = column["decay_factor"][rows] * (
+                total + column["current_season"][rows] * per_season - year_per_season
+            ) + np.power(float(season_length), -self.season_count)
+            average = np.divide(self.total_score * past_history_score, self.num_gws,
+                                out=np.zeros(past_history_score.shape), where=self.num_gws > 0)
+            price_factor = np.log(np.where(has_price, self.price, 0) + column["price_offset"][rows])
+            aggregate = np.divide(average, price_factor, out=np.zeros(average.shape),
+                                  where=has_price & (price_factor != 0))
+            previous = self.previous + column["gw_recency"][rows] * self.previous_recent
+            combined[rows] = aggregate / (1 + np.abs(previous - self.upcoming_difficulty))
+            gw[rows] = average / (1 + self.gw_difficulty)
+        return combined, gw
+
+    def frame(self, combined, gw):
+        """A `score_league`-like frame (players, "Combined score", "Gw score") for one configuration."""
+        return self.players.assign(**{"Combined score": combined, "Gw score": gw})
+
+    def rankings(self, configs, baseline, top_n=20, chunk_size=256):
+        """
+        How each configuration's "Combined score" ranking compares with the
+        `baseline` configuration's.
+
+        Parameters:
+            configs (pd.DataFrame): The configurations.
+            baseline (dict): The reference value of every parameter.
+            top_n (int): Size of the per-position top lists compared.
+            chunk_size (int): Configurations scored per pass, to bound memory.
+
+        Returns:
+            pd.DataFrame: Per configuration, the Spearman rank correlation
+            with the baseline ranking, the share of each position's baseline
+            top `top_n` still in its top `top_n`, and the five best player IDs.
+        """
+        base_combined = self.scores(pd.DataFrame([baseline]))[0][0]
+        base_rank = _ranks(base_combined[None])[0]
+        positions = self.players["Position"].to_numpy()
+        size = len(base_combined)
+        results = []
+        for start in range(0, len(configs), chunk_size):
+            combined, _ = self.scores(configs.iloc[start:start + chunk_size])
+            difference = _ranks(combined) - base_rank
+            spearman = 1 - 6 * (difference ** 2).sum(axis=1) / (size * (size ** 2 - 1)) if size > 1 \
+                else np.ones(len(combined))
+            kept = np.zeros(len(combined))
+            counted = 0
+            for position in POSITION_NAMES.values():
+                members = np.flatnonzero(positions == position)
+                n = min(top_n, len(members))
+                if not n:
+                    continue
+                base_top = np.zeros(size, dtype=bool)
+                base_top[members[np.argsort(-base_combined[members], kind="stable")[:n]]] = True
+                top = members[np.argpartition(-combined[:, members], n - 1, axis=1)[:, :n]]
+                kept += base_top[top].sum(axis=1)
+                counted += n
+            best = np.argsort(-combined, axis=1, kind="stable")[:, :5]
+            results.append(pd.DataFrame({
+                "spearman": spearman,
+                f"top-{top_n} overlap": kept / counted if counted else np.nan,
+                "top players": [" ".join(map(str, ids)) for ids in self.players["ID"].to_numpy()[best]],
+            }))
+        return pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+
+    def squads(self, configs, select, baseline, workers=1):
+        """
+        The squad `select` picks under each configuration.
+
+        Parameters:
+            configs (pd.DataFrame): The configurations.
+            select (callable): Squad selection, from a scores frame to squad
+                rows with a "Priority_Score" column (e.g. main.optimize_team).
+                It must be picklable when `workers` > 1.
+            baseline (dict): The reference configuration.
+            workers (int): Processes selecting squads in parallel.
+
+        Returns:
+            pd.DataFrame: Per configuration, the squad's IDs, cost, captain
+            (best "Gw score"), how many players it shares with the baseline
+            squad, and the baseline "Combined score" of the squad, i.e. what
+            the configuration's squad is worth by the current scoring.
+        """
+        base_combined, base_gw = self.scores(pd.DataFrame([baseline]))
+        base_squad = set(select(self.frame(base_combined[0], base_gw[0]))["ID"])
+        base_score = pd.Series(base_combined[0], index=self.players["ID"])
+        chunks = [configs.iloc[start:start + 64] for start in range(0, len(configs), 64)]
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self, select)) as executor:
+                picked = [squad for chunk in executor.map(_squads_chunk, chunks) for squad in chunk]
+        else:
+            picked = [squad for chunk in chunks for squad in _select_squads(self, select, chunk)]
+        return pd.DataFrame({
+            "squad": [" ".join(map(str, sorted(ids))) for ids, _, _ in picked],
+            "squad cost": [cost for _, cost, _ in picked],
+            "captain": [captain for _, _, captain in picked],
+            "squad overlap": [len(base_squad.intersection(ids)) for ids, _, _ in picked],
+            "baseline squad score": [base_score[list(ids)].sum() for ids, _, _ in picked],
+        })
+
+
+def _ranks(values):
+    """Rank (0 = best) of every player, per row."""
+    order = np.argsort(-values, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(values.shape[1])[None], axis=1)
+    return ranks
+
+
+def _select_squads(sweep, select, configs):
+    combined, gw = sweep.scores(configs)
+    picked = []
+    for i in range(len(configs)):
+        squad = select(sweep.frame(combined[i], gw[i]))
+        captain = squad.sort_values("Gw score", ascending=False, kind="stable")["ID"].iloc[0]
+        picked.append((squad["ID"].tolist(), round(float(squad["Price"].sum()), 1), int(captain)))
+    return picked
+
+
+# Process-pool workers keep the sweep they were started with.
+_worker_sweep = {}
+
+
+def _init_worker(sweep, select):
+    _worker_sweep["sweep"] = sweep
+    _worker_sweep["select"] = select
+
+
+def _squads_chunk(configs):
+    return _select_squads(_worker_sweep["sweep"], _worker_sweep["select"], configs)
+
+
+def run_sweep(parameter_sweep, configs, baseline, select=None, top_n=20, workers=1):
+    """
+    Ranking and, with `select`, squad-selection results for every
+    configuration, one row each after the configuration's parameters.
+    """
+    results = [configs.reset_index(drop=True), parameter_sweep.rankings(configs, baseline, top_n)]
+    if select is not None:
+        results.append(parameter_sweep.squads(configs, select, baseline, workers))
+    return pd.concat(results, axis=1)
@@ -1,3 +1,7 @@
+import numpy as np
+import pandas as pd
+
+
 class Team:
     def __init__(self, team_data):
         self.id = team_data.get("id")
@@ -25,3 +29,80 @@ def get_team(team_id, teams_list):
         if team['id'] == team_id:
             return team
     return None
+
+
+class TeamIndex:
+    """
+    Team strengths built once from the teams list, as NumPy arrays indexed by
+    team ID, plus a precomputed fixture difficulty table.
+
+    `difficulty_table[forward, home, team, opponent]` holds the difficulty of
+    a fixture for a player of `team` against `opponent`, where `forward` is 1
+    for forwards (attack vs. defence) and 0 otherwise (defence vs. attack),
+    and `home` is 1 when the player's team plays at home. Unknown teams and
+    missing strengths fall back to 1000; the last row and column stand for
+    any team ID outside the index.
+    """
+
+    STRENGTH_TYPES = (
+        "strength_attack_home",
+        "strength_attack_away",
+        "strength_defence_home",
+        "strength_defence_away",
+    )
+
+    def __init__(self, teams):
+        if hasattr(teams, "to_dict"):
+            teams = teams.to_dict(orient="records")
+        self.teams = {int(team_data["id"]): Team(team_data) for team_data in teams}
+        # One slot past the highest ID for teams the index does not know.
+        self.unknown = max(self.teams, default=0) + 1
+        size = self.unknown + 1
+
+        for strength_type in self.STRENGTH_TYPES:
+            values = np.full(size, 1000.0)
+            for team_id, team in self.teams.items():
+                strength = getattr(team, strength_type)
+                if strength is not None and not pd.isna(strength):
+                    values[team_id] = strength
+            setattr(self, strength_type, values)
+
+        self.difficulty_table = np.empty((2, 2, size, size))
+        self.difficulty_table[0, 1] = np.divide.outer(self.strength_defence_home, self.strength_attack_away)
+        self.difficulty_table[0, 0] = np.divide.outer(self.strength_defence_away, self.strength_attack_home)
+        self.difficulty_table[1, 1] = np.divide.outer(self.strength_attack_home, self.strength_defence_away)
+        self.difficulty_table[1, 0] = np.divide.outer(self.strength_attack_away, self.strength_defence_home)
+
+    @classmethod
+    def of(cls, teams):
+        """
+        `teams` itself if it is a TeamIndex, otherwise a TeamIndex built from
+        the teams list. Callers looking up many fixtures should convert once
+        and keep the index, rather than pass the list every time.
+        """
+        return teams if isinstance(teams, cls) else cls(teams)
+
+    def team(self, team_id):
+        """Return the Team with the given ID, or None."""
+        return self.teams.get(team_id)
+
+    def difficulty(self, team, opponent, home, position):
+        """
+        Look up fixture difficulty for a single fixture or whole arrays of them.
+
+        :param team: ID(s) of the player's team.
+        :param opponent: ID(s) of the opposing team.
+        :param home: Whether the player's team plays at home.
+        :param position: Player element_type(s); 4 is a forward.
+        :return: The difficulty as a float, or an array for array inputs.
+        """
+        forward = (np.asarray(position) == 4).astype(np.intp)
+        home = np.asarray(home, dtype=bool).astype(np.intp)
+        team = self._slot(team)
+        opponent = self._slot(opponent)
+        return self.difficulty_table[forward, home, team, opponent]
+
+    def _slot(self, team_ids):
+        """Table rows for `team_ids`, with IDs outside the index on the unknown-team row."""
+        team_ids = np.asarray(team_ids, dtype=np.intp)
+        return np.where((team_ids >= 0) & (team_ids < self.unknown), team_ids, self.unknown)
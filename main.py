@@ -1,31 +1,63 @@
+import argparse
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+import cProfile
+import logging
+from functools import cached_property
 import pandas as pd
-import requests
 import os
 from datetime import datetime
-from controllers.player import Player
+from controllers.player import PlayerTable
+from controllers.team import TeamIndex
+from controllers.fetcher import ElementSummaryFetcher, SUMMARY_KINDS
+from controllers.fixtures import FixtureIndex
+from controllers.http_cache import HttpCache
+from controllers.instrumentation import PROFILER
+from controllers.snapshot import decode, load_payload, save_payload
+from controllers.store import GameweekStore, migrate_csv_dirs
+from controllers.score_cache import ScoreCache, input_hashes, score_with_cache
+from controllers.scoring import score_league, compare_with_reference, project_gameweeks, POSITION_NAMES, SCORE_COLUMNS
+from controllers.optimizer import optimize_squad
+from controllers.prefilter import select_candidates, prefilter_report
+from controllers.sweep import ParameterSweep, configurations, default_parameters, parse_grid, run_sweep
+from controllers.planner import TransferPlanner
+from controllers.batch import load_squads, recommend_squads
+from controllers.chips import CHIPS, ChipPlanner
+from controllers.simulation import PointsSimulator
+from controllers.lineup import split_lineup
+from controllers.query import PlayerQuery, parse_query
+from controllers.live import LiveGameweek
+from controllers.streaming import StreamingScorer
+from controllers.service import LeagueSnapshot, RecommendationService
 import math
 
+logger = logging.getLogger("fpl_buddy")
+
 BASE_DIR = "fpl_data"
 BUDDY_TEAM = os.path.join(BASE_DIR, "buddy_team.csv")
-PLAYER_DATA_FILE = os.path.join(BASE_DIR, "players_data.csv")
-TEAMS_DATA_FILE = os.path.join(BASE_DIR, "teams_data.csv")
+SNAPSHOT_DIR = os.path.join(BASE_DIR, "snapshots")
+BOOTSTRAP_SNAPSHOT = os.path.join(SNAPSHOT_DIR, "bootstrap-static.json.gz")
+FIXTURES_SNAPSHOT = os.path.join(SNAPSHOT_DIR, "fixtures.json.gz")
 GW_HISTORY_PAST_DIR = os.path.join(BASE_DIR, "gameweek_history_past")
 GW_HISTORY_DIR = os.path.join(BASE_DIR, "gameweek_history")
-GW_FIXTURES_DIR = os.path.join(BASE_DIR, "gameweek_fixtures")
-os.makedirs(GW_HISTORY_PAST_DIR, exist_ok=True)
-os.makedirs(GW_HISTORY_DIR, exist_ok=True)
-os.makedirs(GW_FIXTURES_DIR, exist_ok=True)
-
-os.makedirs(BASE_DIR, exist_ok=True)
+GW_STORE_FILE = os.path.join(BASE_DIR, "gameweek_data.sqlite")
+HTTP_CACHE_FILE = os.path.join(BASE_DIR, "http_cache.json")
+SCORE_CACHE_FILE = os.path.join(BASE_DIR, "score_cache.sqlite")
+# Point FPL_API_URL at another server (e.g. benchmarks/stub_server.py) to run offline.
+API_URL = os.environ.get("FPL_API_URL", "https://fantasy.premierleague.com/api").rstrip("/")
+BOOTSTRAP_URL = f"{API_URL}/bootstrap-static/"
+ELEMENT_SUMMARY_URL = f"{API_URL}/element-summary/{{player_id}}/"
+FIXTURES_URL = f"{API_URL}/fixtures/"
+LIVE_URL = f"{API_URL}/event/{{event}}/live/"
 
 
 def load_team():
     if os.path.exists(BUDDY_TEAM):
         team_df = pd.read_csv(BUDDY_TEAM)
-        print("Existing team loaded.")
+        logger.info("Existing team loaded.")
         return team_df
     else:
-        print("No existing team found. Creating a new team...")
+        logger.info("No existing team found. Creating a new team...")
         return pd.DataFrame(columns=[
             "Player", "Position", "Price", "GW_Score", "Status"
         ])
@@ -38,15 +70,61 @@ def is_file_outdated(file_path):
     return (datetime.now() - datetime.fromtimestamp(last_modified_time)).days > 10
 
 def save_to_csv(data, file):
+    os.makedirs(os.path.dirname(file), exist_ok=True)
     df_data = pd.DataFrame(data)
     df_data.to_csv(file, index=False)
     return df_data
 
+def fetch_payload(url, path, kind, label):
+    """
+    Return the decoded API payload at `url`, kept as a compressed raw
+    snapshot at `path`. Outdated snapshots are revalidated with a
+    conditional request, so an unchanged payload is not downloaded again,
+    and the body is decoded once, straight from the bytes received. A
+    corrupt or truncated snapshot is deleted and fetched again.
+
+    Parameters:
+        url (str): The API endpoint.
+        path (str): The snapshot file.
+        kind (str): The HttpCache kind whose TTL applies.
+        label (str): What the payload is, for log messages.
+    """
+    http_cache = get_context().http_cache
+    saved_at = os.path.getmtime(path) if os.path.exists(path) else None
+    if saved_at is None:
+        http_cache.forget(url)
+
+    if http_cache.is_stale(url, [kind], saved_at):
+        logger.info("Fetching %s from API...", label)
+        content = http_cache.get(url, [kind], raw=True)
+        http_cache.save()
+        if content is not None:
+            save_payload(path, content)
+            return decode(content)
+        logger.info("%s has not changed.", label.capitalize())
+
+    logger.info("Loading %s from snapshot...", label)
+    try:
+        return load_payload(path)
+    except ValueError as exc:
+        logger.warning("%s Fetching %s again.", exc, label)
+        os.remove(path)
+        return fetch_payload(url, path, kind, label)
+
+
+def fetch_bootstrap():
+    """The bootstrap-static payload (players, teams, events, ...)."""
+    return fetch_payload(BOOTSTRAP_URL, BOOTSTRAP_SNAPSHOT, "bootstrap", "bootstrap data")
+
+
+def fetch_fixtures():
+    """The whole league's fixtures, as a list of fixture dicts."""
+    return fetch_payload(FIXTURES_URL, FIXTURES_SNAPSHOT, "fixtures", "fixtures")
+
+
 def fetch_data(data_type):
     """
-    Fetch data for 'players' or 'teams' and return the corresponding DataFrame.
-    Always fetch and save both players and teams when data is outdated but only
-    load the requested type from CSV.
+    Return 'players' or 'teams' from the bootstrap data as a DataFrame.
 
     Parameters:
         data_type (str): 'players' or 'teams'
@@ -56,28 +134,88 @@ def fetch_data(data_type):
     """
     if data_type not in {"players", "teams"}:
         raise ValueError("Invalid data type. Use 'players' or 'teams'.")
+    context = get_context()
+    return context.players_frame if data_type == "players" else pd.DataFrame(context.teams)
 
-    # Determine the relevant file and API key
-    file_map = {
-        "players": PLAYER_DATA_FILE,
-        "teams": TEAMS_DATA_FILE,
+
+def gameweek_files(player_id):
+    """Return the cached CSV paths for a player, keyed by data type."""
+    return {
+        "history_past": os.path.join(GW_HISTORY_PAST_DIR, f"player_{player_id}_history_past.csv"),
+        "history": os.path.join(GW_HISTORY_DIR, f"player_{player_id}_history.csv"),
     }
 
-    # Check if either file is outdated
-    if is_file_outdated(PLAYER_DATA_FILE) or is_file_outdated(TEAMS_DATA_FILE):
-        print("Fetching data from API...")
-        url = "https://fantasy.premierleague.com/api/bootstrap-static/"
-        response = requests.get(url)
-        data = response.json()
-
-        # Save both players and teams data to respective CSVs
-        players = save_to_csv(data["elements"], PLAYER_DATA_FILE)
-        teams = save_to_csv(data["teams"], TEAMS_DATA_FILE)
-        return players if data_type == 'players' else teams
-
-    # Load the requested data type from CSV
-    file_path = file_map[data_type]
-    print(f"Loading {data_type} data from CSV...")
+
+def gameweek_data_saved_at(player_id, store=None):
+    """When the player's gameweek data was last saved locally, or None if it never was."""
+    if store is not None:
+        return store.fetched_at(player_id)
+    saved = [os.path.getmtime(file_path) for file_path in gameweek_files(player_id).values()
+             if os.path.exists(file_path)]
+    return min(saved) if saved else None
+
+
+def has_gameweek_data(player_id, store=None):
+    """Whether any gameweek data for the player is cached locally."""
+    return gameweek_data_saved_at(player_id, store) is not None
+
+
+def is_gameweek_data_outdated(player_id, store=None, http_cache=None, kinds=SUMMARY_KINDS):
+    """
+    Whether the player's cached gameweek data should be refreshed.
+
+    With an HttpCache, each data type in `kinds` is checked against its own
+    TTL (history_past included). Without one, history files older than 10
+    days are outdated. Fixtures come from the league-wide FixtureIndex.
+    """
+    if http_cache is not None:
+        url = ELEMENT_SUMMARY_URL.format(player_id=player_id)
+        saved_at = gameweek_data_saved_at(player_id, store)
+        return saved_at is None or http_cache.is_stale(url, kinds, saved_at)
+    if store is not None:
+        return store.is_outdated(player_id)
+    return is_file_outdated(gameweek_files(player_id)["history"])
+
+
+def save_gameweek_data(player_id, data, store=None):
+    """
+    Save an element-summary payload to the history_past and history CSVs.
+    Its fixtures are skipped: they are the club's, shared through FixtureIndex.
+
+    Parameters:
+        player_id (int): The ID of the player.
+        data (dict): The decoded element-summary payload.
+        store (GameweekStore): Save to this store instead of the CSVs.
+    """
+    data = {data_type: data.get(data_type, []) for data_type in SUMMARY_KINDS}
+    if store is not None:
+        store.write_summary(player_id, data)
+        logger.debug("Saved gameweek data for player %s to %s", player_id, store.path)
+        return
+
+    file_map = gameweek_files(player_id)
+    labels = {
+        "history_past": "past seasons history",
+        "history": "history",
+    }
+
+    for data_type, label in labels.items():
+        rows = data.get(data_type, [])
+        if rows:
+            save_to_csv(rows, file_map[data_type])
+            logger.debug("Saved %s data for player %s to %s", label, player_id, file_map[data_type])
+        else:
+            # An empty file records that the player was fetched and had no rows,
+            # so the next run revalidates instead of downloading them again.
+            os.makedirs(os.path.dirname(file_map[data_type]), exist_ok=True)
+            open(file_map[data_type], "w").close()
+            logger.debug("No %s data found for player %s.", label, player_id)
+
+
+def read_gameweek_csv(file_path):
+    """A cached gameweek CSV, or None if it is missing or was saved without rows."""
+    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+        return None
     return pd.read_csv(file_path)
 
 
@@ -94,75 +232,251 @@ def fetch_gameweek_data(player_id, data_type):
     """
     if data_type not in {"history", "fixtures", "history_past"}:
         raise ValueError("Invalid data type. Use 'history_past', 'history' or 'fixtures'.")
+    if data_type == "fixtures":
+        context = get_context()
+        return context.fixture_index.for_players(context.players_frame, [player_id]).drop(columns="player_id")
 
-    # Paths to the history and fixtures CSVs
-    history_past_file = os.path.join(GW_HISTORY_PAST_DIR, f"player_{
-                                player_id}_history_past.csv")
-    history_file = os.path.join(GW_HISTORY_DIR, f"player_{
-                                player_id}_history.csv")
-    fixtures_file = os.path.join(GW_FIXTURES_DIR, f"player_{
-                                 player_id}_fixtures.csv")
-    file_map = {
-        "history_past": history_past_file,
-        "history": history_file,
-        "fixtures": fixtures_file,
-    }
+    file_map = gameweek_files(player_id)
+    http_cache = get_context().http_cache
+    url = ELEMENT_SUMMARY_URL.format(player_id=player_id)
 
     # Determine if we need to fetch data
-    # TODO: Implement a check for history_past  or is_file_outdated(history_past_file)
-    if is_file_outdated(history_file) or is_file_outdated(fixtures_file):
-        print(f"Fetching data for player {player_id} from API...")
-        url = f"https://fantasy.premierleague.com/api/element-summary/{
-            player_id}/"
-        response = requests.get(url)
-        data = response.json()
-
-        # Save history and fixtures to their respective CSVs
-        history_past = data.get("history_past", [])
-        history = data.get("history", [])
-        fixtures = data.get("fixtures", [])
-
-        if history_past:
-            save_to_csv(history_past, history_past_file)
-            print(f"Saved past seasons history data for player {player_id} to {history_file}")
-        else:
-            print(f"No history past data found for player {player_id}.")
-
-        if history:
-            save_to_csv(history, history_file)
-            print(f"Saved history for player {player_id} to {history_file}")
-        else:
-            print(f"No history data found for player {player_id}.")
-
-        if fixtures:
-            save_to_csv(fixtures, fixtures_file)
-            print(f"Saved fixtures for player {player_id} to {fixtures_file}")
+    if is_gameweek_data_outdated(player_id, http_cache=http_cache, kinds=[data_type]):
+        logger.debug("Fetching data for player %s from API...", player_id)
+        if not has_gameweek_data(player_id):
+            http_cache.forget(url)
+        data = http_cache.get(url, SUMMARY_KINDS)
+        http_cache.save()
+        if data is not None:
+            save_gameweek_data(player_id, data)
         else:
-            print(f"No fixtures data found for player {player_id}.")
+            logger.debug("Data for player %s has not changed.", player_id)
     else:
-        print(f"Data for player {player_id} is up-to-date.")
+        logger.debug("Data for player %s is up-to-date.", player_id)
 
     # Return the requested data
-    requested_file = file_map[data_type]
-    if os.path.exists(requested_file):
-        print(f"{data_type} data available for player {player_id}.")
-        return pd.read_csv(requested_file)
+    df = read_gameweek_csv(file_map[data_type])
+    if df is not None:
+        logger.debug("%s data available for player %s.", data_type, player_id)
+        return df
     else:
-        print(f"No {data_type} data available for player {player_id}.")
+        logger.debug("No %s data available for player %s.", data_type, player_id)
         return pd.DataFrame()
 
 
-players = fetch_data('players').to_dict(orient="records")
-teams = fetch_data('teams').to_dict(orient="records")
+def fetch_gameweek_data_bulk(player_ids, max_workers=8, requests_per_second=10,
+                             retries=3, backoff=0.5, store=None, http_cache=None):
+    """
+    Refresh the gameweek cache for many players concurrently.
+
+    Only players whose cached CSVs are outdated are requested. Requests share a
+    pooled keep-alive session, are capped at `requests_per_second` and retried
+    with exponential backoff on connection errors, 429 and 5xx responses.
+    With an HttpCache, requests are conditional and unchanged players are
+    not rewritten.
+
+    Parameters:
+        player_ids (iterable): The IDs of the players to refresh.
+        max_workers (int): Maximum number of requests in flight.
+        requests_per_second (float): Request rate cap (0 disables the cap).
+        retries (int): Retries per player before giving up.
+        backoff (float): Base delay in seconds, doubled after every retry.
+        store (GameweekStore): Cache to this store instead of the CSVs.
+        http_cache (HttpCache): Validators and per-type TTLs for the requests.
+
+    Returns:
+        list: IDs of the players whose data changed and was saved.
+    """
+    player_ids = list(player_ids)
+    outdated_ids = [pid for pid in player_ids if is_gameweek_data_outdated(pid, store, http_cache)]
+    PROFILER.count("gameweek_cache_fresh", len(player_ids) - len(outdated_ids))
+    if not outdated_ids:
+        return []
+
+    if http_cache is not None:
+        for player_id in outdated_ids:
+            if not has_gameweek_data(player_id, store):
+                http_cache.forget(ELEMENT_SUMMARY_URL.format(player_id=player_id))
+
+    logger.info("Fetching data for %d players from API...", len(outdated_ids))
+    try:
+        with ElementSummaryFetcher(max_workers=max_workers,
+                                   requests_per_second=requests_per_second,
+                                   retries=retries, backoff=backoff,
+                                   url=ELEMENT_SUMMARY_URL, http_cache=http_cache) as fetcher:
+            results, failures = fetcher.fetch_many(
+                outdated_ids, on_result=lambda pid, data: save_gameweek_data(pid, data, store))
+    finally:
+        if http_cache is not None:
+            http_cache.save()
+
+    changed = [player_id for player_id, data in results.items() if data is not None]
+    if len(changed) < len(results):
+        logger.info("%d players have not changed since the last fetch.", len(results) - len(changed))
+    for player_id, error in failures.items():
+        logger.warning("Failed to fetch data for player %s: %s", player_id, error)
+    return changed
+
+
+def read_gameweek_frame(player_ids, data_type, store=None):
+    """
+    Read one data type for many players from the cache as a single
+    long-format DataFrame, with a `player_id` column identifying each row.
+
+    Parameters:
+        player_ids (iterable): The IDs of the players to read.
+        data_type (str): 'history_past', 'history' or 'fixtures'.
+        store (GameweekStore): Read from this store instead of the CSVs.
+
+    Returns:
+        pd.DataFrame: The rows of every requested player.
+    """
+    player_ids = list(player_ids)
+    if data_type == "fixtures":
+        # Derived from each player's club, not stored per player.
+        context = get_context()
+        return context.fixture_index.for_players(context.players_frame, player_ids)
+    if store is not None:
+        df = store.read_all(data_type)
+        return df[df["player_id"].isin(player_ids)].reset_index(drop=True)
+
+    frames = []
+    for player_id in player_ids:
+        df = read_gameweek_csv(gameweek_files(player_id)[data_type])
+        if df is not None:
+            frames.append(df.assign(player_id=player_id))
+    if not frames:
+        return pd.DataFrame(columns=["player_id"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def stream_gameweek_data(player_ids, store=None, http_cache=None, max_workers=8, requests_per_second=10):
+    """
+    Yield each player's gameweek data as soon as it is available: players
+    whose cache is fresh are read from it while the outdated ones are
+    fetched in the background, and fetched payloads are saved to the cache
+    as they arrive. Players whose fetch fails fall back to their cached
+    data, if any.
+
+    Yields:
+        tuple: (player ID, {"history": rows, "history_past": rows}), rows
+        being the payload's dicts or a DataFrame read from the cache.
+    """
+    player_ids = list(player_ids)
+    if store is not None:
+        # The generator may run on another thread, and SQLite connections stay on theirs.
+        store = GameweekStore(store.path)
+    outdated_ids = [pid for pid in player_ids if is_gameweek_data_outdated(pid, store, http_cache)]
+    outdated = set(outdated_ids)
+    PROFILER.count("gameweek_cache_fresh", len(player_ids) - len(outdated_ids))
+
+    def cached(player_id):
+        if store is not None:
+            return {data_type: store.read_player(player_id, data_type) for data_type in SUMMARY_KINDS}
+        files = gameweek_files(player_id)
+        return {data_type: read_gameweek_csv(files[data_type]) for data_type in SUMMARY_KINDS}
+
+    if http_cache is not None:
+        for player_id in outdated_ids:
+            if not has_gameweek_data(player_id, store):
+                http_cache.forget(ELEMENT_SUMMARY_URL.format(player_id=player_id))
+    with ElementSummaryFetcher(max_workers=max_workers, requests_per_second=requests_per_second,
+                               url=ELEMENT_SUMMARY_URL, http_cache=http_cache) as fetcher:
+        # The first requests are sent before the cached players are read.
+        fetched = fetcher.stream(outdated_ids)
+        try:
+            for player_id in player_ids:
+                if player_id not in outdated:
+                    yield player_id, cached(player_id)
+            for player_id, data, error in fetched:
+                if error is not None:
+                    logger.warning("Failed to fetch data for player %s: %s", player_id, error)
+                    if has_gameweek_data(player_id, store):
+                        yield player_id, cached(player_id)
+                elif data is None:
+                    yield player_id, cached(player_id)
+                else:
+                    save_gameweek_data(player_id, data, store)
+                    yield player_id, data
+        finally:
+            fetched.close()
+            if http_cache is not None:
+                http_cache.save()
+            if store is not None:
+                store.close()
+
+
+class DataContext:
+    """
+    Bootstrap players and teams, league fixtures and the HTTP cache, loaded
+    on first use and reused afterwards, so importing this module never
+    touches the disk or the network. Players and teams are the decoded API
+    dicts; `players_frame` and `player_table` are built from them.
+    """
+
+    @cached_property
+    def bootstrap(self):
+        return fetch_bootstrap()
+
+    @cached_property
+    def players(self):
+        return self.bootstrap["elements"]
+
+    @cached_property
+    def players_frame(self):
+        return pd.DataFrame(self.players)
+
+    @cached_property
+    def player_table(self):
+        return PlayerTable(self.players)
+
+    @cached_property
+    def teams(self):
+        return self.bootstrap["teams"]
+
+    @cached_property
+    def team_index(self):
+        return TeamIndex(self.teams)
+
+    @cached_property
+    def fixture_index(self):
+        return FixtureIndex(fetch_fixtures())
+
+    @cached_property
+    def http_cache(self):
+        return HttpCache(HTTP_CACHE_FILE)
+
+
+_context = None
+
+
+def get_context():
+    """Return the shared DataContext, creating it on first use."""
+    global _context
+    if _context is None:
+        _context = DataContext()
+    return _context
+
+
+def __getattr__(name):
+    # Keep `main.players`, `main.teams` and `main.team_index` working, lazily.
+    if name in {"players", "teams", "team_index"}:
+        return getattr(get_context(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # gw_history = fetch_gameweek_data(3, 'history').to_dict(orient="records")
 
 # Constants
 BUDGET = 100.0
 FREE_TRANSFERS = 1
+HIT_COST = 4
 DECAY_FACTOR = 0.5  
 TEAM_SIZE = 15
 CURRENT_SEASON = 2024
 POSITION_LIMITS = {"GKP": 2, "DEF": 5, "MID": 5, "FWD": 3}
+# CURRENT_TEAM_PLAYER_IDS = [328, 311, 110, 82, 433, 4, 9, 3, 16, 324, 238, 6, 152, 185, 120]
+# CURRENT_TEAM_PLAYER_IDS = [17, 422, 3, 533, 70, 328, 182, 99, 491, 268, 252, 521, 399, 148]
+CURRENT_TEAM_PLAYER_IDS = [310, 325, 328, 3, 231, 255, 182, 267, 252, 30, 364, 399, 110, 494, 401]
 
 # 🧩 UTILITY FUNCTIONS
 def normalize_fitness(player):
@@ -174,6 +488,7 @@ def normalize_fitness(player):
 
 def calculate_performance(player, past_history, gw_history, fixtures, teams):
     """Calculate performance metrics for a player."""
+    teams = TeamIndex.of(teams)
     played_gws = [gw for gw in gw_history if gw.get("minutes", 0) > 0]
     last_played_gw = max(gw["round"] for gw in played_gws) if played_gws else 1
     next_fixture = min(fixtures, key=lambda x: x["event"])
@@ -253,6 +568,266 @@ def calculate_performance(player, past_history, gw_history, fixtures, teams):
         "team": player.team
     }
 
+def reference_scores(players, frames, teams):
+    """
+    Score `players` one at a time with calculate_performance.
+
+    Parameters:
+        players (list): Player objects (or PlayerTable rows) to score.
+        frames (dict): 'history', 'history_past' and 'fixtures' long-format frames.
+        teams (TeamIndex): Team strengths.
+
+    Returns:
+        pd.DataFrame: One row per player, in the order of `players`.
+    """
+    player_ids = [player.id for player in players]
+    grouped = {
+        data_type: {player_id: group.drop(columns="player_id").to_dict(orient="records")
+                    for player_id, group in frame[frame["player_id"].isin(player_ids)]
+                    .groupby("player_id", sort=False)}
+        for data_type, frame in frames.items()
+    }
+    total_scores = []
+    for player in players:
+        gw_history = grouped["history"].get(player.id, [])
+        past_history = grouped["history_past"].get(player.id, [])
+        fixtures = grouped["fixtures"].get(player.id, [])
+
+        player_stats = calculate_performance(player, past_history, gw_history, fixtures, teams)
+        total_scores.append(player_stats)
+    if not total_scores:
+        return pd.DataFrame(columns=SCORE_COLUMNS)
+    return pd.DataFrame(total_scores)
+
+_worker_state = {}
+
+
+def _init_worker(team_index):
+    """Keep the read-only team strengths in a pool worker, sent once per worker."""
+    _worker_state["team_index"] = team_index
+
+
+def _load_chunk(player_ids):
+    return {data_type: read_gameweek_frame(player_ids, data_type) for data_type in SUMMARY_KINDS}
+
+
+def _score_chunk(task):
+    players_chunk, frames, reference = task
+    team_index = _worker_state["team_index"]
+    if reference:
+        table = PlayerTable(players_chunk)
+        return reference_scores(list(table), frames, team_index)
+    return score_league(players_chunk, frames["history"], frames["history_past"], frames["fixtures"],
+                        team_index, current_season=CURRENT_SEASON, decay_factor=DECAY_FACTOR)
+
+
+def _chunks(player_ids, workers):
+    """Split IDs into contiguous chunks, a few per worker to balance the load."""
+    size = max(1, -(-len(player_ids) // (workers * 4)))
+    return [player_ids[start:start + size] for start in range(0, len(player_ids), size)]
+
+
+def _concat(frames):
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=["player_id"])
+    return pd.concat(frames, ignore_index=True)
+
+
+class ParallelScorer:
+    """
+    Load gameweek CSVs and score players in a process pool.
+
+    Players are split into contiguous chunks and results are merged in chunk
+    order, so the output matches the serial path row for row. The team
+    strengths are handed to each worker once, when it starts.
+    """
+
+    def __init__(self, workers, team_index):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                            initargs=(team_index,))
+
+    def load(self, player_ids):
+        """
+        Parallel `read_gameweek_frame` for the per-player CSVs; the fixtures
+        come from the shared FixtureIndex in this process.
+        """
+        player_ids = list(player_ids)
+        chunks = list(self.executor.map(_load_chunk, _chunks(player_ids, self.workers)))
+        frames = {data_type: _concat([chunk[data_type] for chunk in chunks]) for data_type in SUMMARY_KINDS}
+        frames["fixtures"] = read_gameweek_frame(player_ids, "fixtures")
+        return frames
+
+    def score(self, players_df, frames, reference=False):
+        """
+        Score `players_df` (bootstrap rows) in chunks, with calculate_performance
+        when `reference` is set and `score_league` otherwise.
+        """
+        tasks = []
+        for chunk in _chunks(players_df["id"].tolist(), self.workers):
+            chunk_frames = {data_type: frame[frame["player_id"].isin(chunk)]
+                            for data_type, frame in frames.items()}
+            tasks.append((players_df[players_df["id"].isin(chunk)], chunk_frames, reference))
+        if not tasks:
+            return pd.DataFrame(columns=SCORE_COLUMNS)
+        return pd.concat(self.executor.map(_score_chunk, tasks), ignore_index=True)
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_snapshot(use_store=False, previous=None):
+    """
+    Fetch, load and score the league from a fresh DataContext, for the
+    recommendation service.
+
+    This replaces the module's shared context: afterwards `get_context()`
+    (and `main.players`, `main.teams`, ...) return the newly loaded league,
+    and the previous context's cached bootstrap, fixtures and HTTP cache
+    are dropped.
+
+    Parameters:
+        use_store (bool): Keep gameweek data in the SQLite store instead of
+            the per-player CSVs. The store is opened on the calling thread.
+        previous (LeagueSnapshot): The snapshot being replaced, whose query
+            index is reused.
+
+    Returns:
+        LeagueSnapshot: The scored fit players.
+    """
+    global _context
+    _context = None
+    context = get_context()
+    player_table = context.player_table
+    fit_ids = player_table.columns["id"][player_table.availability() != 0].tolist()
+    os.makedirs(BASE_DIR, exist_ok=True)
+    store = GameweekStore(GW_STORE_FILE) if use_store else None
+    try:
+        fetch_gameweek_data_bulk(fit_ids, store=store, http_cache=context.http_cache)
+        frames = {data_type: read_gameweek_frame(fit_ids, data_type, store)
+                  for data_type in ("history", "history_past", "fixtures")}
+    finally:
+        if store:
+            store.close()
+    fit_df = context.players_frame[context.players_frame["id"].isin(fit_ids)]
+    team_index = context.team_index
+
+    def score_players(player_ids):
+        return score_league(fit_df[fit_df["id"].isin(player_ids)], frames["history"],
+                            frames["history_past"], frames["fixtures"], team_index,
+                            current_season=CURRENT_SEASON, decay_factor=DECAY_FACTOR)
+
+    keys = input_hashes(fit_df, frames["history"], frames["history_past"], frames["fixtures"],
+                        team_index, ("vectorized", CURRENT_SEASON, DECAY_FACTOR))
+    with ScoreCache(SCORE_CACHE_FILE) as score_cache:
+        scores, _, _ = score_with_cache(score_cache, keys, score_players)
+    return LeagueSnapshot(with_ownership(scores), BUDGET, POSITION_LIMITS, previous=previous)
+
+
+def with_ownership(scores):
+    """`scores` with every player's selected_by_percent as an "Ownership" column."""
+    table = get_context().player_table
+    ownership = pd.Series(table.columns["selected_by_percent"], index=table.columns["id"])
+    return scores.assign(Ownership=scores["ID"].map(ownership).to_numpy())
+
+
+def live_event():
+    """The gameweek in progress, or the next one if the current one is finished."""
+    events = get_context().bootstrap["events"]
+    current = next((event for event in events if event.get("is_current")), None)
+    if current and not current.get("finished"):
+        return current["id"]
+    upcoming = next((event for event in events if event.get("is_next")), None)
+    if upcoming is None:
+        raise ValueError("There is no gameweek in progress or coming up.")
+    return upcoming["id"]
+
+
+def print_live_change(change):
+    """One line per live change event."""
+    stats = ", ".join(f"{name} {before}→{after}" for name, (before, after) in change["stats"].items())
+    before, after = change["scores"]["Combined score"]
+    print(f"⚡ {change['player']}: {stats or 'stats updated'} | Combined score {before:.2f}→{after:.2f}")
+
+
+def add_priority_score(df):
+    """Rank players by Combined score, boosting the current team's players."""
+    df["Priority_Score"] = df["Combined score"]
+    # 🟢 Boost scores for current team players
+    df.loc[df["ID"].isin(CURRENT_TEAM_PLAYER_IDS), "Priority_Score"] *= 12
+    return df
+
+
+def optimize_team(df, solver=None):
+    """
+    Select the provably best squad by Priority_Score under BUDGET,
+    POSITION_LIMITS and the max-3-per-club rule. Instead of prompting about
+    low-availability players, every Priority_Score is weighted by Fitness.
+    """
+    df = add_priority_score(df.copy())
+    df["Priority_Score"] *= df["Fitness"]
+    team_df = optimize_squad(df, "Priority_Score", BUDGET, POSITION_LIMITS, solver=solver)
+    return team_df.sort_values(by="Gw score", ascending=False)
+
+
+def squad_pool():
+    """ID, position, price (£m) and club of every player, for the planners."""
+    players_df = get_context().players_frame
+    return pd.DataFrame({
+        "ID": players_df["id"],
+        "Position": players_df["element_type"].map(POSITION_NAMES),
+        "Price": players_df["now_cost"] / 10,
+        "team": players_df["team"],
+    })
+
+
+def transfer_planner(projections):
+    """A TransferPlanner over every player, with the repo's squad rules and HIT_COST."""
+    return TransferPlanner(squad_pool(), projections, POSITION_LIMITS, hit_cost=HIT_COST)
+
+
+def missing_squad_ids(squad_ids, projections):
+    """
+    The IDs in `squad_ids` that cannot be planned with: players who were not
+    scored (unknown, or not fit) and so have no projections.
+
+    Parameters:
+        squad_ids (list): Player IDs of the squad.
+        projections (pd.DataFrame): Projected points, indexed by player ID.
+
+    Returns:
+        list: The missing IDs, in squad order.
+    """
+    known = set(projections.index)
+    return [player_id for player_id in squad_ids if player_id not in known]
+
+
+def plan_chips(projections, chips, bank=0.0, squad_ids=None):
+    """
+    When to play `chips` with `squad_ids` (default CURRENT_TEAM_PLAYER_IDS)
+    over every projected gameweek, with `bank` (£m) on top of the squad's
+    value to spend on a Wildcard or Free Hit.
+    """
+    squad_ids = CURRENT_TEAM_PLAYER_IDS if squad_ids is None else squad_ids
+    return ChipPlanner(squad_pool(), projections, POSITION_LIMITS).plan(squad_ids, bank, chips)
+
+
+def plan_transfers(projections, horizon, bank=0.0, squad_ids=None):
+    """
+    Plan transfers for `squad_ids` (default CURRENT_TEAM_PLAYER_IDS) over the
+    next `horizon` gameweeks, starting with FREE_TRANSFERS and `bank` (£m).
+    """
+    squad_ids = CURRENT_TEAM_PLAYER_IDS if squad_ids is None else squad_ids
+    return transfer_planner(projections).plan(squad_ids, bank, FREE_TRANSFERS, horizon)
+
+
 def select_team(df):
     """Select the best team based on budget, positions, and scores."""
     team = []
@@ -260,13 +835,7 @@ def select_team(df):
     total_cost = 0
     position_counts = {"GKP": 0, "DEF": 0, "MID": 0, "FWD": 0}
 
-    # current_team_playerIds = [328, 311, 110, 82, 433, 4, 9, 3, 16, 324, 238, 6, 152, 185, 120]
-    # current_team_playerIds = [17, 422, 3, 533, 70, 328, 182, 99, 491, 268, 252, 521, 399, 148]
-    current_team_playerIds = [310, 325, 328, 3, 231, 255, 182, 267, 252, 30, 364, 399, 110, 494, 401]
-
-    # 🟢 Boost scores for current team players
-    df["Priority_Score"] = df["Combined score"]
-    df.loc[df["ID"].isin(current_team_playerIds), "Priority_Score"] *= 12
+    add_priority_score(df)
 
     def find_least_effective_player(team):
         """
@@ -320,7 +889,7 @@ def select_team(df):
                 total_cost += price
                 position_counts[position] += 1
                 selected = True
-                print(f"✅ Added '{row['Player']}' to the team.")
+                logger.debug("✅ Added '%s' to the team.", row["Player"])
 
         if rerun_required:
             # Restart the entire loop to re-sort based on updated Priority_Score
@@ -333,10 +902,9 @@ def select_team(df):
 
         if not selected:
             print("❌ No more players can be added. Removing the least effective player...")
-            print(len(team))
-            print(total_cost)
+            logger.debug("%d players, total cost %.1f", len(team), total_cost)
             for _ in range(3 if total_cost >= 95.5 else 1):
-                print("Removing player...")
+                logger.debug("Removing player...")
                 least_effective = find_least_effective_player(team)
                 team = [player for player in team if player["Player"] != least_effective["Player"]]
                 total_cost -= least_effective["Price"]
@@ -346,58 +914,330 @@ def select_team(df):
 
 
 def split_starters_and_bench(final_team_df):
-    """Separate starters and bench players."""
-    starters = []
-    bench = []
-
-    # Goalkeepers
-    gkps = final_team_df[final_team_df["Position"] == "GKP"]
-    if not gkps.empty:
-        starters.append(gkps.iloc[0].to_dict()) 
-
-    for pos, min_count in [("DEF", 3), ("MID", 3), ("FWD", 1)]:
-        position_players = final_team_df[final_team_df["Position"] == pos]
-        starters.extend(position_players.iloc[:min_count].to_dict(orient='records'))
-
-    remaining_spots = 11 - len(starters)
-    remaining_players = final_team_df[
-        ~final_team_df["Player"].isin([p["Player"] for p in starters + bench])
-    ].head(remaining_spots)
-    starters.extend(remaining_players.to_dict(orient='records'))
-
-    bench_players = final_team_df[
-        ~final_team_df["Player"].isin([p["Player"] for p in starters])
-    ]
-    bench.extend(bench_players.to_dict(orient='records'))
-
-    return pd.DataFrame(starters), pd.DataFrame(bench)
-    # return starters, bench
+    """
+    Separate starters and bench players: the best XI by Gw score over every
+    valid formation, with the captain ("C") and vice-captain ("VC") in an
+    "Armband" column, and the bench in substitution order.
+    """
+    starters, bench, captain, vice_captain = split_lineup(final_team_df.reset_index(drop=True), "Gw score")
+    armband = starters["ID"].map({captain: "C", vice_captain: "VC"}).fillna("")
+    return starters.assign(Armband=armband).reset_index(drop=True), bench.reset_index(drop=True)
 
 # 🚀 MAIN LOGIC
 if __name__ == "__main__":
-    total_scores = []
-    for player_data in players:
-        player = Player(player_data)
-
-        if normalize_fitness(player) == 0:
-            continue
-
-        gw_history = fetch_gameweek_data(player.id, 'history').to_dict(orient="records")
-        past_history = fetch_gameweek_data(player.id, 'history_past').to_dict(orient="records")
-        fixtures = fetch_gameweek_data(player.id, 'fixtures').to_dict(orient="records")
-
-        player_stats = calculate_performance(player, past_history, gw_history, fixtures, teams)
-        total_scores.append(player_stats)
-
-    df = pd.DataFrame(total_scores).sort_values(by="Combined score", ascending=False)
+    parser = argparse.ArgumentParser(description="Pick the best FPL squad.")
+    parser.add_argument("--store", action="store_true",
+                        help="keep gameweek data in a single SQLite store instead of per-player CSVs")
+    parser.add_argument("--migrate-store", action="store_true",
+                        help="copy the per-player CSV cache into the SQLite store and exit")
+    parser.add_argument("--reference-scoring", action="store_true",
+                        help="score players one at a time with calculate_performance")
+    parser.add_argument("--check-scoring", action="store_true",
+                        help="check the vectorized scores against calculate_performance and exit")
+    parser.add_argument("--no-score-cache", action="store_true",
+                        help="score every player again instead of reusing unchanged scores")
+    parser.add_argument("--top-k", type=int, metavar="K",
+                        help="only fetch and score the best K players per position by bootstrap stats "
+                             "(and K by value), plus the current team")
+    parser.add_argument("--prefilter-report", type=int, nargs="*", metavar="K",
+                        help="score every player, report how much of the ranking --top-k K would keep "
+                             "(default K: 20 40 60 80 100) and exit")
+    parser.add_argument("--sweep", nargs="+", metavar="NAME=VALUES",
+                        help="score the league and pick a squad under every combination of scoring settings "
+                             "(decay_factor, current_season, season_length, price_offset, gw_recency; "
+                             "values as a,b,c or start:stop:step) and exit")
+    parser.add_argument("--sweep-output", metavar="CSV", default="parameter_sweep.csv",
+                        help="where to write the --sweep results")
+    parser.add_argument("--live", nargs="?", type=int, const=0, metavar="EVENT",
+                        help="follow gameweek EVENT (default: the one in progress) live, rescoring players "
+                             "as their stats change, until interrupted; with --query or --differentials, "
+                             "answer them from the live scores afterwards")
+    parser.add_argument("--poll-seconds", type=float, default=60,
+                        help="how often --live polls the live endpoint")
+    parser.add_argument("--live-polls", type=int, metavar="N",
+                        help="stop --live after N polls")
+    parser.add_argument("--stream", nargs="?", type=int, const=10, metavar="K",
+                        help="score players while their data is fetched, printing the best K (default 10) "
+                             "per position as they come in, and exit")
+    parser.add_argument("--query", nargs="+", metavar="NAME=VALUE",
+                        help="print the best players passing filters, e.g. position=MID max_price=7.0 "
+                             "max_ownership=5 exclude_teams=3 limit=10, and exit")
+    parser.add_argument("--differentials", nargs="?", type=float, const=5.0, metavar="PERCENT",
+                        help="print the best players per position owned by less than PERCENT "
+                             "(default 5) and exit")
+    parser.add_argument("--optimizer", choices=["greedy", "exact"], default="greedy",
+                        help="greedy interactive selection, or the provably best squad")
+    parser.add_argument("--plan", type=int, metavar="GAMEWEEKS",
+                        help="plan transfers for the current team over the next GAMEWEEKS and exit")
+    parser.add_argument("--bank", type=float, default=0.0,
+                        help="money in the bank in £m, for --plan")
+    parser.add_argument("--squad", nargs="+", type=int, metavar="ID", default=CURRENT_TEAM_PLAYER_IDS,
+                        help="the 15 player IDs of your squad, for --plan and --chips "
+                             "(default: CURRENT_TEAM_PLAYER_IDS)")
+    parser.add_argument("--chips", nargs="*", choices=CHIPS, metavar="CHIP",
+                        help="plan when the current team should play its chips (default: all of "
+                             + ", ".join(CHIPS) + ") over the remaining gameweeks and exit")
+    parser.add_argument("--squads", metavar="FILE",
+                        help="recommend transfers over the next --plan gameweeks (default 1) for every "
+                             "squad in a CSV or JSON file (manager, player_ids, bank, free_transfers) and exit")
+    parser.add_argument("--squads-output", metavar="CSV", default="squad_recommendations.csv",
+                        help="where to write the --squads recommendations")
+    parser.add_argument("--simulate", type=int, metavar="SIMS",
+                        help="simulate the selected squad SIMS times for points percentiles and captaincy")
+    parser.add_argument("--sim-gameweeks", type=int, default=1,
+                        help="gameweeks per simulation, for --simulate (38 for a season)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes for loading the CSV cache, scoring and --simulate")
+    parser.add_argument("--serve", nargs="?", type=int, const=8000, metavar="PORT",
+                        help="serve best XI, replacement and player score queries as JSON on "
+                             "localhost:PORT (default 8000), keeping the scored league in memory")
+    parser.add_argument("--refresh-minutes", type=float, default=60,
+                        help="how often --serve refetches and rescores the league (0 never)")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="DEBUG adds a line per player fetched or saved")
+    parser.add_argument("--profile", nargs="?", const=True, metavar="JSON",
+                        help="print time, calls, HTTP traffic, cache hits and peak memory per stage, "
+                             "and save them to JSON if given")
+    parser.add_argument("--cprofile", metavar="FILE",
+                        help="write cProfile stats to FILE (for snakeviz, flameprof or pstats)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level, format="%(message)s")
+    if args.profile:
+        PROFILER.enable()
+
+        def report_profile():
+            PROFILER.print_report()
+            if isinstance(args.profile, str):
+                PROFILER.save_report(args.profile)
+        atexit.register(report_profile)
+    if args.cprofile:
+        function_profiler = cProfile.Profile()
+        function_profiler.enable()
+
+        def save_cprofile():
+            function_profiler.disable()
+            function_profiler.dump_stats(args.cprofile)
+        atexit.register(save_cprofile)
+
+    if args.serve:
+        service = RecommendationService(lambda previous: load_snapshot(args.store, previous), args.refresh_minutes * 60,
+                                        port=args.serve)
+        print(f"🌐 Serving recommendations at {service.url} (Ctrl+C to stop)")
+        service.serve_forever()
+        raise SystemExit
+
+    context = get_context()
+    with PROFILER.stage("fetch bootstrap"):
+        players, teams, team_index = context.players, context.teams, context.team_index
+
+    if args.store or args.migrate_store:
+        os.makedirs(BASE_DIR, exist_ok=True)
+        store = GameweekStore(GW_STORE_FILE)
+    else:
+        store = None
+    if args.migrate_store:
+        migrated = migrate_csv_dirs(store, {
+            "history_past": GW_HISTORY_PAST_DIR,
+            "history": GW_HISTORY_DIR,
+        })
+        print(f"Migrated {migrated} players to {GW_STORE_FILE}")
+        raise SystemExit
+
+    with PROFILER.stage("build player table"):
+        player_table = context.player_table
+        fit_ids = player_table.columns["id"][player_table.availability() != 0].tolist()
+    if args.top_k and args.prefilter_report is None:
+        with PROFILER.stage("prefilter"):
+            candidate_ids = select_candidates(player_table, fit_ids, args.top_k, CURRENT_TEAM_PLAYER_IDS)
+        logger.info("Pre-filter kept %d of %d players.", len(candidate_ids), len(fit_ids))
+        fit_ids = candidate_ids
+    if args.stream:
+        with PROFILER.stage("stream scoring"):
+            streamer = StreamingScorer(
+                pd.DataFrame(players),
+                lambda *batch: score_league(*batch, team_index, current_season=CURRENT_SEASON,
+                                            decay_factor=DECAY_FACTOR),
+                lambda player_ids: context.fixture_index.for_players(context.players_frame, player_ids),
+                k=args.stream)
+            shown = 0
+            for scored, ranking in streamer.run(stream_gameweek_data(fit_ids, store, context.http_cache)):
+                if scored - shown >= len(fit_ids) / 10 or scored == len(fit_ids):
+                    shown = scored
+                    leaders = " | ".join(
+                        f"{position}: {', '.join(player['Player'] for player in ranking[position][:3])}"
+                        for position in POSITION_NAMES.values() if position in ranking)
+                    print(f"⏳ {scored}/{len(fit_ids)} scored | {leaders}")
+        ranking = streamer.top.ranking()
+        shortlist = pd.DataFrame([player for position in POSITION_NAMES.values()
+                                  for player in ranking.get(position, [])])
+        print(f"🏁 Top {args.stream} per position of {streamer.scored} players:")
+        print(shortlist[["ID", "Player", "Position", "Price", "Combined score", "Gw score", "Fitness"]]
+              .to_string(index=False) if not shortlist.empty else "No players scored.")
+        raise SystemExit
+
+    with PROFILER.stage("fetch gameweeks"):
+        fetch_gameweek_data_bulk(fit_ids, store=store, http_cache=context.http_cache)
+
+    parallel = ParallelScorer(args.workers, team_index) if args.workers > 1 else None
+    if parallel:
+        atexit.register(parallel.close)
+
+    with PROFILER.stage("load gameweek data"):
+        if parallel and store is None:
+            frames = parallel.load(fit_ids)
+        else:
+            frames = {data_type: read_gameweek_frame(fit_ids, data_type, store)
+                      for data_type in ("history", "history_past", "fixtures")}
+
+    players_df = pd.DataFrame(players)
+    fit_df = players_df[players_df["id"].isin(fit_ids)]
+
+    def score_players(player_ids, reference=args.reference_scoring):
+        if parallel:
+            return parallel.score(fit_df[fit_df["id"].isin(player_ids)], frames, reference)
+        if reference:
+            return reference_scores([player_table.player(player_id) for player_id in player_ids],
+                                    frames, team_index)
+        return score_league(fit_df[fit_df["id"].isin(player_ids)], frames["history"],
+                            frames["history_past"], frames["fixtures"], team_index,
+                            current_season=CURRENT_SEASON, decay_factor=DECAY_FACTOR)
+
+    if args.sweep:
+        baseline = default_parameters(CURRENT_SEASON, DECAY_FACTOR)
+        configs = configurations(parse_grid(args.sweep, baseline))
+        with PROFILER.stage("parameter sweep"):
+            sweep = ParameterSweep(fit_df, frames["history"], frames["history_past"], frames["fixtures"], team_index)
+            results = run_sweep(sweep, configs, baseline, select=optimize_team, workers=args.workers)
+        results.to_csv(args.sweep_output, index=False)
+        print(f"🧪 {len(results)} scoring configurations ({results['squad'].nunique()} different squads) "
+              f"written to {args.sweep_output}")
+        # The configurations that change the pick the most.
+        print(results.sort_values(["squad overlap", "spearman"]).head(10).to_string(index=False))
+        raise SystemExit
+
+    if args.check_scoring:
+        with PROFILER.stage("scoring"):
+            df = score_players(fit_ids, reference=False)
+        with PROFILER.stage("reference scoring"):
+            reference_df = score_players(fit_ids, reference=True)
+        mismatches = compare_with_reference(df, reference_df)
+        if mismatches.empty:
+            print(f"✅ Vectorized scores match calculate_performance for {len(df)} players.")
+            raise SystemExit
+        print(f"❌ {len(mismatches)} values differ from calculate_performance:")
+        print(mismatches)
+        raise SystemExit(1)
+
+    with PROFILER.stage("scoring"):
+        if args.no_score_cache:
+            df = score_players(fit_ids)
+        else:
+            # Only players whose inputs changed since the last run are scored again.
+            engine = "reference" if args.reference_scoring else "vectorized"
+            keys = input_hashes(fit_df, frames["history"], frames["history_past"], frames["fixtures"],
+                                team_index, (engine, CURRENT_SEASON, DECAY_FACTOR))
+            os.makedirs(BASE_DIR, exist_ok=True)
+            with ScoreCache(SCORE_CACHE_FILE) as score_cache:
+                df, hits, misses = score_with_cache(score_cache, keys, score_players)
+            PROFILER.count("score_cache_hits", hits)
+            PROFILER.count("score_cache_misses", misses)
+            print(f"♻️ Score cache: {hits} hits, {misses} misses")
+
+    if args.prefilter_report is not None:
+        with PROFILER.stage("prefilter report"):
+            report = prefilter_report(df, player_table, args.prefilter_report or [20, 40, 60, 80, 100],
+                                      CURRENT_TEAM_PLAYER_IDS, select=optimize_team, objective="Priority_Score")
+        print(f"🔎 Pre-filter accuracy against a full run of {len(df)} players:")
+        print(report.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+        raise SystemExit
+
+    if args.live is not None:
+        event = args.live or live_event()
+        # With --query or --differentials, they are answered from the live scores when following stops.
+        if args.query:
+            parse_query(args.query)
+        index = PlayerQuery(with_ownership(df)) if args.query or args.differentials is not None else None
+        live = LiveGameweek(event, fit_df, frames, team_index, df, context.fixture_index.for_event(event), index)
+        url = LIVE_URL.format(event=event)
+        print(f"📡 Following gameweek {event} live every {args.poll_seconds:g}s (Ctrl+C to stop)")
+        live.follow(lambda: context.http_cache.get(url, ["live"]), args.poll_seconds, print_live_change,
+                    args.live_polls)
+        if index is None:
+            raise SystemExit
+
+    if args.query or args.differentials is not None:
+        with PROFILER.stage("query"):
+            if args.live is None:
+                index = PlayerQuery(with_ownership(df))
+            if args.query:
+                results = {"Query": index.top(**parse_query(args.query))}
+            else:
+                results = index.differentials(args.differentials)
+        for title, players_found in results.items():
+            print(f"🔍 {title}:" if args.query else f"💎 {title} differentials (owned by < {args.differentials:g}%):")
+            print(pd.DataFrame(players_found).to_string(index=False) if players_found else "No players found.")
+        raise SystemExit
+
+    if args.plan or args.squads or args.chips is not None:
+        with PROFILER.stage("project gameweeks"):
+            projections = project_gameweeks(fit_df, frames["history"], frames["history_past"], frames["fixtures"],
+                                            team_index, current_season=CURRENT_SEASON, decay_factor=DECAY_FACTOR)
+        missing = missing_squad_ids(args.squad, projections) if not args.squads else []
+        if missing:
+            print(f"❌ These squad player IDs are not among the scored players: {missing}. "
+                  "Pass your own squad with --squad.")
+            raise SystemExit(1)
+
+    if args.squads:
+        # The league is scored once; every squad is planned against the same projections.
+        with PROFILER.stage("recommend squads"):
+            squads = load_squads(args.squads, FREE_TRANSFERS)
+            recommendations = recommend_squads(transfer_planner(projections), squads, args.plan or 1)
+        recommendations.to_csv(args.squads_output, index=False)
+        failed = recommendations["error"].notna().sum()
+        print(f"📋 Recommendations for {len(recommendations) - failed} squads written to {args.squads_output}"
+              + (f" ({failed} could not be planned)" if failed else ""))
+        print(recommendations.sort_values("gain", ascending=False).head(10))
+        raise SystemExit
+
+    if args.chips is not None:
+        with PROFILER.stage("plan chips"):
+            chip_plan = plan_chips(projections, args.chips or CHIPS, args.bank, args.squad)
+        for gameweek in chip_plan["gameweeks"]:
+            if gameweek["chip"]:
+                print(f"🃏 GW{gameweek['event']}: {gameweek['chip'].replace('_', ' ').title()} "
+                      f"(projected: {gameweek['projected']:.2f})")
+        print(f"Total projected: {chip_plan['total']:.2f} "
+              f"({chip_plan['total'] - chip_plan['without_chips']:+.2f} over playing no chips)")
+        timings = chip_plan["timings"] - chip_plan["without_chips"]
+        print("Gain of each chip played alone, by gameweek:")
+        print(timings.round(2).to_string())
+        raise SystemExit
+
+    if args.plan:
+        with PROFILER.stage("plan transfers"):
+            plan = plan_transfers(projections, args.plan, args.bank, args.squad)
+        names = {player["id"]: player["web_name"] for player in players}
+        for gameweek in plan["gameweeks"]:
+            transfers = ", ".join(f"{names[out]} ➡️ {names[incoming]}" for out, incoming in gameweek["transfers"])
+            print(f"GW{gameweek['event']}: {transfers or 'No transfers'} "
+                  f"(hits: {gameweek['hits']}, bank: {gameweek['bank']:.1f}M, "
+                  f"projected: {gameweek['projected']:.2f})")
+        print(f"Total projected: {plan['total']:.2f}")
+        raise SystemExit
+
+    df = df.sort_values(by="Combined score", ascending=False)
     print(df)
 
     # Build Team
-    final_team_df = select_team(df)
+    with PROFILER.stage("select squad"):
+        final_team_df = optimize_team(df) if args.optimizer == "exact" else select_team(df)
     print(final_team_df)
 
     # Split Starters and Bench
-    starters_df, bench_df = split_starters_and_bench(final_team_df)
+    with PROFILER.stage("split lineup"):
+        starters_df, bench_df = split_starters_and_bench(final_team_df)
 
     # Display Results
     print("Starters:")
@@ -405,3 +1245,20 @@ if __name__ == "__main__":
     print("\nBench:")
     print(bench_df)
     print(f"Total Cost: {final_team_df['Price'].sum():.2f}M")
+
+    if args.simulate:
+        with PROFILER.stage("simulate"):
+            availability = pd.Series(player_table.availability(), index=player_table.columns["id"])
+            simulator = PointsSimulator(frames["history"], availability)
+            simulation = simulator.simulate_squad(
+                starters_df["ID"].tolist(), bench_df["ID"].tolist(),
+                dict(zip(final_team_df["ID"], final_team_df["Position"])),
+                sims=args.simulate, gameweeks=args.sim_gameweeks, workers=args.workers)
+        names = {player["id"]: player["web_name"] for player in players}
+        squad = simulation["squad"]
+        print(f"\n🎲 {squad['sims']:,} simulations of {squad['gameweeks']} gameweek(s): "
+              f"mean {squad['mean']:.1f}, 10th-90th percentile {squad['p10']:.0f}-{squad['p90']:.0f}")
+        captains = simulation["captains"].head(5).copy()
+        captains[["Captain", "Vice"]] = captains[["Captain", "Vice"]].apply(lambda column: column.map(names))
+        print("Best captains:")
+        print(captains)
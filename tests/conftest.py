@@ -0,0 +1,55 @@
+from functools import cached_property
+
+import pandas as pd
+import pytest
+
+import main
+from benchmarks.synthetic import SyntheticLeague
+from controllers.fixtures import FixtureIndex
+from controllers.player import PlayerTable
+from controllers.scoring import project_gameweeks, score_league
+from controllers.store import _coerce_columns
+from controllers.team import TeamIndex
+
+
+class League:
+    """A small synthetic league, decoded the way main.py loads it from the cache."""
+
+    def __init__(self, size=120, seed=7):
+        self.synthetic = SyntheticLeague(size, seed=seed)
+        bootstrap = self.synthetic.bootstrap()
+        self.elements = bootstrap["elements"]
+        self.teams = bootstrap["teams"]
+        self.team_index = TeamIndex(self.teams)
+        self.table = PlayerTable(self.elements)
+        self.fit_ids = self.table.columns["id"][self.table.availability() != 0].tolist()
+        players = pd.DataFrame(self.elements)
+        self.players = players[players["id"].isin(self.fit_ids)].reset_index(drop=True)
+        self.fixture_index = FixtureIndex(self.synthetic.fixtures())
+
+        frames = {"history": [], "history_past": []}
+        for player_id in self.fit_ids:
+            summary = self.synthetic.element_summary(player_id)
+            for kind, parts in frames.items():
+                if summary[kind]:
+                    parts.append(pd.DataFrame(summary[kind]).assign(player_id=player_id))
+        self.frames = {kind: _coerce_columns(pd.concat(parts, ignore_index=True)) for kind, parts in frames.items()}
+        self.frames["fixtures"] = self.fixture_index.for_players(players, self.fit_ids)
+
+    def _inputs(self):
+        return (self.players, self.frames["history"], self.frames["history_past"], self.frames["fixtures"],
+                self.team_index)
+
+    @cached_property
+    def scores(self):
+        return score_league(*self._inputs(), current_season=main.CURRENT_SEASON, decay_factor=main.DECAY_FACTOR)
+
+    @cached_property
+    def projections(self):
+        return project_gameweeks(*self._inputs(), current_season=main.CURRENT_SEASON,
+                                 decay_factor=main.DECAY_FACTOR)
+
+
+@pytest.fixture(scope="session")
+def league():
+    return League()
@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+from controllers.batch import load_squads, recommend_squads
+from controllers.optimizer import optimize_squad
+from controllers.planner import TransferPlanner, best_xi_points
+
+HORIZON = 3
+
+
+def planner_for(players, projections):
+    # Every player is a candidate, so the batch pass tries every transfer.
+    return TransferPlanner(players, projections, main.POSITION_LIMITS, candidates_per_position=10_000)
+
+
+def squads(league, count, seed):
+    rng = np.random.default_rng(seed)
+    found = []
+    for i in range(count):
+        pool = league.scores.assign(random=rng.random(len(league.scores)))
+        ids = optimize_squad(pool, "random", main.BUDGET, main.POSITION_LIMITS)["ID"].tolist()
+        found.append({"manager": f"manager {i}", "player_ids": ids, "bank": float(rng.choice([0.0, 0.5, 2.0])),
+                      "free_transfers": int(rng.integers(0, 2))})
+    return found
+
+
+def best_single_transfer(planner, squad, horizon):
+    """Projected points after the best legal single transfer (or holding), net of a hit."""
+    def xi(ids):
+        order = list(main.POSITION_LIMITS)
+        rows = sorted((planner.row[player_id] for player_id in ids),
+                      key=lambda row: order.index(planner.positions[row]))
+        return best_xi_points(planner.points[rows, :horizon], main.POSITION_LIMITS).sum()
+
+    ids = squad["player_ids"]
+    budget = int(round(squad["bank"] * 10)) + sum(planner.prices[planner.row[player_id]] for player_id in ids)
+    hold = best = xi(ids)
+    cost = 0 if squad["free_transfers"] > 0 else planner.hit_cost
+    for out in ids:
+        for incoming in planner.ids[planner.positions == planner.positions[planner.row[out]]]:
+            new = [incoming if player_id == out else player_id for player_id in ids]
+            rows = [planner.row[player_id] for player_id in new]
+            if incoming in ids or planner.prices[rows].sum() > budget \
+                    or np.unique(planner.clubs[rows], return_counts=True)[1].max() > planner.max_per_team:
+                continue
+            best = max(best, xi(new) - cost)
+    return hold, best
+
+
+def test_single_transfers_match_brute_force(league):
+    planner = planner_for(league.scores, league.projections)
+    batch = squads(league, 6, seed=1)
+    results = recommend_squads(planner, batch, HORIZON, max_transfers=1, chunk_size=4)
+    for squad, result in zip(batch, results.to_dict(orient="records")):
+        hold, best = best_single_transfer(planner, squad, HORIZON)
+        assert result["error"] is None
+        assert result["hold"] == pytest.approx(hold)
+        assert result["recommended"] == pytest.approx(best)
+        assert len(result["transfers"]) == (result["recommended"] > result["hold"] + 1e-9)
+
+
+def test_squad_without_a_legal_transfer(league):
+    squad = squads(league, 1, seed=2)[0]
+    # Only the squad's own players exist, so nobody can come in.
+    players = league.scores[league.scores["ID"].isin(squad["player_ids"])]
+    results = recommend_squads(planner_for(players, league.projections), [squad], HORIZON)
+    result = results.iloc[0]
+    assert result["error"] is None and result["transfers"] == []
+    assert result["recommended"] == result["hold"] and result["gain"] == 0
+
+
+def test_invalid_squads_are_reported(league):
+    planner = planner_for(league.scores, league.projections)
+    good, bad = squads(league, 2, seed=3)
+    bad["player_ids"] = bad["player_ids"][:-1] + [99999]
+    results = recommend_squads(planner, [good, bad], HORIZON)
+    assert pd.isna(results["error"].iloc[0])
+    assert "99999" in results["error"].iloc[1] and np.isnan(results["recommended"].iloc[1])
+
+
+def test_load_squads(tmp_path):
+    path = tmp_path / "squads.csv"
+    path.write_text('manager,player_ids,bank\nAda,"1 2 3",0.5\nBo,"4,5",\n')
+    assert load_squads(str(path), free_transfers=2) == [
+        {"manager": "Ada", "player_ids": [1, 2, 3], "bank": 0.5, "free_transfers": 2},
+        {"manager": "Bo", "player_ids": [4, 5], "bank": 0.0, "free_transfers": 2}]
+    path = tmp_path / "squads.json"
+    path.write_text(json.dumps([{"manager": "Cy", "player_ids": [6, 7], "free_transfers": 3}]))
+    assert load_squads(str(path)) == [{"manager": "Cy", "player_ids": [6, 7], "bank": 0.0, "free_transfers": 3}]
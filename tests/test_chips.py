@@ -0,0 +1,75 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import main
+from controllers.chips import CHIPS, ChipPlanner
+from controllers.optimizer import optimize_squad
+
+HORIZON = 4
+
+
+@pytest.fixture(scope="module")
+def planner(league):
+    projections = league.projections.iloc[:, :HORIZON]
+    return ChipPlanner(league.scores[["ID", "Position", "Price", "team"]], projections, main.POSITION_LIMITS)
+
+
+@pytest.fixture(scope="module")
+def squad(league):
+    # A legal squad that is not already the best one.
+    rng = np.random.default_rng(8)
+    pool = league.scores.assign(random=rng.random(len(league.scores)))
+    return optimize_squad(pool, "random", main.BUDGET, main.POSITION_LIMITS)["ID"].tolist()
+
+
+def season_points(planner, squad_ids, bank, timing):
+    """Points over the horizon with each chip in `timing` ({chip: gameweek}) played then."""
+    rows = tuple(planner.row[player_id] for player_id in squad_ids)
+    budget = round(bank + float(planner.players["Price"].iloc[list(rows)].sum()), 1)
+    played = {t: chip for chip, t in timing.items()}
+    squad, total = ("current", rows), 0.0
+    for t in range(HORIZON):
+        chip = played.get(t)
+        if chip == "free_hit":
+            total += planner._lineups(("free_hit", t), budget)[0][t]
+            continue
+        if chip == "wildcard":
+            squad = ("wildcard", t)
+        xi, bench, captain = planner._lineups(squad, budget)
+        total += xi[t] + (bench[t] if chip == "bench_boost" else 0) + (captain[t] if chip == "triple_captain" else 0)
+    return total
+
+
+def timings(chips):
+    """Every way to play each chip at most once, one chip per gameweek."""
+    for weeks in itertools.product([None, *range(HORIZON)], repeat=len(chips)):
+        played = [week for week in weeks if week is not None]
+        if len(played) == len(set(played)):
+            yield {chip: week for chip, week in zip(chips, weeks) if week is not None}
+
+
+@pytest.mark.parametrize("chips", [CHIPS, ("bench_boost", "triple_captain"), ("free_hit",), ()])
+def test_plan_matches_every_timing(planner, squad, chips):
+    plan = planner.plan(squad, 0.5, chips)
+    best = max(season_points(planner, squad, 0.5, timing) for timing in timings(chips))
+    assert plan["total"] == pytest.approx(best)
+    assert plan["without_chips"] == pytest.approx(season_points(planner, squad, 0.5, {}))
+    assert plan["total"] > plan["without_chips"] or not chips
+    assert sum(week["projected"] for week in plan["gameweeks"]) == pytest.approx(plan["total"])
+    played = [week["chip"] for week in plan["gameweeks"] if week["chip"]]
+    assert len(played) == len(set(played)) and set(played) <= set(chips)
+
+    for chip in chips:
+        expected = [season_points(planner, squad, 0.5, {chip: t}) for t in range(HORIZON)]
+        np.testing.assert_allclose(plan["timings"][chip], expected)
+
+
+def test_bad_squads_and_chips_are_rejected(planner, squad):
+    with pytest.raises(ValueError, match="Unknown player IDs"):
+        planner.plan(squad[:-1] + [99999], 0.0)
+    with pytest.raises(ValueError, match="Unknown chips"):
+        planner.plan(squad, 0.0, ["assistant_manager"])
+    with pytest.raises(ValueError, match="players per position"):
+        planner.plan(squad[:-1], 0.0)
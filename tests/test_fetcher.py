@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from controllers import fetcher as fetcher_module
+from controllers.fetcher import ElementSummaryFetcher, RateLimiter
+
+
+def response(status, body=b""):
+    result = requests.Response()
+    result.status_code = status
+    result._content = body
+    result.url = "http://fpl.invalid/element-summary/1/"
+    return result
+
+
+class Session:
+    """A requests session stand-in answering with `statuses` in turn (the last one forever)."""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def get(self, url, timeout=None, headers=None):
+        self.calls += 1
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return response(status, b'{"history": [], "history_past": []}' if status == 200 else b"")
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    found = []
+    monkeypatch.setattr(fetcher_module.time, "sleep", found.append)
+    return found
+
+
+def fetcher_with(session, retries=3):
+    fetcher = ElementSummaryFetcher(requests_per_second=0, retries=retries, backoff=0.5,
+                                    url="http://fpl.invalid/element-summary/{player_id}/")
+    fetcher.session = session
+    return fetcher
+
+
+def test_rate_limited_requests_are_retried(sleeps):
+    session = Session(429, 200)
+    assert fetcher_with(session).fetch_one(1) == {"history": [], "history_past": []}
+    assert session.calls == 2 and sleeps == [0.5]
+
+
+def test_server_errors_are_retried_with_backoff_then_raised(sleeps):
+    session = Session(500)
+    with pytest.raises(requests.HTTPError, match="500 for http://fpl.invalid/element-summary/7/") as error:
+        fetcher_with(session).fetch_one(7)
+    assert error.value.response.status_code == 500
+    assert session.calls == 4 and sleeps == [0.5, 1.0, 2.0]
+
+
+def test_client_errors_are_not_retried(sleeps):
+    session = Session(404)
+    with pytest.raises(requests.HTTPError):
+        fetcher_with(session).fetch_one(1)
+    assert session.calls == 1 and sleeps == []
+
+
+def test_failures_are_reported_per_player(sleeps):
+    results, failures = fetcher_with(Session(503), retries=1).fetch_many([1, 2])
+    assert results == {} and sorted(failures) == [1, 2]
+    assert all(isinstance(error, requests.HTTPError) for error in failures.values())
+
+
+def test_rate_limiter_spaces_requests_across_threads():
+    created = time.monotonic()
+    limiter = RateLimiter(50)
+    starts = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(5):
+            limiter.wait()
+            with lock:
+                starts.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Sleeps may overshoot, but the k-th request never starts before its slot.
+    assert all(start >= created + k * 0.02 for k, start in enumerate(sorted(starts)))
+    assert RateLimiter(0).interval == 0.0
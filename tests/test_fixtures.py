@@ -0,0 +1,70 @@
+import copy
+
+import pandas as pd
+import pytest
+
+from controllers.fixtures import FixtureIndex
+
+KEYS = ["id", "event", "team_h", "team_a", "is_home"]
+
+
+def per_player(fixtures, team):
+    """A club's upcoming fixtures the way each element-summary lists them: a loop over the season."""
+    rows = [dict(fixture, is_home=fixture["team_h"] == team) for fixture in fixtures
+            if team in (fixture["team_h"], fixture["team_a"]) and not fixture["finished"]]
+    return sorted(rows, key=lambda fixture: (fixture["event"] is None, fixture["event"] or 0))
+
+
+def upcoming_difficulty(player, fixtures, teams):
+    """The weighted upcoming difficulty loop of `calculate_performance`."""
+    scheduled = [fixture for fixture in fixtures if not pd.isna(fixture["event"])]
+    next_event = min(fixture["event"] for fixture in scheduled)
+    return sum(player.fixture_difficulty(fixture, teams) * (1 + 1 / max(fixture["event"] - next_event, 1))
+               for fixture in scheduled)
+
+
+def keys(rows):
+    return [tuple(None if pd.isna(row[key]) else row[key] for key in KEYS) for row in rows]
+
+
+def blank_and_double(league):
+    """The season's fixtures with one match moved back a gameweek, and the two clubs it affects."""
+    fixtures = copy.deepcopy(league.synthetic.fixtures())
+    blank = league.synthetic.played + 2
+    playing = {team for fixture in fixtures if fixture["event"] == blank + 1
+               for team in (fixture["team_h"], fixture["team_a"])}
+    moved = next(fixture for fixture in fixtures
+                 if fixture["event"] == blank and {fixture["team_h"], fixture["team_a"]} <= playing)
+    moved["event"] = blank + 1
+    return fixtures, blank, (moved["team_h"], moved["team_a"])
+
+
+def test_players_get_their_element_summary_fixtures(league):
+    found = league.fixture_index.for_players(league.players)
+    for player_id in league.fit_ids:
+        expected = league.synthetic.element_summary(player_id)["fixtures"]
+        rows = found[found["player_id"] == player_id].to_dict(orient="records")
+        assert keys(rows) == keys(expected)
+    assert found["event"].isna().any(), "the league should have postponed fixtures"
+
+
+@pytest.mark.parametrize("subset", [None, "reversed"])
+def test_blank_and_double_gameweeks_match_the_per_player_loop(league, subset):
+    fixtures, blank, clubs = blank_and_double(league)
+    index = FixtureIndex(fixtures)
+    player_ids = league.fit_ids[::-1] if subset else None
+    found = index.for_players(league.players, player_ids)
+    assert found["player_id"].drop_duplicates().tolist() == (player_ids or league.players["id"].tolist())
+
+    team_of = dict(zip(league.players["id"], league.players["team"]))
+    assert set(clubs) & set(team_of.values()), "the moved match should affect some players"
+    for player_id, rows in found.groupby("player_id", sort=False):
+        rows = rows.drop(columns="player_id").to_dict(orient="records")
+        expected = per_player(fixtures, team_of[player_id])
+        assert keys(rows) == keys(expected)
+        events = [row["event"] for row in rows]
+        if team_of[player_id] in clubs:
+            assert blank not in events and events.count(blank + 1) == 2
+        player = league.table.player(player_id)
+        assert upcoming_difficulty(player, rows, league.team_index) \
+            == pytest.approx(upcoming_difficulty(player, expected, league.team_index))
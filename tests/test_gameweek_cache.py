@@ -0,0 +1,42 @@
+from unittest import mock
+
+import main
+from benchmarks.stub_server import StubServer
+from benchmarks.synthetic import SyntheticLeague
+from controllers.http_cache import HttpCache
+
+PLAYER_IDS = list(range(1, 11))
+EMPTY_IDS = {2, 5}
+
+
+def _league():
+    league = SyntheticLeague(30, seed=2)
+    summary = league.element_summary
+    league.element_summary = lambda player_id: (
+        dict(summary(player_id), history=[], history_past=[]) if player_id in EMPTY_IDS else summary(player_id))
+    return league
+
+
+def _age(http_cache):
+    for entry in http_cache.entries.values():
+        entry["checked"] = {kind: 0 for kind in entry["checked"]}
+
+
+def test_players_without_rows_are_revalidated_not_downloaded(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "_context", None)
+    with StubServer(_league()) as stub, \
+            mock.patch.object(main, "ELEMENT_SUMMARY_URL", f"{stub.base_url}/element-summary/{{player_id}}/"):
+        http_cache = HttpCache(str(tmp_path / "http_cache.json"))
+        main.fetch_gameweek_data_bulk(PLAYER_IDS, requests_per_second=0, http_cache=http_cache)
+        assert all(main.has_gameweek_data(player_id) for player_id in PLAYER_IDS)
+
+        _age(http_cache)
+        stub.reset_counts()
+        main.fetch_gameweek_data_bulk(PLAYER_IDS, requests_per_second=0, http_cache=http_cache)
+        assert stub.counts["requests"] == len(PLAYER_IDS)
+        assert stub.counts["not_modified"] == len(PLAYER_IDS)
+
+    history = main.read_gameweek_frame(PLAYER_IDS, "history")
+    assert set(history["player_id"]) == set(PLAYER_IDS) - EMPTY_IDS
+    assert main.fetch_gameweek_data(2, "history_past").empty
@@ -0,0 +1,22 @@
+import logging
+import time
+
+from controllers.http_cache import HttpCache
+
+
+def test_unreadable_cache_is_logged_and_ignored(tmp_path, caplog, capsys):
+    path = tmp_path / "http_cache.json"
+    path.write_text("{not json")
+    with caplog.at_level(logging.WARNING, logger="fpl_buddy"):
+        http_cache = HttpCache(str(path))
+    assert http_cache.entries == {}
+    assert "Ignoring unreadable HTTP cache" in caplog.text
+    assert capsys.readouterr().out == ""
+
+
+def test_kinds_are_stale_after_their_ttl(tmp_path):
+    http_cache = HttpCache(str(tmp_path / "http_cache.json"), ttls={"history": 10})
+    url = "http://example.invalid/element-summary/1/"
+    http_cache.entries[url] = {"checked": {"history": 0}}
+    assert http_cache.is_stale(url, ["history"])
+    assert not http_cache.is_stale("http://example.invalid/other/", ["history"], saved_at=time.time())
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.import_time import REPO_ROOT, time_import
+
+NO_FETCH_SCRIPT = """
+import requests
+def refuse(*args, **kwargs):
+    raise AssertionError("importing main made a request")
+requests.Session.request = refuse
+import main
+assert main._context is None
+"""
+
+
+def test_import_creates_no_files():
+    _, created = time_import()
+    assert created == []
+
+
+def test_import_makes_no_requests(tmp_path):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, FPL_API_URL="http://127.0.0.1:9/api")
+    subprocess.run([sys.executable, "-c", NO_FETCH_SCRIPT], cwd=tmp_path, env=env, check=True)
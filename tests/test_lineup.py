@@ -0,0 +1,78 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+from controllers.lineup import pick_lineups, split_lineup
+from controllers.planner import FORMATION, STARTERS
+
+SQUAD = ["GKP"] * 2 + ["DEF"] * 5 + ["MID"] * 5 + ["FWD"] * 3
+
+
+def best_xi_points(points, positions):
+    """The best XI by trying every 11 of the squad that makes a legal formation."""
+    best = -np.inf
+    for xi in itertools.combinations(range(len(points)), STARTERS):
+        counts = {position: 0 for position in FORMATION}
+        for slot in xi:
+            counts[positions[slot]] += 1
+        if all(low <= counts[position] <= high for position, (low, high) in FORMATION.items()):
+            best = max(best, sum(points[slot] for slot in xi))
+    return best
+
+
+def random_squads(count, seed):
+    rng = np.random.default_rng(seed)
+    # Rounded points so squads have ties; every squad in its own slot order.
+    points = np.round(rng.gamma(2.0, 2.0, (count, len(SQUAD))), 1)
+    positions = np.array([rng.permutation(SQUAD) for _ in range(count)])
+    return points, positions
+
+
+def test_batch_matches_brute_force():
+    points, positions = random_squads(40, seed=11)
+    lineups = pick_lineups(points, positions)
+    for i in range(len(points)):
+        starters = lineups["starters"][i]
+        bench = lineups["bench"][i]
+        assert lineups["xi_points"][i] == pytest.approx(best_xi_points(points[i], positions[i]))
+        assert points[i][starters].sum() == pytest.approx(lineups["xi_points"][i])
+        assert sorted(np.concatenate([starters, bench])) == list(range(len(SQUAD)))
+        formation = [int((positions[i][starters] == position).sum()) for position in FORMATION]
+        assert formation == list(lineups["formation"][i])
+
+        # The armband goes to the two best starters; the bench keeper sits first.
+        assert points[i][lineups["captain"][i]] == points[i][starters].max()
+        assert lineups["vice_captain"][i] != lineups["captain"][i]
+        assert positions[i][bench[0]] == "GKP"
+        assert list(points[i][bench[1:]]) == sorted(points[i][bench[1:]], reverse=True)
+        assert lineups["points"][i] == pytest.approx(lineups["xi_points"][i] + points[i][lineups["captain"][i]])
+
+
+def test_single_squad_matches_its_batch_row():
+    points, positions = random_squads(5, seed=12)
+    batch = pick_lineups(points, positions)
+    for i in range(len(points)):
+        single = pick_lineups(points[i], positions[i])
+        for key, value in single.items():
+            assert np.array_equal(value, batch[key][i]), key
+
+
+def test_split_lineup(league):
+    scores = league.scores
+    squad = pd.concat([scores[scores["Position"] == position].head(count)
+                       for position, count in main.POSITION_LIMITS.items()], ignore_index=True)
+    starters, bench, captain, vice_captain = split_lineup(squad, "Gw score")
+    assert len(starters) == STARTERS and len(bench) == len(SQUAD) - STARTERS
+    assert starters["Gw score"].sum() == pytest.approx(
+        best_xi_points(squad["Gw score"].to_numpy(), squad["Position"].to_numpy()))
+    assert captain == starters["ID"].iloc[0] and vice_captain == starters["ID"].iloc[1]
+
+
+def test_squads_must_share_a_shape():
+    points = np.ones((2, len(SQUAD)))
+    positions = np.array([SQUAD, ["GKP"] + SQUAD[:-1]])
+    with pytest.raises(ValueError, match="same number of players per position"):
+        pick_lineups(points, positions)
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+import main
+from benchmarks.stub_server import StubServer
+from controllers.live import LiveGameweek
+from controllers.scoring import score_league
+
+
+@pytest.fixture
+def event(league):
+    return league.synthetic.played + 1
+
+
+def follow(league, event):
+    return LiveGameweek(event, league.players, league.frames, league.team_index, league.scores,
+                        league.fixture_index.for_event(event))
+
+
+def rescored(league, event, payload):
+    """A full `score_league` run with the payload's played rows as gameweek `event`."""
+    opponents = {}
+    for fixture in league.fixture_index.for_event(event).itertuples(index=False):
+        opponents.setdefault(fixture.team_h, (fixture.team_a, True))
+        opponents.setdefault(fixture.team_a, (fixture.team_h, False))
+    team = dict(zip(league.players["id"], league.players["team"]))
+    rows = []
+    for element in payload["elements"]:
+        if element["id"] in team and element["stats"]["minutes"] > 0:
+            opponent, home = opponents.get(team[element["id"]], (team[element["id"]], True))
+            rows.append(dict(element["stats"], player_id=element["id"], round=event,
+                             opponent_team=opponent, was_home=home))
+    history = league.frames["history"]
+    history = pd.concat([history[history["round"] != event], pd.DataFrame(rows).astype({
+        "expected_goals": float, "expected_assists": float, "expected_goal_involvements": float,
+        "expected_goals_conceded": float, "ict_index": float})], ignore_index=True)
+    return score_league(league.players, history, league.frames["history_past"], league.frames["fixtures"],
+                        league.team_index, current_season=main.CURRENT_SEASON, decay_factor=main.DECAY_FACTOR)
+
+
+@pytest.mark.parametrize("minutes", [[35], [0, 20, 45, 70], range(0, 180, 15)])
+def test_polls_match_a_full_rescore(league, event, minutes):
+    live = follow(league, event)
+    for minute in minutes:
+        payload = league.synthetic.live(event, minute)
+        live.update(payload)
+    expected = rescored(league, event, payload).set_index("ID")
+    found = live.scores.set_index("ID").loc[expected.index]
+    for column in expected.columns:
+        if expected[column].dtype.kind in "fi":
+            np.testing.assert_allclose(found[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float),
+                                       rtol=1e-9, atol=1e-12, err_msg=column)
+        else:
+            assert (found[column] == expected[column]).all(), column
+
+
+def test_only_changed_players_are_reported(league, event):
+    live = follow(league, event)
+    assert live.update(league.synthetic.live(event, 0)) == []
+    events = live.update(league.synthetic.live(event, 40))
+    assert events and live.update(league.synthetic.live(event, 40)) == []
+    for change in events:
+        assert change["stats"]["minutes"][1] > change["stats"]["minutes"][0]
+        _, after = change["scores"]["Combined score"]
+        assert after == live.scores.loc[live.scores["ID"] == change["id"], "Combined score"].item()
+
+
+def test_stub_moves_the_matches_on(league, event):
+    with StubServer(league.synthetic, live_step=30) as stub:
+        url = f"{stub.base_url}/event/{event}/live/"
+        minutes = [sum(element["stats"]["minutes"] for element in requests.get(url).json()["elements"])
+                   for _ in range(4)]
+    assert minutes[0] == 0
+    assert minutes == sorted(minutes) and minutes[-1] > minutes[1]
+
+
+def test_a_failed_poll_does_not_end_the_session(league, event, caplog):
+    live = follow(league, event)
+    failures = [requests.ConnectionError("connection reset"), requests.HTTPError("503 Server Error"),
+                ValueError("Expecting value")]
+
+    def fetch():
+        if failures:
+            raise failures.pop(0)
+        return league.synthetic.live(event, 45)
+
+    changes = []
+    with caplog.at_level("WARNING", logger="fpl_buddy"):
+        live.follow(fetch, interval=0, on_change=changes.append, polls=4)
+    assert len([record for record in caplog.records if "failed" in record.getMessage()]) == 3
+    assert changes and {change["id"] for change in changes} <= set(live.row)
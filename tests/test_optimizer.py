@@ -0,0 +1,58 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+from controllers.optimizer import optimize_squad
+
+SMALL_LIMITS = {"GKP": 1, "DEF": 2, "MID": 2, "FWD": 1}
+
+
+def _pool(seed, size=7):
+    rng = np.random.default_rng(seed)
+    rows = [{"ID": position_index * 100 + i, "Position": position, "Price": round(rng.uniform(4, 12), 1),
+             "team": int(rng.integers(1, 5)), "score": rng.uniform(0, 10)}
+            for position_index, position in enumerate(SMALL_LIMITS) for i in range(size)]
+    return pd.DataFrame(rows)
+
+
+def _brute_force(pool, budget, max_per_team):
+    groups = [list(itertools.combinations(np.flatnonzero(pool["Position"].to_numpy() == position), count))
+              for position, count in SMALL_LIMITS.items()]
+    squads = np.array([list(itertools.chain(*picks)) for picks in itertools.product(*groups)])
+    price = pool["Price"].to_numpy()[squads].sum(axis=1)
+    teams = pool["team"].to_numpy()[squads]
+    club_counts = (teams[:, :, None] == np.unique(teams)).sum(axis=1).max(axis=1)
+    legal = (price <= budget + 1e-9) & (club_counts <= max_per_team)
+    return pool["score"].to_numpy()[squads[legal]].sum(axis=1).max()
+
+
+@pytest.mark.parametrize("solver", ["milp", "branch-and-bound"])
+@pytest.mark.parametrize("seed", range(3))
+def test_optimizer_matches_brute_force(solver, seed):
+    if solver == "milp":
+        pytest.importorskip("scipy")
+    pool = _pool(seed)
+    squad = optimize_squad(pool, "score", 45.0, SMALL_LIMITS, max_per_team=2, solver=solver)
+
+    assert squad["Position"].value_counts().to_dict() == SMALL_LIMITS
+    assert squad["Price"].sum() <= 45.0 + 1e-9
+    assert squad["team"].value_counts().max() <= 2
+    assert np.isclose(squad["score"].sum(), _brute_force(pool, 45.0, 2))
+
+
+def test_solvers_agree_on_the_league(league):
+    pytest.importorskip("scipy")
+    totals = [optimize_squad(league.scores, "Combined score", main.BUDGET, main.POSITION_LIMITS, solver=solver)
+              ["Combined score"].sum() for solver in ("milp", "branch-and-bound")]
+    assert np.isclose(*totals)
+
+
+@pytest.mark.parametrize("budget", [float("inf"), 1e6])
+def test_budgets_above_the_pool_cost_nothing_extra(league, budget):
+    pool = league.scores
+    unlimited = optimize_squad(pool, "Combined score", float(pool["Price"].sum()), main.POSITION_LIMITS)
+    squad = optimize_squad(pool, "Combined score", budget, main.POSITION_LIMITS)
+    assert sorted(squad["ID"]) == sorted(unlimited["ID"])
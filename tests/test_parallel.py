@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+
+import main
+from controllers.player import PlayerTable
+
+
+@pytest.fixture(scope="module")
+def scorer(league):
+    with main.ParallelScorer(2, league.team_index) as scorer:
+        yield scorer
+
+
+def test_matches_serial_scoring_row_for_row(league, scorer):
+    pd.testing.assert_frame_equal(scorer.score(league.players, league.frames), league.scores)
+
+
+def test_reference_scoring_matches_too(league, scorer):
+    players = league.players.head(30)
+    serial = main.reference_scores(list(PlayerTable(players)), league.frames, league.team_index)
+    pd.testing.assert_frame_equal(scorer.score(players, league.frames, reference=True), serial)
+
+
+@pytest.mark.parametrize("count", [0, 1, 3])
+def test_fewer_players_than_workers_or_chunks(league, scorer, count):
+    players = league.players.head(count)
+    assert len(main._chunks(players["id"].tolist(), scorer.workers)) == count
+    scores = scorer.score(players, league.frames)
+    assert list(scores.columns) == list(league.scores.columns)
+    pd.testing.assert_frame_equal(scores.reset_index(drop=True), league.scores.head(count), check_dtype=bool(count))
@@ -0,0 +1,88 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import main
+from controllers.optimizer import optimize_squad
+from controllers.planner import FORMATION, TransferPlanner, best_xi_points
+
+
+def _brute_force_xi(points, positions):
+    best = -np.inf
+    for starters in itertools.combinations(range(len(points)), 11):
+        counts = {position: 0 for position in FORMATION}
+        for slot in starters:
+            counts[positions[slot]] += 1
+        if all(low <= counts[position] <= high for position, (low, high) in FORMATION.items()):
+            best = max(best, points[list(starters)].sum())
+    return best
+
+
+def _squad(league):
+    return optimize_squad(league.scores, "Combined score", main.BUDGET, main.POSITION_LIMITS)["ID"].tolist()
+
+
+def test_best_xi_points_matches_brute_force():
+    rng = np.random.default_rng(0)
+    positions = [position for position, count in main.POSITION_LIMITS.items() for _ in range(count)]
+    for _ in range(5):
+        points = rng.uniform(0, 10, (15, 2))
+        xi = best_xi_points(points, main.POSITION_LIMITS)
+        for gameweek in range(2):
+            assert np.isclose(xi[gameweek], _brute_force_xi(points[:, gameweek], positions))
+
+
+def test_single_transfer_matches_every_legal_transfer(league):
+    planner = TransferPlanner(league.scores, league.projections, main.POSITION_LIMITS, max_transfers=1,
+                              moves_per_state=10_000, candidates_per_position=10_000)
+    squad = _squad(league)
+    plan = planner.plan(squad, bank=0.5, free_transfers=1, horizon=1)
+
+    budget = round(league.scores.set_index("ID").loc[squad, "Price"].sum() + 0.5, 1)
+    players = league.scores.set_index("ID")
+    event = league.projections.columns[0]
+
+    def xi(ids):
+        rows = [planner.row[player_id] for player_id in ids]
+        return best_xi_points(planner.points[planner._canonical(rows), :1], main.POSITION_LIMITS)[0]
+
+    best = xi(squad)
+    for out in squad:
+        for incoming in players.index[players["Position"] == players.at[out, "Position"]]:
+            new = [incoming if player_id == out else player_id for player_id in squad]
+            if incoming in squad or players.loc[new, "Price"].sum() > budget + 1e-9 \
+                    or players.loc[new, "team"].value_counts().max() > 3:
+                continue
+            best = max(best, xi(new))
+    assert plan["gameweeks"][0]["event"] == event
+    assert np.isclose(plan["total"], best)
+
+
+def test_planner_does_not_keep_itself_alive(league):
+    import gc
+    import weakref
+
+    planner = TransferPlanner(league.scores, league.projections, main.POSITION_LIMITS)
+    planner.plan(_squad(league), bank=0.0, free_transfers=1, horizon=2)
+    assert planner.xi_points
+    reference = weakref.ref(planner)
+    del planner
+    gc.collect()
+    assert reference() is None
+
+
+def test_empty_horizons_are_rejected(league):
+    planner = TransferPlanner(league.scores, league.projections, main.POSITION_LIMITS)
+    for horizon in (0, -2):
+        with pytest.raises(ValueError, match="horizon must be at least 1"):
+            planner.plan(_squad(league), bank=0.0, free_transfers=1, horizon=horizon)
+    empty = TransferPlanner(league.scores, league.projections.iloc[:, :0], main.POSITION_LIMITS)
+    with pytest.raises(ValueError, match="no upcoming gameweeks"):
+        empty.plan(_squad(league), bank=0.0, free_transfers=1)
+
+
+def test_squads_with_unscored_players_are_caught_up_front(league):
+    squad = league.projections.index[:14].tolist()
+    assert main.missing_squad_ids(squad, league.projections) == []
+    assert main.missing_squad_ids(squad[:13] + [99999] + squad[13:] + [-1], league.projections) == [99999, -1]
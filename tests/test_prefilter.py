@@ -0,0 +1,42 @@
+import pytest
+
+import main
+from controllers.optimizer import optimize_squad
+from controllers.prefilter import prefilter_report, select_candidates
+
+OBJECTIVE = "Combined score"
+
+
+def best_squad(scores):
+    return optimize_squad(scores, OBJECTIVE, main.BUDGET, main.POSITION_LIMITS)
+
+
+@pytest.fixture(scope="module")
+def full(league):
+    return best_squad(league.scores)
+
+
+@pytest.mark.parametrize("top_k", [3, 10, 30, 10_000])
+def test_a_pool_keeping_the_best_squad_has_the_same_objective(league, full, top_k):
+    kept = select_candidates(league.table, league.scores["ID"].tolist(), top_k, full["ID"].tolist())
+    assert set(full["ID"]) <= set(kept)
+    squad = best_squad(league.scores[league.scores["ID"].isin(kept)])
+    assert squad[OBJECTIVE].sum() == pytest.approx(full[OBJECTIVE].sum())
+
+
+def test_report_measures_the_squad_lost_to_the_prefilter(league, full):
+    top_ks = [10, 30, 10_000]
+    kept = prefilter_report(league.scores, league.table, top_ks, full["ID"].tolist(), select=best_squad,
+                            objective=OBJECTIVE)
+    assert kept["squad score lost"].to_numpy() == pytest.approx(0.0, abs=1e-9)
+    assert (kept["squad overlap"] == len(full)).all()
+
+    report = prefilter_report(league.scores, league.table, top_ks, select=best_squad, objective=OBJECTIVE)
+    assert (report["squad score lost"] >= -1e-9).all()
+    everyone = report.set_index("K").loc[10_000]
+    assert everyone["kept"] == len(league.scores) and everyone["skipped"] == 0
+    assert everyone["squad score lost"] == pytest.approx(0.0, abs=1e-9)
+    for top_k, row in report.set_index("K").iterrows():
+        pool = select_candidates(league.table, league.scores["ID"].tolist(), top_k)
+        squad = best_squad(league.scores[league.scores["ID"].isin(pool)])
+        assert row["squad score lost"] == pytest.approx(full[OBJECTIVE].sum() - squad[OBJECTIVE].sum())
@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+import main
+from controllers.live import LiveGameweek
+from controllers.query import PlayerQuery, parse_query
+from controllers.service import LeagueSnapshot, RecommendationService
+
+
+@pytest.fixture
+def scores(league):
+    rng = np.random.default_rng(3)
+    return league.scores.assign(Ownership=rng.choice([0.4, 2.0, 4.9, 5.0, 12.5, 31.0], len(league.scores)))
+
+
+def oracle(scores, position=None, min_price=None, max_price=None, min_ownership=None, max_ownership=None,
+           teams=None, exclude_teams=(), exclude=(), min_fitness=0.0, limit=10):
+    """`PlayerQuery.top` by filtering and sorting the whole table."""
+    keep = ~scores["ID"].isin(exclude) & ~scores["team"].isin(exclude_teams) & (scores["Fitness"] >= min_fitness)
+    if position is not None:
+        keep &= scores["Position"] == position
+    if min_price is not None:
+        keep &= scores["Price"] >= min_price - 1e-9
+    if max_price is not None:
+        keep &= scores["Price"] <= max_price + 1e-9
+    if min_ownership is not None:
+        keep &= scores["Ownership"] >= min_ownership
+    if max_ownership is not None:
+        keep &= scores["Ownership"] < max_ownership
+    if teams is not None:
+        keep &= scores["team"].isin(teams)
+    found = scores[keep].sort_values(["Combined score", "ID"], ascending=[False, True], na_position="last")
+    return found["ID"].head(limit).tolist()
+
+
+def random_queries(league, count, seed):
+    rng = np.random.default_rng(seed)
+    clubs = [team["id"] for team in league.teams]
+    for _ in range(count):
+        query = {"limit": int(rng.integers(1, 15))}
+        if rng.random() < 0.7:
+            query["position"] = str(rng.choice(["GKP", "DEF", "MID", "FWD"]))
+        if rng.random() < 0.5:
+            query["max_price"] = float(rng.choice([4.5, 5.0, 6.3, 7.0, 9.5]))
+        if rng.random() < 0.3:
+            query["min_price"] = float(rng.choice([4.0, 5.5, 6.0]))
+        if rng.random() < 0.4:
+            query["max_ownership"] = float(rng.choice([1.0, 5.0, 20.0]))
+        if rng.random() < 0.2:
+            query["min_ownership"] = float(rng.choice([2.0, 5.0]))
+        if rng.random() < 0.3:
+            query["teams"] = rng.choice(clubs, 3, replace=False).tolist()
+        if rng.random() < 0.3:
+            query["exclude_teams"] = rng.choice(clubs, 2, replace=False).tolist()
+        if rng.random() < 0.3:
+            query["min_fitness"] = 0.75
+        yield query
+
+
+def found(index, query):
+    return [record["ID"] for record in index.top(**query)]
+
+
+def test_top_matches_filtering_the_whole_table(league, scores):
+    index = PlayerQuery(scores)
+    for query in random_queries(league, 300, seed=1):
+        assert found(index, query) == oracle(scores, **query), query
+
+
+def test_sync_matches_a_fresh_index(league, scores):
+    index = PlayerQuery(scores)
+    rng = np.random.default_rng(5)
+    changed = scores.copy()
+    rows = rng.choice(len(changed), 30, replace=False)
+    changed.iloc[rows[:10], changed.columns.get_loc("Combined score")] *= 1.5
+    changed.iloc[rows[10:20], changed.columns.get_loc("Price")] += 0.7
+    changed.iloc[rows[20:], changed.columns.get_loc("Ownership")] = 7.5
+    changed = changed.drop(changed.index[rng.choice(len(changed), 5, replace=False)])
+
+    assert index.sync(changed) >= 30
+    fresh = PlayerQuery(changed)
+    assert index.sync(changed) == 0
+    for query in random_queries(league, 200, seed=2):
+        assert found(index, query) == found(fresh, query) == oracle(changed, **query), query
+
+
+def test_limit_below_one_is_rejected(scores):
+    index = PlayerQuery(scores)
+    for limit in (0, -3):
+        with pytest.raises(ValueError, match="at least 1"):
+            index.top(limit=limit)
+    with pytest.raises(ValueError, match="limit must be at least 1"):
+        parse_query(["limit=0"])
+    with pytest.raises(ValueError, match="max_price must be a number"):
+        parse_query(["max_price=cheap"])
+    with pytest.raises(ValueError, match="exclude_teams must be comma-separated whole numbers"):
+        parse_query(["exclude_teams=3;7"])
+    assert parse_query(["position=mid", "limit=2", "teams=1,4"]) == {"position": "MID", "limit": 2, "teams": [1, 4]}
+
+
+def test_refreshes_sync_one_index(scores):
+    tables = iter([scores, scores.assign(**{"Combined score": scores["Combined score"] * -1})])
+    service = RecommendationService(
+        lambda previous: LeagueSnapshot(next(tables), main.BUDGET, main.POSITION_LIMITS, previous=previous),
+        interval=0, port=0)
+    try:
+        service.refresh()
+        first = service.snapshot
+        best = first.query(limit=3)
+        service.refresh()
+        assert service.snapshot.index is first.index
+        current = service.snapshot.scores.reset_index(drop=True)
+        assert [row["ID"] for row in service.snapshot.query(limit=3)] == oracle(current, limit=3)
+        # The replaced snapshot still only answers with its own players.
+        assert {row["ID"] for row in first.query(limit=3)} <= set(first.scores["ID"])
+        assert best != service.snapshot.query(limit=3)
+    finally:
+        service.server.server_close()
+
+
+def test_live_ticks_keep_the_index_in_line(league, scores):
+    event = league.synthetic.played + 1
+    index = PlayerQuery(scores)
+    live = LiveGameweek(event, league.players, league.frames, league.team_index, league.scores,
+                        league.fixture_index.for_event(event), index)
+    for minute in range(0, 160, 20):
+        live.update(league.synthetic.live(event, minute))
+    ownership = scores.set_index("ID")["Ownership"]
+    current = live.scores.assign(Ownership=live.scores["ID"].map(ownership))
+    for query in random_queries(league, 100, seed=4):
+        assert found(index, query) == oracle(current, **query), query
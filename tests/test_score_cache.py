@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+
+import main
+from controllers.score_cache import ScoreCache, input_hashes, score_with_cache
+from controllers.scoring import score_league
+
+SETTINGS = ("vectorized", main.CURRENT_SEASON, main.DECAY_FACTOR)
+
+
+class Scorer:
+    """score_league over the league's players, remembering which IDs it was asked for."""
+
+    def __init__(self, league, history, decay_factor=main.DECAY_FACTOR):
+        self.league = league
+        self.history = history
+        self.decay_factor = decay_factor
+        self.calls = []
+
+    def __call__(self, player_ids):
+        self.calls.append(list(player_ids))
+        players = self.league.players
+        return score_league(players[players["id"].isin(player_ids)], self.history,
+                            self.league.frames["history_past"], self.league.frames["fixtures"],
+                            self.league.team_index, current_season=main.CURRENT_SEASON,
+                            decay_factor=self.decay_factor)
+
+    def keys(self, settings=SETTINGS, players=None):
+        players = self.league.players if players is None else players
+        return input_hashes(players, self.history, self.league.frames["history_past"],
+                            self.league.frames["fixtures"], self.league.team_index, settings)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with ScoreCache(str(tmp_path / "score_cache.sqlite")) as cache:
+        yield cache
+
+
+def assert_same_scores(found, expected):
+    pd.testing.assert_frame_equal(found.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False, rtol=1e-12)
+
+
+def test_hits_misses_and_equality_with_score_league(league, cache):
+    scorer = Scorer(league, league.frames["history"])
+    keys = scorer.keys()
+    scores, hits, misses = score_with_cache(cache, keys, scorer)
+    assert (hits, misses) == (0, len(keys))
+    assert_same_scores(scores, league.scores)
+
+    # Unchanged inputs are all hits and the scorer is not called again.
+    scores, hits, misses = score_with_cache(cache, scorer.keys(), scorer)
+    assert (hits, misses) == (len(keys), 0) and len(scorer.calls) == 1
+    assert_same_scores(scores, league.scores)
+
+
+def test_a_changed_history_rescores_only_that_player(league, cache):
+    original = Scorer(league, league.frames["history"])
+    score_with_cache(cache, original.keys(), original)
+    history = league.frames["history"].copy()
+    player_id = int(history["player_id"].iloc[0])
+    history.loc[history.index[0], "total_points"] = history["total_points"].iloc[0] + 10
+
+    scorer = Scorer(league, history)
+    scores, hits, misses = score_with_cache(cache, scorer.keys(), scorer)
+    assert misses == 1 and scorer.calls == [[player_id]]
+    assert_same_scores(scores, scorer(league.players["id"].tolist()))
+
+
+def test_changed_settings_invalidate_every_score(league, cache):
+    scorer = Scorer(league, league.frames["history"])
+    score_with_cache(cache, scorer.keys(), scorer)
+    changed = Scorer(league, league.frames["history"], decay_factor=0.9)
+    keys = changed.keys(("vectorized", main.CURRENT_SEASON, 0.9))
+    scores, hits, misses = score_with_cache(cache, keys, changed)
+    assert (hits, misses) == (0, len(keys))
+    assert_same_scores(scores, changed(league.players["id"].tolist()))
+
+
+def test_no_players_gives_the_score_columns(league, cache):
+    scorer = Scorer(league, league.frames["history"])
+    scores, hits, misses = score_with_cache(cache, scorer.keys(players=league.players.iloc[:0]), scorer)
+    assert (hits, misses) == (0, 0)
+    assert list(scores.columns) == list(league.scores.columns)
+    assert scores.sort_values("Combined score").empty
@@ -0,0 +1,28 @@
+import numpy as np
+
+import main
+from controllers.scoring import compare_with_reference, score_league
+
+
+def _score(league, players=None):
+    return score_league(league.players if players is None else players, league.frames["history"],
+                        league.frames["history_past"], league.frames["fixtures"], league.team_index,
+                        current_season=main.CURRENT_SEASON, decay_factor=main.DECAY_FACTOR)
+
+
+def test_vectorized_scores_match_calculate_performance(league):
+    scores = _score(league)
+    reference = main.reference_scores([league.table.player(player_id) for player_id in league.fit_ids],
+                                      league.frames, league.team_index)
+
+    assert len(scores) == len(league.fit_ids)
+    assert compare_with_reference(scores, reference).empty
+
+
+def test_players_are_scored_independently(league):
+    scores = _score(league).set_index("ID")
+    half = league.players.iloc[::2]
+    subset = _score(league, half).set_index("ID")
+
+    assert list(subset.index) == half["id"].tolist()
+    assert np.allclose(subset["Combined score"], scores.loc[subset.index, "Combined score"], rtol=1e-12)
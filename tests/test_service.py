@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+import requests
+
+import main
+from controllers.service import LeagueSnapshot, RecommendationService
+
+
+@pytest.fixture
+def service(league):
+    snapshot = LeagueSnapshot(league.scores, main.BUDGET, main.POSITION_LIMITS)
+    service = RecommendationService(lambda previous: snapshot, interval=0, port=0)
+    service.refresh()
+    thread = threading.Thread(target=service.server.serve_forever, daemon=True)
+    thread.start()
+    yield service
+    service.server.shutdown()
+    service.server.server_close()
+
+
+@pytest.mark.parametrize("path, message", [
+    ("/players/abc", "The player ID must be a whole number, not 'abc'."),
+    ("/replacement?player=x", "The 'player' parameter must be a whole number, not 'x'."),
+    ("/replacement?player=3&max_price=cheap", "The 'max_price' parameter must be a number, not 'cheap'."),
+    ("/replacement?player=3&squad=1,two", "must be a whole number, not 'two'."),
+    ("/differentials?limit=0", "The 'limit' parameter must be positive, not '0'."),
+    ("/best-xi?budget=lots", "The 'budget' parameter must be a number, not 'lots'."),
+    ("/best-xi?budget=inf", "The 'budget' parameter must be a finite number, not 'inf'."),
+    ("/best-xi?budget=nan", "The 'budget' parameter must be a finite number, not 'nan'."),
+    ("/best-xi?exclude=1;2", "not '1;2'."),
+    ("/query?limit=0", "limit must be at least 1."),
+    ("/query?max_price=cheap", "max_price must be a number."),
+])
+def test_bad_input_gets_a_clear_400(service, path, message):
+    response = requests.get(service.url + path)
+    assert response.status_code == 400
+    assert response.json()["error"].endswith(message)
+
+
+def test_good_requests_still_answer(service, league):
+    player_id = int(league.scores["ID"].iloc[0])
+    assert requests.get(f"{service.url}/players/{player_id}").json()["ID"] == player_id
+    assert requests.get(f"{service.url}/players/99999").status_code == 404
+    replacement = requests.get(f"{service.url}/replacement?player={player_id}&max_price=15&limit=2").json()
+    assert len(replacement) == 2 and player_id not in [row["ID"] for row in replacement]
+
+
+def test_budgets_above_the_whole_pool_are_clamped(service, league):
+    total = round(float(league.scores["Price"].sum()), 1)
+    unlimited = requests.get(f"{service.url}/best-xi?budget={total}").json()
+    assert len(unlimited["starters"]) == 11
+    assert requests.get(f"{service.url}/best-xi?budget=1e6").json() == unlimited
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from controllers.simulation import PointsSimulator
+
+
+@pytest.fixture(scope="module")
+def squad(league):
+    """The best 15 by Gw score in a 2-5-5-3 squad, split into XI and bench by position."""
+    scores = league.scores.sort_values("Gw score", ascending=False)
+    picked = {position: scores[scores["Position"] == position]["ID"].head(count).tolist()
+              for position, count in {"GKP": 2, "DEF": 5, "MID": 5, "FWD": 3}.items()}
+    starters = picked["GKP"][:1] + picked["DEF"][:4] + picked["MID"][:4] + picked["FWD"][:2]
+    bench = picked["GKP"][1:] + picked["DEF"][4:] + picked["MID"][4:] + picked["FWD"][2:]
+    positions = dict(zip(league.scores["ID"], league.scores["Position"]))
+    return starters, bench, positions
+
+
+@pytest.fixture(scope="module")
+def simulator(league):
+    return PointsSimulator(league.frames["history"], league.scores.set_index("ID")["Fitness"])
+
+
+def test_results_only_depend_on_the_seed(simulator, squad):
+    runs = [simulator.simulate_squad(*squad, sims=25_000, seed=3, workers=workers) for workers in (1, 2)]
+    pd.testing.assert_frame_equal(runs[0]["players"], runs[1]["players"])
+    pd.testing.assert_frame_equal(runs[0]["captains"], runs[1]["captains"])
+    assert runs[0]["squad"] == runs[1]["squad"]
+    other = simulator.simulate_squad(*squad, sims=25_000, seed=4)
+    assert other["squad"] != runs[0]["squad"]
+
+
+def test_simulated_means_converge_to_expected_points(simulator, squad):
+    sims = 40_000
+    players = simulator.simulate_squad(*squad, sims=sims, gameweeks=2, seed=1)["players"].set_index("ID")
+    expected = simulator.expected_points(players.index) * 2
+    # Within four standard errors of the exact expectation.
+    tolerance = 4 * players["Std"] / np.sqrt(sims) + 1e-9
+    assert ((players["Expected"] - expected).abs() <= tolerance).all()
+    assert expected.gt(0).any()
+
+
+def deterministic(points, played):
+    """A simulator where each player always scores `points[id]` if `played[id]`, and never plays otherwise."""
+    history = pd.DataFrame([{"player_id": player_id, "minutes": 90 if played[player_id] else 0,
+                             "total_points": value} for player_id, value in points.items() for _ in range(3)])
+    return PointsSimulator(history, pd.Series(1.0, index=list(points)))
+
+
+@pytest.mark.parametrize("missing, substitutes", [
+    ((), 0),
+    ((2,), 7),              # the first outfield substitute comes on
+    ((2, 3), 7 + 11),       # then the second, in bench order
+    ((1, 2), 5 + 7),        # the bench goalkeeper only replaces the goalkeeper
+])
+def test_automatic_substitutions_follow_the_bench_order(missing, substitutes):
+    starters = list(range(1, 12))
+    bench = [12, 13, 14, 15]
+    positions = {1: "GKP", 12: "GKP", **{player_id: "DEF" for player_id in range(2, 12)},
+                 **{player_id: "MID" for player_id in (13, 14, 15)}}
+    points = {**{player_id: 1.0 for player_id in starters}, 1: 2.0, 12: 5.0, 13: 7.0, 14: 11.0, 15: 13.0}
+    played = {player_id: player_id not in missing for player_id in points}
+    result = deterministic(points, played).simulate_squad(starters, bench, positions, sims=50, seed=0)
+
+    xi = sum(points[player_id] for player_id in starters if played[player_id])
+    captains = result["captains"].set_index("Captain")
+    captain = 4  # plays in every case and scores 1
+    assert captains.loc[captain, "Expected squad points"] == xi + substitutes + 1
+    assert captains.loc[captain, "P10"] == captains.loc[captain, "P90"]
+    # A captain who does not play hands the armband to the vice-captain.
+    for absent in missing:
+        vice = captains.loc[absent, "Vice"]
+        assert captains.loc[absent, "Captain EV"] == points[vice]
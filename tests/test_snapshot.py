@@ -0,0 +1,67 @@
+import gzip
+import json
+import logging
+import time
+
+import pytest
+
+import main
+from benchmarks.stub_server import StubServer
+from controllers import snapshot
+from controllers.http_cache import HttpCache
+from controllers.snapshot import load_payload, save_payload
+
+PAYLOAD = {"elements": [{"id": 1, "web_name": "Saka", "now_cost": 100, "form": "7.5"}],
+           "teams": [], "total_players": 10_000_000, "name": "Ødegaard ✓", "empty": None}
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "json"])
+def decoder(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("orjson")
+    monkeypatch.setattr(snapshot, "HAS_ORJSON", request.param)
+
+
+def test_round_trip(tmp_path, decoder):
+    path = str(tmp_path / "snapshots" / "bootstrap-static.json.gz")
+    content = json.dumps(PAYLOAD, ensure_ascii=False).encode()
+    save_payload(path, content)
+    assert load_payload(path) == PAYLOAD
+    with gzip.open(path, "rb") as file:
+        assert file.read() == content
+    assert not (tmp_path / "snapshots" / "bootstrap-static.json.gz.tmp").exists()
+
+
+@pytest.mark.parametrize("damage", ["not gzip", "truncated", "not json"])
+def test_damaged_snapshots_raise_a_clear_error(tmp_path, decoder, damage):
+    path = tmp_path / "bootstrap-static.json.gz"
+    save_payload(str(path), json.dumps(PAYLOAD).encode())
+    if damage == "not gzip":
+        path.write_bytes(b"<html>502 Bad Gateway</html>")
+    elif damage == "truncated":
+        path.write_bytes(path.read_bytes()[:-12])
+    else:
+        path.write_bytes(gzip.compress(b'{"elements": [{"id": 1,'))
+    with pytest.raises(ValueError, match=f"The snapshot {path} is corrupt or truncated"):
+        load_payload(str(path))
+
+
+class Context:
+    def __init__(self, http_cache):
+        self.http_cache = http_cache
+
+
+def test_a_damaged_snapshot_is_fetched_again(league, tmp_path, monkeypatch, caplog):
+    path = tmp_path / "bootstrap-static.json.gz"
+    with StubServer(league.synthetic) as stub:
+        url = f"{stub.base_url}/bootstrap-static/"
+        http_cache = HttpCache(str(tmp_path / "http_cache.json"))
+        monkeypatch.setattr(main, "_context", Context(http_cache))
+        expected = main.fetch_payload(url, str(path), "bootstrap", "bootstrap data")
+        path.write_bytes(path.read_bytes()[:100])
+        assert not http_cache.is_stale(url, ["bootstrap"], time.time())
+
+        with caplog.at_level(logging.WARNING, logger="fpl_buddy"):
+            assert main.fetch_payload(url, str(path), "bootstrap", "bootstrap data") == expected
+        assert "corrupt or truncated" in caplog.text
+        assert load_payload(str(path)) == expected
@@ -0,0 +1,42 @@
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+import main
+from controllers.scoring import compare_with_reference, score_league
+from controllers.store import GameweekStore
+
+
+def test_decimal_strings_are_stored_as_numbers(league, tmp_path):
+    player_id = league.fit_ids[0]
+    summary = league.synthetic.element_summary(player_id)
+    assert isinstance(summary["history"][0]["expected_goals"], str)
+
+    with GameweekStore(str(tmp_path / "store.sqlite")) as store:
+        store.write_summary(player_id, summary)
+        history = store.read_player(player_id, "history")
+
+    for column in ("expected_goals", "ict_index", "expected_goals_conceded"):
+        assert is_numeric_dtype(history[column])
+    assert history["expected_goals"].tolist() == [float(row["expected_goals"]) for row in summary["history"]]
+
+
+def test_reference_scoring_reads_from_the_store(league, tmp_path):
+    with GameweekStore(str(tmp_path / "store.sqlite")) as store:
+        for player_id in league.fit_ids:
+            store.write_summary(player_id, league.synthetic.element_summary(player_id))
+        frames = {kind: store.read_all(kind) for kind in ("history", "history_past")}
+    frames["fixtures"] = league.frames["fixtures"]
+
+    scores = score_league(league.players, frames["history"], frames["history_past"], frames["fixtures"],
+                          league.team_index, current_season=main.CURRENT_SEASON, decay_factor=main.DECAY_FACTOR)
+    reference = main.reference_scores([league.table.player(player_id) for player_id in league.fit_ids],
+                                      frames, league.team_index)
+    assert compare_with_reference(scores, reference).empty
+
+
+def test_text_columns_of_older_stores_are_parsed_on_read(tmp_path):
+    with GameweekStore(str(tmp_path / "store.sqlite")) as store:
+        store.conn.execute('ALTER TABLE "history" ADD COLUMN "ict_index" TEXT')
+        store.conn.execute('INSERT INTO "history" (player_id, ict_index) VALUES (1, \'4.5\')')
+        assert store.read_player(1, "history")["ict_index"].tolist() == [4.5]
+        assert isinstance(store.read_all("history"), pd.DataFrame)
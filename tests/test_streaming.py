@@ -0,0 +1,110 @@
+import math
+import threading
+
+import pandas as pd
+import pytest
+
+import main
+from benchmarks.stub_server import StubServer
+from controllers.fetcher import ElementSummaryFetcher
+from controllers.scoring import score_league
+from controllers.streaming import StreamingScorer, TopK
+
+
+def scorer(league, k, batch_size):
+    def score(players, history, history_past, fixtures):
+        return score_league(players, history, history_past, fixtures, league.team_index,
+                            current_season=main.CURRENT_SEASON, decay_factor=main.DECAY_FACTOR)
+
+    return StreamingScorer(league.players, score, lambda ids: league.fixture_index.for_players(league.players, ids),
+                           k=k, batch_size=batch_size, max_batches=2)
+
+
+def summaries(league):
+    """Every fit player's summary, every third one as cached frames instead of payload rows."""
+    for i, player_id in enumerate(league.fit_ids):
+        summary = league.synthetic.element_summary(player_id)
+        if i % 3 == 0:
+            summary = {kind: pd.DataFrame(summary[kind]) for kind in ("history", "history_past")}
+        yield player_id, summary
+
+
+def best_ids(scores, k):
+    """The best `k` per position of a full scoring run, ties to the lower ID."""
+    ranked = scores.assign(score=scores["Combined score"].fillna(-math.inf)).sort_values(
+        ["score", "ID"], ascending=[False, True])
+    return {position: group["ID"].head(k).tolist() for position, group in ranked.groupby("Position")}
+
+
+@pytest.mark.parametrize("k, batch_size", [(5, 7), (10, 50), (200, 16)])
+def test_top_k_matches_a_full_run(league, k, batch_size):
+    streaming = scorer(league, k, batch_size)
+    updates = list(streaming.run(summaries(league)))
+    assert [scored for scored, _ in updates][-1] == len(league.fit_ids)
+    assert len(updates) == math.ceil(len(league.fit_ids) / batch_size)
+
+    ranking = updates[-1][1]
+    assert {position: [player["ID"] for player in players] for position, players in ranking.items()} \
+        == best_ids(league.scores, k)
+    expected = league.scores.set_index("ID")
+    for players in ranking.values():
+        for player in players:
+            assert player["Combined score"] == pytest.approx(expected.loc[player["ID"], "Combined score"])
+
+
+def closing_summaries(league, closed):
+    """`summaries`, setting `closed` when the generator is closed."""
+    try:
+        yield from summaries(league)
+    finally:
+        closed.set()
+
+
+def test_stopping_early_stops_the_decoder(league):
+    streaming = scorer(league, 3, 10)
+    closed = threading.Event()
+    updates = streaming.run(closing_summaries(league, closed))
+    scored, _ = next(updates)
+    updates.close()
+    assert scored == 10 and streaming.stopped.is_set()
+    streaming.decoder.join(timeout=5)
+    assert closed.is_set() and not streaming.decoder.is_alive()
+
+
+def test_a_scoring_error_closes_the_summaries(league):
+    def fail(*batch):
+        raise RuntimeError("scoring failed")
+
+    streaming = StreamingScorer(league.players, fail, lambda ids: league.fixture_index.for_players(league.players, ids),
+                                batch_size=10, max_batches=1)
+    closed = threading.Event()
+    with pytest.raises(RuntimeError, match="scoring failed"):
+        list(streaming.run(closing_summaries(league, closed)))
+    streaming.decoder.join(timeout=5)
+    assert closed.is_set() and not streaming.decoder.is_alive()
+
+
+def test_top_k_keeps_the_best_per_position():
+    top = TopK(2, "points")
+    frame = pd.DataFrame({"ID": [1, 2, 3, 4, 5, 6], "Position": ["MID"] * 4 + ["FWD"] * 2,
+                          "points": [3.0, float("nan"), 5.0, 3.0, 1.0, 2.0]})
+    assert top.push(frame) == 5
+    assert top.push(frame.assign(ID=frame["ID"] + 10, points=frame["points"] - 10)) == 0
+    assert {position: [player["ID"] for player in players] for position, players in top.ranking().items()} \
+        == {"MID": [3, 1], "FWD": [6, 5]}
+
+
+def test_fetch_stream_keeps_a_bounded_window(league):
+    with StubServer(league.synthetic) as stub:
+        fetcher = ElementSummaryFetcher(max_workers=2, requests_per_second=1000,
+                                        url=f"{stub.base_url}/element-summary/{{player_id}}/")
+        results = {player_id: (data, error) for player_id, data, error in fetcher.stream(league.fit_ids[:12])}
+        assert sorted(results) == sorted(league.fit_ids[:12])
+        assert all(error is None and data == league.synthetic.element_summary(player_id)
+                   for player_id, (data, error) in results.items())
+
+        stub.reset_counts()
+        stream = fetcher.stream(league.fit_ids, window=3)
+        next(stream)
+        stream.close()
+        assert stub.counts["requests"] <= 4
@@ -0,0 +1,27 @@
+import requests
+
+from benchmarks.stub_server import StubServer
+from benchmarks.synthetic import SyntheticLeague
+
+
+def test_stub_serves_the_synthetic_league_with_validators():
+    league = SyntheticLeague(40, seed=1)
+    with StubServer(league) as stub:
+        bootstrap = requests.get(f"{stub.base_url}/bootstrap-static/")
+        assert bootstrap.json() == league.bootstrap()
+        assert len(bootstrap.json()["elements"]) == 40
+
+        revalidated = requests.get(f"{stub.base_url}/bootstrap-static/",
+                                   headers={"If-None-Match": bootstrap.headers["ETag"]})
+        assert revalidated.status_code == 304
+
+        summary = requests.get(f"{stub.base_url}/element-summary/3/").json()
+        assert summary == league.element_summary(3)
+        assert requests.get(f"{stub.base_url}/element-summary/999/").status_code == 404
+
+        assert stub.counts["requests"] == 4 and stub.counts["not_modified"] == 1
+
+
+def test_synthetic_league_is_deterministic():
+    assert SyntheticLeague(25, seed=4).element_summary(7) == SyntheticLeague(25, seed=4).element_summary(7)
+    assert SyntheticLeague(25, seed=4).element_summary(7) != SyntheticLeague(25, seed=5).element_summary(7)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+from controllers.scoring import score_league
+from controllers.sweep import ParameterSweep, configurations, default_parameters, parse_grid
+
+
+@pytest.fixture(scope="module")
+def sweep(league):
+    return ParameterSweep(league.players, league.frames["history"], league.frames["history_past"],
+                          league.frames["fixtures"], league.team_index)
+
+
+@pytest.mark.parametrize("current_season, decay_factor", [
+    (main.CURRENT_SEASON, main.DECAY_FACTOR), (main.CURRENT_SEASON - 3, 0.2), (main.CURRENT_SEASON + 1, 0.9)])
+def test_configurations_match_score_league(league, sweep, current_season, decay_factor):
+    # score_league takes these two settings, so each configuration has an exact reference.
+    expected = score_league(league.players, league.frames["history"], league.frames["history_past"],
+                            league.frames["fixtures"], league.team_index,
+                            current_season=current_season, decay_factor=decay_factor).set_index("ID")
+    combined, gw = sweep.scores(pd.DataFrame([default_parameters(current_season, decay_factor)]))
+    found = sweep.frame(combined[0], gw[0]).set_index("ID").loc[expected.index]
+    for column in ("Combined score", "Gw score"):
+        np.testing.assert_allclose(found[column], expected[column], rtol=1e-9, atol=1e-12)
+
+
+def test_rankings_against_rank_correlation(sweep):
+    baseline = default_parameters(main.CURRENT_SEASON, main.DECAY_FACTOR)
+    configs = configurations(parse_grid(["price_offset=1:3:1", "gw_recency=0,1"], baseline))
+    assert len(configs) == 6
+    results = sweep.rankings(configs, baseline, top_n=5, chunk_size=4)
+
+    combined, _ = sweep.scores(configs)
+    base_ranks = pd.Series(sweep.scores(pd.DataFrame([baseline]))[0][0]).rank(method="first", ascending=False)
+    for i, row in results.iterrows():
+        ranks = pd.Series(combined[i]).rank(method="first", ascending=False)
+        assert row["spearman"] == pytest.approx(np.corrcoef(ranks, base_ranks)[0, 1])
+    base_row = (configs["price_offset"] == 1) & (configs["gw_recency"] == 1)
+    assert results.loc[base_row, "spearman"].item() == pytest.approx(1.0)
+    assert results.loc[base_row, "top-5 overlap"].item() == 1.0
+
+
+def test_parse_grid():
+    defaults = default_parameters(main.CURRENT_SEASON, main.DECAY_FACTOR)
+    grid = parse_grid(["decay_factor=0.3,0.5", "season_length=30:38:4"], defaults)
+    assert grid["decay_factor"] == [0.3, 0.5]
+    assert grid["season_length"] == [30.0, 34.0, 38.0]
+    assert grid["price_offset"] == [1]
+    for spec in ("decay=0.5", "price_offset=", "gw_recency=1:0:-1"):
+        with pytest.raises(ValueError):
+            parse_grid([spec], defaults)
+
+
+@pytest.mark.parametrize("spec, message", [
+    ("foo", "Invalid sweep 'foo'. Use name=v1,v2 or name=start:stop:step with a name from"),
+    ("a=1,x", "Invalid sweep 'a=1,x'. Use name=v1,v2"),
+    ("decay_factor=0.5,x", "Invalid sweep 'decay_factor=0.5,x': decay_factor must be comma-separated numbers "
+                           "(name=v1,v2) or a range (name=start:stop:step)."),
+    ("price_offset=1:5", "Invalid sweep 'price_offset=1:5': price_offset must be comma-separated numbers"),
+    ("price_offset=0:inf:1", "Invalid sweep 'price_offset=0:inf:1': price_offset must be finite numbers."),
+    ("decay_factor=nan", "decay_factor must be finite numbers."),
+    ("gw_recency=0:1:0", "the step must be positive."),
+])
+def test_parse_grid_names_the_bad_term(spec, message):
+    with pytest.raises(ValueError) as error:
+        parse_grid([spec], default_parameters(main.CURRENT_SEASON, main.DECAY_FACTOR))
+    assert message in str(error.value)
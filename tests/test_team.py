@@ -0,0 +1,48 @@
+import copy
+
+from controllers.team import TeamIndex
+
+
+def _expected(teams, team_id, opponent_id, home, forward):
+    team = next(team for team in teams if team["id"] == team_id)
+    opponent = next(team for team in teams if team["id"] == opponent_id)
+    if forward:
+        return team["strength_attack_home" if home else "strength_attack_away"] \
+            / opponent["strength_defence_away" if home else "strength_defence_home"]
+    return team["strength_defence_home" if home else "strength_defence_away"] \
+        / opponent["strength_attack_away" if home else "strength_attack_home"]
+
+
+def test_difficulty_matches_the_strength_ratios(league):
+    index = TeamIndex(league.teams)
+    for team in league.teams:
+        for opponent in league.teams[:5]:
+            for home in (True, False):
+                for position in (2, 4):
+                    assert index.difficulty(team["id"], opponent["id"], home, position) == \
+                        _expected(league.teams, team["id"], opponent["id"], home, position == 4)
+
+
+def test_of_converts_lists_and_keeps_indexes(league):
+    teams = copy.deepcopy(league.teams)
+    index = TeamIndex.of(teams)
+    assert TeamIndex.of(index) is index
+    assert TeamIndex.of(teams) is not index
+    assert (TeamIndex.of(teams).difficulty_table == index.difficulty_table).all()
+
+
+def test_unknown_teams_fall_back_to_1000(league):
+    index = TeamIndex(league.teams)
+    team = league.teams[0]
+    for unknown in (max(team["id"] for team in league.teams) + 1, 500, -3):
+        assert index.difficulty(team["id"], unknown, True, 2) == team["strength_defence_home"] / 1000
+        assert index.difficulty(unknown, team["id"], False, 4) == 1000 / team["strength_defence_home"]
+        assert index.difficulty(unknown, unknown, True, 2) == 1.0
+    found = index.difficulty([team["id"], 500], [500, team["id"]], [True, True], [4, 4])
+    assert found.tolist() == [team["strength_attack_home"] / 1000, 1000 / team["strength_defence_away"]]
+
+
+def test_fixture_difficulty_accepts_a_teams_list(league):
+    player = league.table.player(league.fit_ids[0])
+    fixture = {"team_h": player.team, "team_a": next(team["id"] for team in league.teams if team["id"] != player.team)}
+    assert player.fixture_difficulty(fixture, league.teams) == player.fixture_difficulty(fixture, league.team_index)